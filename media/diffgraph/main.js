@@ -0,0 +1,160 @@
+// media/diffgraph/main.js
+/* global acquireVsCodeApi */
+const vscode = acquireVsCodeApi();
+
+/**
+ * Shell for generated DiffGraph documents. The extension posts a graph as `begin`,
+ * `chunk` and `end` messages; chunks are written into a frame's document as they
+ * arrive, so the browser parses and paints the graph progressively.
+ *
+ * Graphs with a key stay resident in their own frame until the extension evicts them,
+ * and `show` brings one back by toggling visibility, keeping its scroll and zoom state.
+ * Screens (loading, no changes, ...) are written into one shared frame without a key.
+ */
+
+const container = document.getElementById('frames');
+
+/** key -> frame of a resident graph */
+const frames = new Map();
+/** Frame for documents without a key */
+let screenFrame = null;
+
+/** Id of the graph being written; chunks of older graphs are dropped */
+let currentId = 0;
+/** Document being written, until `end` */
+let writing = null;
+/** Key of the graph being written */
+let writingKey = null;
+
+window.addEventListener('message', e => {
+	const { type, id } = e.data;
+
+	switch (type) {
+		case 'begin':
+			dropUnfinished();
+			currentId = id;
+			writingKey = e.data.key || null;
+			writing = openDocument(writingKey);
+			break;
+		case 'chunk':
+			if (id === currentId && writing) {
+				writing.write(e.data.text);
+				syncTheme(writing);
+			}
+			break;
+		case 'end':
+			if (id === currentId && writing) {
+				writing.close();
+				syncTheme(writing);
+				writing = null;
+				writingKey = null;
+			}
+			break;
+		case 'show':
+			dropUnfinished();
+			currentId = id;
+			if (frames.has(e.data.key)) {
+				showFrame(frames.get(e.data.key));
+			}
+			break;
+		case 'evict':
+			evict(e.data.keys);
+			break;
+	}
+});
+
+function createFrame() {
+	const frame = document.createElement('iframe');
+	frame.className = 'graph';
+	frame.title = 'DiffGraph';
+	container.appendChild(frame);
+	return frame;
+}
+
+function showFrame(frame) {
+	for (const other of container.children) {
+		other.classList.toggle('active', other === frame);
+	}
+}
+
+/**
+ * A graph replaced before its `end` is incomplete, so it must not stay resident
+ */
+function dropUnfinished() {
+	if (writing && writingKey) {
+		evict([writingKey]);
+	}
+	writing = null;
+	writingKey = null;
+}
+
+function evict(keys) {
+	for (const key of keys || []) {
+		frames.get(key)?.remove();
+		frames.delete(key);
+	}
+}
+
+/**
+ * Open the document of the frame for `key` (or the screen frame) for writing, and show it
+ */
+function openDocument(key) {
+	let frame;
+	if (key) {
+		frames.get(key)?.remove();
+		frame = createFrame();
+		frames.set(key, frame);
+	} else {
+		screenFrame = screenFrame && screenFrame.isConnected ? screenFrame : createFrame();
+		frame = screenFrame;
+	}
+	showFrame(frame);
+
+	const doc = frame.contentDocument;
+	doc.open();
+	// Generated graphs were written for a top-level webview; hand them this webview's API
+	doc.defaultView.acquireVsCodeApi = () => vscode;
+	return doc;
+}
+
+/**
+ * Copy the theme variables, body classes and default styles VS Code puts on the webview
+ * document, since the frame's document does not inherit them
+ */
+function syncTheme(doc) {
+	if (!doc || !doc.documentElement) { return; }
+	doc.documentElement.style.cssText = document.documentElement.style.cssText;
+	if (doc.body) {
+		for (const name of [...doc.body.classList]) {
+			if (name.startsWith('vscode-') && !document.body.classList.contains(name)) {
+				doc.body.classList.remove(name);
+			}
+		}
+		for (const name of document.body.classList) {
+			doc.body.classList.add(name);
+		}
+		doc.body.dataset.vscodeThemeKind = document.body.dataset.vscodeThemeKind || '';
+	}
+	const defaultStyles = document.getElementById('_defaultStyles');
+	if (defaultStyles && doc.head && !doc.getElementById('_defaultStyles')) {
+		doc.head.prepend(defaultStyles.cloneNode(true));
+	}
+}
+
+function syncAllThemes() {
+	for (const frame of container.children) {
+		syncTheme(frame.contentDocument);
+	}
+}
+
+// Follow theme changes
+new MutationObserver(syncAllThemes).observe(document.documentElement, {
+	attributes: true,
+	subtree: false
+});
+new MutationObserver(syncAllThemes).observe(document.body, {
+	attributes: true,
+	attributeFilter: ['class', 'data-vscode-theme-kind']
+});
+
+vscode.postMessage({ command: 'ready' });
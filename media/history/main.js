@@ -3,9 +3,9 @@
 const vscode = acquireVsCodeApi();
 
 /**
- * This renderer uses a simplified version of VS Code's SCM "swimlane" algorithm.
- * It computes input/output swimlanes per row from commit parents so vertical lines
- * connect seamlessly across rows, and merges/forks are drawn with arcs.
+ * This renderer draws VS Code's SCM "swimlane" graph. Lanes are laid out in the extension
+ * host (src/utils/HistoryLanes.ts) and arrive as one render-ready row per commit, so vertical
+ * lines connect seamlessly across rows and merges/forks are drawn with arcs.
  */
 
 // Initialize state from previous session or default values
@@ -13,9 +13,34 @@ const state = vscode.getState() || {
 	repoPath: '',
 	repoName: '',
 	commits: [],
-	isRefreshing: false
+	/** Graph layout per commit, parallel to `commits` */
+	rows: [],
+	hasMore: false,
+	/** Number of the last history message applied; deltas only apply on top of it */
+	seq: 0,
+	isRefreshing: false,
+	graphRenderer: 'canvas'
 };
 
+/** Whether a `loadMore` request is outstanding */
+let loadMoreRequested = false;
+
+/** Commits kept in the saved state, one page; a restored view loads the rest again as it is scrolled */
+const SAVED_COMMITS = 100;
+
+/**
+ * Save the state for when the view is restored, with only the first page of the history
+ */
+function saveState() {
+	const truncated = state.commits.length > SAVED_COMMITS;
+	vscode.setState({
+		...state,
+		commits: truncated ? state.commits.slice(0, SAVED_COMMITS) : state.commits,
+		rows: truncated ? state.rows.slice(0, SAVED_COMMITS) : state.rows,
+		hasMore: state.hasMore || truncated
+	});
+}
+
 // Create loading overlay
 const loadingOverlay = document.createElement('div');
 loadingOverlay.className = 'loading-overlay';
@@ -30,29 +55,174 @@ window.addEventListener('message', e => {
 			loadingOverlay.classList.toggle('visible', e.data.state);
 			break;
 		case 'commits':
-			updateState(e.data);
-			vscode.setState(state);
-			renderList(state.commits, state.repoPath);
+			updateState(e.data, decodePage(e.data.page));
+			loadMoreRequested = false;
+			saveState();
+			renderList(state.commits, state.rows, state.repoPath);
+			break;
+		case 'historyDelta':
+			loadMoreRequested = false;
+			if (!appliesToShown(e.data)) { break; }
+			applyDelta(e.data);
+			state.seq = e.data.seq;
+			saveState();
 			break;
+		case 'appendCommits': {
+			loadMoreRequested = false;
+			if (!e.data.page) {
+				// Loading the page failed
+				state.hasMore = false;
+				saveState();
+				break;
+			}
+			if (!appliesToShown(e.data)) { break; }
+			const { commits, rows } = decodePage(e.data.page);
+			state.commits = state.commits.concat(commits);
+			state.rows = state.rows.concat(rows);
+			state.hasMore = !!e.data.hasMore;
+			state.seq = e.data.seq;
+			saveState();
+			appendToList(commits, rows, state.repoPath);
+			break;
+		}
 		case 'refreshing':
 			state.isRefreshing = e.data.state;
-			vscode.setState(state);
+			saveState();
 			break;
 		case 'error':
 			state.isRefreshing = false;
 			renderError(e.data.message || 'Unknown error');
-			vscode.setState(state);
+			saveState();
 			break;
 		case 'empty':
 			renderEmpty();
 			break;
+		case 'settings':
+			applySettings(e.data);
+			break;
 	}
 });
 
-function updateState(data) {
+function applySettings(data) {
+	if (data.graphRenderer === (state.graphRenderer || 'canvas')) { return; }
+	state.graphRenderer = data.graphRenderer;
+	saveState();
+	// Rebuild the list with the other renderer
+	if (virtualList && virtualList.viewport.isConnected) {
+		virtualList = null;
+		showRows(state.repoPath);
+	}
+}
+
+function updateState(data, { commits, rows }) {
 	state.repoPath = data.repoPath;
 	state.repoName = data.repoName;
-	state.commits = data.commits;
+	state.commits = commits;
+	state.rows = rows;
+	state.hasMore = !!data.hasMore;
+	state.seq = data.seq;
+}
+
+/**
+ * Whether a message changes the history shown now; if not, e.g. after a message to the
+ * hidden view was lost, ask for the whole history instead
+ */
+function appliesToShown(data) {
+	if (data.base === state.seq) { return true; }
+	vscode.postMessage({ command: 'resync', seq: state.seq });
+	return false;
+}
+
+/**
+ * Apply a `historyDelta` message in place: new commits on top, then the first `kept`
+ * commits already shown with patched refs and graph rows, then the new tail
+ */
+function applyDelta(data) {
+	const prepend = decodePage(data.prepend);
+	const tail = decodePage(data.tail);
+	const kept = data.kept;
+	const shift = prepend.commits.length;
+
+	state.commits = prepend.commits.concat(state.commits.slice(0, kept), tail.commits);
+	state.rows = prepend.rows.concat(state.rows.slice(0, kept), tail.rows);
+	state.hasMore = !!data.hasMore;
+
+	// Kept commits keep their view models, so their rows and graph shapes are reused
+	const keptModels = viewModels.slice(0, kept);
+	for (const patch of data.patches) {
+		state.commits[patch.index] = { ...state.commits[patch.index], refs: patch.refs };
+		state.rows[patch.index] = patch.row;
+		keptModels[patch.index - shift] = toViewModel(state.commits[patch.index], patch.row);
+	}
+	viewModels = toViewModels(prepend.commits, prepend.rows).concat(keptModels, toViewModels(tail.commits, tail.rows));
+	showRows(state.repoPath, shift);
+}
+
+// ---------- wire format (see src/utils/HistoryWire.ts) ----------
+const NODE_MERGE = 1;
+const NODE_HEAD = 2;
+const HAS_PARENTS = 4;
+const NO_INPUT = -2;
+const HASH_LENGTH = 40;
+
+function tuples(segments, from, count, size) {
+	const result = [];
+	for (let i = 0; i < count; i++) {
+		result.push(Array.from(segments.subarray(from + i * size, from + (i + 1) * size)));
+	}
+	return result;
+}
+
+/**
+ * Decode a columnar history page into commits and their graph rows
+ */
+function decodePage(page) {
+	const commits = [];
+	const rows = [];
+	if (!page) { return { commits, rows }; }
+
+	const { strings, segments } = page;
+	const hashAt = row => page.hashes.substr((row - page.start) * HASH_LENGTH, HASH_LENGTH);
+
+	for (let i = 0; i < page.count; i++) {
+		const parents = [];
+		for (let p = page.parentOffsets[i]; p < page.parentOffsets[i + 1]; p++) {
+			const parent = page.parents[p];
+			parents.push(parent >= 0 ? hashAt(parent) : strings[-1 - parent]);
+		}
+		const refs = [];
+		for (let r = page.refOffsets[i]; r < page.refOffsets[i + 1]; r++) {
+			refs.push(strings[page.refs[r]]);
+		}
+		commits.push({
+			hash: hashAt(page.start + i),
+			subject: page.subjects[i],
+			author: strings[page.authors[i]],
+			email: strings[page.emails[i]],
+			date: page.dates[i],
+			parents,
+			refs
+		});
+
+		const flags = page.flags[i];
+		const laneCount = page.laneCounts[i];
+		const joinCount = page.joinCounts[i];
+		const lanesAt = page.segmentOffsets[i];
+		const joinsAt = lanesAt + 3 * laneCount;
+		const mergesAt = joinsAt + 2 * joinCount;
+		rows.push({
+			circleIndex: page.circleIndexes[i],
+			circleColor: page.circleColors[i],
+			node: flags & NODE_HEAD ? 'head' : flags & NODE_MERGE ? 'merge' : 'commit',
+			inputColor: page.inputColors[i] === NO_INPUT ? undefined : page.inputColors[i],
+			hasParents: (flags & HAS_PARENTS) !== 0,
+			lanes: tuples(segments, lanesAt, laneCount, 3),
+			joins: tuples(segments, joinsAt, joinCount, 2),
+			merges: tuples(segments, mergesAt, (page.segmentOffsets[i + 1] - mergesAt) / 2, 2),
+			columns: page.columns[i]
+		});
+	}
+	return { commits, rows };
 }
 
 // --- constants (based on VS Code's scmHistory.ts) ---
@@ -66,10 +236,12 @@ const CIRCLE_STROKE_WIDTH = 2;
 const LANE_COLORS = ['#FFB000', '#DC267F', '#994F00', '#40B0A6', '#B66DFF'];
 const DEFAULT_REF_COLOR = '#007acc';
 
-// ---------- utilities ----------
-function rot(n, m) { return ((n % m) + m) % m; }
-function deepClone(obj) { return obj ? JSON.parse(JSON.stringify(obj)) : obj; }
+/** Color of a palette index from the layout, -1 being the default color */
+function laneColor(index) {
+	return index >= 0 ? LANE_COLORS[index % LANE_COLORS.length] : DEFAULT_REF_COLOR;
+}
 
+// ---------- utilities ----------
 function createSvgElement(name, attrs = {}) {
 	const el = document.createElementNS('http://www.w3.org/2000/svg', name);
 	for (const [k, v] of Object.entries(attrs)) { el.setAttribute(String(k), String(v)); }
@@ -92,158 +264,73 @@ function drawCircle(index, radius, strokeWidth = 1, fillColor = 'none', strokeCo
 	c.setAttribute('fill', fillColor);
 	return c;
 }
-function drawVerticalLine(x, y1, y2, color, strokeWidth = 1) {
-	const path = createPath(color, strokeWidth);
-	path.setAttribute('d', `M ${x} ${y1} V ${y2}`);
-	return path;
+function verticalLine(x, y1, y2, color) {
+	return { type: 'path', d: `M ${x} ${y1} V ${y2}`, color };
+}
+function circle(index, radius, strokeWidth, fill, stroke) {
+	return { type: 'circle', index, radius, strokeWidth, fill, stroke };
 }
-function findLastIndex(nodes, id) {
-	for (let i = nodes.length - 1; i >= 0; i--) {
-		if (nodes[i].id === id) { return i; }
+
+// ---------- per-row graph shapes (adapted from VS Code's `renderSCMHistoryItemGraph`) ----------
+/**
+ * The paths and circles of a row's graph cell, shared by the SVG and canvas renderers
+ * Paths use SVG path data in row coordinates; computed once per row and kept on the view model.
+ */
+function rowGraph(vm) {
+	if (vm.graph) { return vm.graph; }
+
+	const shapes = [];
+	const row = vm.row;
+	const circleIndex = row.circleIndex;
+	const circleColor = laneColor(row.circleColor);
+
+	// Other lanes of the current commit: draw "/---" into circle lane
+	for (const [index, color] of row.joins) {
+		const d = [];
+
+		// /
+		d.push(`M ${SWIMLANE_WIDTH * (index + 1)} 0`);
+		d.push(`A ${SWIMLANE_WIDTH} ${SWIMLANE_WIDTH} 0 0 1 ${SWIMLANE_WIDTH * index} ${SWIMLANE_WIDTH}`);
+
+		// -
+		d.push(`H ${SWIMLANE_WIDTH * (circleIndex + 1)}`);
+
+		shapes.push({ type: 'path', d: d.join(' '), color: laneColor(color) });
 	}
-	return -1;
-}
-
-// ---------- swimlane VM (adapted from VS Code's `toISCMHistoryItemViewModelArray`) ----------
-function buildViewModels(historyItems) {
-	let colorIndex = -1;
-	const vms = [];
-
-	for (let idx = 0; idx < historyItems.length; idx++) {
-		const item = historyItems[idx];
-		const parents = Array.isArray(item.parents) ? item.parents : [];
-
-		const prevOutput = vms.at(-1)?.outputSwimlanes ?? [];
-		const inputSwimlanes = prevOutput.map(n => deepClone(n));
-		const outputSwimlanes = [];
-
-		let firstParentAdded = false;
-
-		// Remove current node from lanes and replace it with first parent (keeping color)
-		if (parents.length > 0) {
-			for (const node of inputSwimlanes) {
-				if (node.id === item.hash) {
-					if (!firstParentAdded) {
-						// Keep lane color for the first parent
-						outputSwimlanes.push({
-							id: parents[0],
-							color: node.color || DEFAULT_REF_COLOR
-						});
-						firstParentAdded = true;
-					}
-					continue; // drop current node from lanes
-				}
-				outputSwimlanes.push(deepClone(node));
-			}
-		}
 
-		// Add remaining parents as new lanes (and first parent if we didn't replace)
-		for (let i = firstParentAdded ? 1 : 0; i < parents.length; i++) {
-			colorIndex = rot(colorIndex + 1, LANE_COLORS.length);
-			outputSwimlanes.push({
-				id: parents[i],
-				color: LANE_COLORS[colorIndex]
-			});
+	// Lanes carried past the commit
+	for (const [index, outIdx, color] of row.lanes) {
+		if (index === outIdx) {
+			// straight vertical
+			shapes.push(verticalLine(SWIMLANE_WIDTH * (index + 1), 0, SWIMLANE_HEIGHT, laneColor(color)));
+			continue;
 		}
 
-		// isCurrent (HEAD) – we infer from refs containing HEAD
-		const isCurrent = Array.isArray(item.refs) && item.refs.some(r => String(r).includes('HEAD'));
+		// curve from input to output lane
+		const d = [];
 
-		vms.push({
-			historyItem: item,
-			isCurrent,
-			inputSwimlanes,
-			outputSwimlanes
-		});
-	}
+		// |
+		d.push(`M ${SWIMLANE_WIDTH * (index + 1)} 0`);
+		d.push(`V 6`);
 
-	return vms;
-}
+		// curve to middle
+		d.push(`A ${SWIMLANE_CURVE_RADIUS} ${SWIMLANE_CURVE_RADIUS} 0 0 1 ${(SWIMLANE_WIDTH * (index + 1)) - SWIMLANE_CURVE_RADIUS} ${SWIMLANE_HEIGHT / 2}`);
 
-// ---------- per-row graph renderer (adapted from VS Code's `renderSCMHistoryItemGraph`) ----------
-function renderRowGraph(vm) {
-	const svg = createSvgElement('svg');
-	svg.classList.add('graph');
-	const item = vm.historyItem;
-	const inputs = vm.inputSwimlanes;
-	const outputs = vm.outputSwimlanes;
-
-	const inputIndex = inputs.findIndex(n => n.id === item.hash);
-	const circleIndex = inputIndex !== -1 ? inputIndex : inputs.length;
-
-	const circleColor =
-		circleIndex < outputs.length ? outputs[circleIndex].color :
-			circleIndex < inputs.length ? inputs[circleIndex].color :
-				DEFAULT_REF_COLOR;
-
-	let outIdx = 0;
-	for (let index = 0; index < inputs.length; index++) {
-		const color = inputs[index].color || DEFAULT_REF_COLOR;
-
-		if (inputs[index].id === item.hash) {
-			// Current commit lane
-			if (index !== circleIndex) {
-				// draw "/---" into circle lane
-				const d = [];
-				const path = createPath(color);
-
-				// /
-				d.push(`M ${SWIMLANE_WIDTH * (index + 1)} 0`);
-				d.push(`A ${SWIMLANE_WIDTH} ${SWIMLANE_WIDTH} 0 0 1 ${SWIMLANE_WIDTH * index} ${SWIMLANE_WIDTH}`);
-
-				// -
-				d.push(`H ${SWIMLANE_WIDTH * (circleIndex + 1)}`);
-
-				path.setAttribute('d', d.join(' '));
-				svg.append(path);
-			} else {
-				outIdx++;
-			}
-		} else {
-			// Not the current commit lane; carry lanes forward
-			if (outIdx < outputs.length && inputs[index].id === outputs[outIdx].id) {
-				if (index === outIdx) {
-					// straight vertical
-					const path = drawVerticalLine(SWIMLANE_WIDTH * (index + 1), 0, SWIMLANE_HEIGHT, color);
-					svg.append(path);
-				} else {
-					// curve from input to output lane
-					const d = [];
-					const path = createPath(color);
-
-					// |
-					d.push(`M ${SWIMLANE_WIDTH * (index + 1)} 0`);
-					d.push(`V 6`);
-
-					// curve to middle
-					d.push(`A ${SWIMLANE_CURVE_RADIUS} ${SWIMLANE_CURVE_RADIUS} 0 0 1 ${(SWIMLANE_WIDTH * (index + 1)) - SWIMLANE_CURVE_RADIUS} ${SWIMLANE_HEIGHT / 2}`);
-
-					// horizontal
-					d.push(`H ${(SWIMLANE_WIDTH * (outIdx + 1)) + SWIMLANE_CURVE_RADIUS}`);
-
-					// curve down
-					d.push(`A ${SWIMLANE_CURVE_RADIUS} ${SWIMLANE_CURVE_RADIUS} 0 0 0 ${SWIMLANE_WIDTH * (outIdx + 1)} ${(SWIMLANE_HEIGHT / 2) + SWIMLANE_CURVE_RADIUS}`);
-
-					// |
-					d.push(`V ${SWIMLANE_HEIGHT}`);
-
-					path.setAttribute('d', d.join(' '));
-					svg.append(path);
-				}
-				outIdx++;
-			}
-		}
+		// horizontal
+		d.push(`H ${(SWIMLANE_WIDTH * (outIdx + 1)) + SWIMLANE_CURVE_RADIUS}`);
+
+		// curve down
+		d.push(`A ${SWIMLANE_CURVE_RADIUS} ${SWIMLANE_CURVE_RADIUS} 0 0 0 ${SWIMLANE_WIDTH * (outIdx + 1)} ${(SWIMLANE_HEIGHT / 2) + SWIMLANE_CURVE_RADIUS}`);
+
+		// |
+		d.push(`V ${SWIMLANE_HEIGHT}`);
+
+		shapes.push({ type: 'path', d: d.join(' '), color: laneColor(color) });
 	}
 
 	// extra parents (merge lines)
-	for (let i = 1; i < (item.parents?.length || 0); i++) {
-		const parentId = item.parents[i];
-		const parentOutIdx = findLastIndex(outputs, parentId);
-		if (parentOutIdx === -1) { continue; }
-
+	for (const [parentOutIdx, color] of row.merges) {
 		const d = [];
-		const color = outputs[parentOutIdx].color || DEFAULT_REF_COLOR;
-		const path = createPath(color);
 
 		// draw "\" arc from parent lane bottom to middle
 		d.push(`M ${SWIMLANE_WIDTH * parentOutIdx} ${SWIMLANE_HEIGHT / 2}`);
@@ -253,44 +340,145 @@ function renderRowGraph(vm) {
 		d.push(`M ${SWIMLANE_WIDTH * parentOutIdx} ${SWIMLANE_HEIGHT / 2}`);
 		d.push(`H ${SWIMLANE_WIDTH * (circleIndex + 1)}`);
 
-		path.setAttribute('d', d.join(' '));
-		svg.append(path);
+		shapes.push({ type: 'path', d: d.join(' '), color: laneColor(color) });
 	}
 
 	// | to *
-	if (inputIndex !== -1) {
-		svg.append(drawVerticalLine(SWIMLANE_WIDTH * (circleIndex + 1), 0, SWIMLANE_HEIGHT / 2, inputs[inputIndex].color || DEFAULT_REF_COLOR));
+	if (row.inputColor !== undefined && row.inputColor !== null) {
+		shapes.push(verticalLine(SWIMLANE_WIDTH * (circleIndex + 1), 0, SWIMLANE_HEIGHT / 2, laneColor(row.inputColor)));
 	}
 
 	// | from *
-	if (item.parents && item.parents.length > 0) {
-		svg.append(drawVerticalLine(SWIMLANE_WIDTH * (circleIndex + 1), SWIMLANE_HEIGHT / 2, SWIMLANE_HEIGHT, circleColor));
+	if (row.hasParents) {
+		shapes.push(verticalLine(SWIMLANE_WIDTH * (circleIndex + 1), SWIMLANE_HEIGHT / 2, SWIMLANE_HEIGHT, circleColor));
 	}
 
 	// Node symbol
-	if (vm.isCurrent) {
+	if (row.node === 'head') {
 		// HEAD – single ring
-		svg.append(drawCircle(circleIndex, CIRCLE_RADIUS + 1, CIRCLE_STROKE_WIDTH, '#000', circleColor));
-	} else if ((item.parents?.length || 0) > 1) {
+		shapes.push(circle(circleIndex, CIRCLE_RADIUS + 1, CIRCLE_STROKE_WIDTH, '#000', circleColor));
+	} else if (row.node === 'merge') {
 		// merge commit – double dot
-		svg.append(drawCircle(circleIndex, CIRCLE_RADIUS + 1, 1, 'none', circleColor));
-		svg.append(drawCircle(circleIndex, CIRCLE_RADIUS - 1, CIRCLE_STROKE_WIDTH, circleColor, '#000'));
+		shapes.push(circle(circleIndex, CIRCLE_RADIUS + 1, 1, 'none', circleColor));
+		shapes.push(circle(circleIndex, CIRCLE_RADIUS - 1, CIRCLE_STROKE_WIDTH, circleColor, '#000'));
 	} else {
 		// normal commit – single dot
-		svg.append(drawCircle(circleIndex, CIRCLE_RADIUS + 1, CIRCLE_STROKE_WIDTH, circleColor, '#000'));
+		shapes.push(circle(circleIndex, CIRCLE_RADIUS + 1, CIRCLE_STROKE_WIDTH, circleColor, '#000'));
 	}
 
-	// set dimensions based on lane count
-	const cols = Math.max(inputs.length, outputs.length, 1) + 1;
-	svg.style.height = `${SWIMLANE_HEIGHT}px`;
-	svg.style.width = `${SWIMLANE_WIDTH * cols}px`;
+	vm.graph = { shapes, width: SWIMLANE_WIDTH * row.columns, circleIndex, circleColor };
+	return vm.graph;
+}
 
+// ---------- SVG renderer: one <svg> per row ----------
+function renderRowGraph(vm) {
+	const graph = rowGraph(vm);
+	const svg = createSvgElement('svg');
+	svg.classList.add('graph');
+
+	for (const shape of graph.shapes) {
+		if (shape.type === 'circle') {
+			svg.append(drawCircle(shape.index, shape.radius, shape.strokeWidth, shape.fill, shape.stroke));
+		} else {
+			const path = createPath(shape.color);
+			path.setAttribute('d', shape.d);
+			svg.append(path);
+		}
+	}
+
+	svg.style.height = `${SWIMLANE_HEIGHT}px`;
+	svg.style.width = `${graph.width}px`;
 	return svg;
 }
 
-// ---------- UI ----------
+// ---------- canvas renderer: one canvas for the visible rows ----------
+/** Path2D objects parsed from a shape's SVG path data, reused across frames */
+const pathCache = new WeakMap();
 
+function shapePath(shape) {
+	let path = pathCache.get(shape);
+	if (!path) {
+		path = new Path2D(shape.d);
+		pathCache.set(shape, path);
+	}
+	return path;
+}
 
+function paintCircle(ctx, index, radius, strokeWidth, fill, stroke) {
+	ctx.beginPath();
+	ctx.arc(SWIMLANE_WIDTH * (index + 1), SWIMLANE_HEIGHT / 2, radius, 0, 2 * Math.PI);
+	if (fill !== 'none') {
+		ctx.fillStyle = fill;
+		ctx.fill();
+	}
+	ctx.lineWidth = strokeWidth;
+	ctx.strokeStyle = stroke;
+	ctx.stroke();
+}
+
+/**
+ * Paint the graph cells of the bound rows onto the list's canvas, in viewport coordinates
+ */
+function paintGraphCanvas(list) {
+	const { canvas, viewport } = list;
+	const ctx = canvas.getContext('2d');
+	const dpr = window.devicePixelRatio || 1;
+	const height = viewport.clientHeight;
+	let width = 0;
+	for (const index of list.rows.keys()) {
+		width = Math.max(width, rowGraph(list.viewModels[index]).width);
+	}
+
+	if (canvas.width !== Math.ceil(width * dpr) || canvas.height !== Math.ceil(height * dpr)) {
+		canvas.width = Math.ceil(width * dpr);
+		canvas.height = Math.ceil(height * dpr);
+		canvas.style.width = `${width}px`;
+		canvas.style.height = `${height}px`;
+	}
+	ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+	ctx.clearRect(0, 0, width, height);
+	ctx.lineCap = 'round';
+
+	const scrollTop = viewport.scrollTop;
+	for (const index of list.rows.keys()) {
+		const y = index * ROW_HEIGHT - scrollTop;
+		if (y >= height || y + ROW_HEIGHT <= 0) { continue; }
+
+		const graph = rowGraph(list.viewModels[index]);
+		ctx.save();
+		ctx.translate(0, y);
+		for (const shape of graph.shapes) {
+			if (shape.type === 'circle') {
+				paintCircle(ctx, shape.index, shape.radius, shape.strokeWidth, shape.fill, shape.stroke);
+			} else {
+				ctx.lineWidth = 1;
+				ctx.strokeStyle = shape.color;
+				ctx.stroke(shapePath(shape));
+			}
+		}
+		if (index === list.hoveredNode) {
+			paintCircle(ctx, graph.circleIndex, CIRCLE_RADIUS + 3, 1, 'none', graph.circleColor);
+		}
+		ctx.restore();
+	}
+}
+
+/**
+ * Map a pointer position to the row under it, and whether it is over that row's commit node
+ */
+function hitTest(list, clientX, clientY) {
+	const rect = list.viewport.getBoundingClientRect();
+	const y = clientY - rect.top + list.viewport.scrollTop;
+	const index = Math.floor(y / ROW_HEIGHT);
+	const vm = list.viewModels[index];
+	if (!vm) { return { index: -1, onNode: false }; }
+
+	const dx = clientX - rect.left - SWIMLANE_WIDTH * (vm.row.circleIndex + 1);
+	const dy = y - (index * ROW_HEIGHT + ROW_HEIGHT / 2);
+	return { index, onNode: dx * dx + dy * dy <= (CIRCLE_RADIUS + 3) ** 2 };
+}
+
+// ---------- UI ----------
 
 function renderEmpty() {
 	const app = document.getElementById('app');
@@ -311,71 +499,271 @@ function renderError(message) {
 function refresh() {
 	vscode.postMessage({ command: 'refresh' });
 }
+function loadMore() {
+	if (!state.hasMore || loadMoreRequested) { return; }
+	loadMoreRequested = true;
+	vscode.postMessage({ command: 'loadMore' });
+}
 function onCommitClick(hash, repoPath) {
 	if (!hash) { return; }
 	vscode.postMessage({ command: 'commitClicked', commitHash: hash, repoPath });
 }
 
-function renderList(commits, repoPath) {
-	const app = document.getElementById('app');
-	app.textContent = '';
-
-	const list = document.createElement('div');
-	list.className = 'commit-list';
+/** One view model per loaded commit: the commit and its graph row */
+let viewModels = [];
 
-	// Build swimlane view models
-	// NOTE: historyItems order is already newest->oldest (git log).
-	const historyItems = commits.map(c => ({
+function toHistoryItem(c) {
+	return {
 		id: c.hash,
 		hash: c.hash,
 		parents: Array.isArray(c.parents) ? c.parents : [],
 		subject: c.subject || c.message || '',
 		author: c.author || '',
 		refs: Array.isArray(c.refs) ? c.refs : []
-	}));
-	const viewModels = buildViewModels(historyItems);
+	};
+}
+
+function toViewModel(commit, row) {
+	return { historyItem: toHistoryItem(commit), row };
+}
+
+function toViewModels(commits, rows) {
+	return commits.map((c, i) => toViewModel(c, rows[i]));
+}
+
+function renderList(commits, rows, repoPath) {
+	viewModels = toViewModels(commits, rows);
+	showRows(repoPath);
+}
+
+/**
+ * Add a page of older commits below the rows already shown
+ */
+function appendToList(commits, rows, repoPath) {
+	viewModels.push(...toViewModels(commits, rows));
+	showRows(repoPath);
+}
+
+/**
+ * @param shift rows added above the ones shown before
+ */
+function showRows(repoPath, shift = 0) {
+	if (!virtualList || !virtualList.viewport.isConnected) {
+		const app = document.getElementById('app');
+		app.textContent = '';
+		virtualList = createVirtualList(app);
+	}
+	setListItems(virtualList, viewModels, repoPath, shift);
+}
+
+// ---------- virtual list ----------
+// Only the rows in the viewport plus overscan exist in the DOM. Rows scrolled out are
+// returned to a pool and rebound to other commits. Graph cells are either painted on one
+// canvas laid over the list after each update, or drawn as an <svg> when a row is bound.
+const ROW_HEIGHT = SWIMLANE_HEIGHT;
+const OVERSCAN_ROWS = 10;
+/** The next page is requested when the viewport gets this close to the last row */
+const LOAD_MORE_THRESHOLD_ROWS = 50;
+
+let virtualList = null;
+
+/**
+ * The graph canvas, or null when the SVG renderer is selected or 2D canvas is unavailable
+ */
+function createGraphCanvas() {
+	if (state.graphRenderer === 'svg') { return null; }
+	const canvas = document.createElement('canvas');
+	canvas.className = 'graph-canvas';
+	if (!canvas.getContext('2d')) { return null; }
+	return canvas;
+}
+
+function createVirtualList(app) {
+	const viewport = document.createElement('div');
+	viewport.className = 'commit-list';
+	viewport.setAttribute('role', 'list');
 
-	for (let i = 0; i < viewModels.length; i++) {
-		const vm = viewModels[i];
-		const commit = vm.historyItem;
+	const spacer = document.createElement('div');
+	spacer.className = 'commit-list-spacer';
+	viewport.appendChild(spacer);
+	app.appendChild(viewport);
 
-		const row = document.createElement('div');
-		row.className = 'commit-row';
-		row.addEventListener('click', () => onCommitClick(commit.hash, repoPath));
-		row.setAttribute('role', 'listitem');
+	const canvas = createGraphCanvas();
+	if (canvas) {
+		app.appendChild(canvas);
+	}
 
-		const graphCol = document.createElement('div');
-		graphCol.className = 'graph-col';
-		graphCol.appendChild(renderRowGraph(vm));
+	const list = {
+		viewport,
+		spacer,
+		canvas,
+		viewModels: [],
+		repoPath: '',
+		/** index -> bound row element */
+		rows: new Map(),
+		/** unbound row elements, kept in the DOM hidden */
+		pool: [],
+		/** index of the row whose commit node is under the pointer, canvas renderer only */
+		hoveredNode: -1,
+		frame: 0
+	};
+
+	viewport.addEventListener('scroll', () => scheduleListUpdate(list), { passive: true });
+	new ResizeObserver(() => scheduleListUpdate(list)).observe(viewport);
+
+	if (canvas) {
+		// The canvas lets pointer events through to the rows; nodes are found by position
+		viewport.addEventListener('mousemove', e => {
+			const hit = hitTest(list, e.clientX, e.clientY);
+			setHoveredNode(list, hit.onNode ? hit.index : -1);
+		});
+		viewport.addEventListener('mouseleave', () => setHoveredNode(list, -1));
+	}
 
-		const content = document.createElement('div');
-		content.className = 'content';
+	// One listener for all rows, since rows are rebound to different commits
+	viewport.addEventListener('click', e => {
+		const row = e.target.closest('.commit-row');
+		const vm = row && list.viewModels[Number(row.dataset.index)];
+		if (vm) {
+			onCommitClick(vm.historyItem.hash, list.repoPath);
+		}
+	});
+
+	return list;
+}
+
+/**
+ * Show new view models; bound rows whose view model moved down by `shift` stay bound
+ */
+function setListItems(list, viewModels, repoPath, shift = 0) {
+	const previous = list.viewModels;
+	list.viewModels = viewModels;
+	list.repoPath = repoPath;
+	list.hoveredNode = -1;
+	list.spacer.style.height = `${viewModels.length * ROW_HEIGHT}px`;
+
+	// Keep the same commits in view when rows are added above a scrolled list
+	if (shift > 0 && list.viewport.scrollTop > 0) {
+		list.viewport.scrollTop += shift * ROW_HEIGHT;
+	}
 
-		const subject = document.createElement('span');
-		subject.className = 'subject';
-		subject.textContent = commit.subject || commit.hash;
-		subject.title = commit.subject || commit.hash;
+	const rows = new Map();
+	for (const [index, row] of list.rows) {
+		const moved = index + shift;
+		if (moved < viewModels.length && viewModels[moved] === previous[index]) {
+			row.dataset.index = String(moved);
+			row.style.transform = `translateY(${moved * ROW_HEIGHT}px)`;
+			rows.set(moved, row);
+		} else {
+			list.pool.push(row);
+		}
+	}
+	list.rows = rows;
+	updateVisibleRows(list);
+}
 
-		const author = document.createElement('span');
-		author.className = 'author';
-		author.textContent = commit.author ? commit.author : '';
-		author.title = commit.author || '';
+function scheduleListUpdate(list) {
+	if (list.frame) { return; }
+	list.frame = requestAnimationFrame(() => {
+		list.frame = 0;
+		updateVisibleRows(list);
+	});
+}
 
-		content.appendChild(subject);
-		if (commit.author) { content.appendChild(author); }
+function updateVisibleRows(list) {
+	const { viewport, viewModels } = list;
+	const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS);
+	const last = Math.min(viewModels.length, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN_ROWS);
 
-		row.appendChild(graphCol);
-		row.appendChild(content);
+	for (const [index, row] of list.rows) {
+		if (index < first || index >= last) {
+			list.rows.delete(index);
+			list.pool.push(row);
+		}
+	}
 
-		list.appendChild(row);
+	for (let index = first; index < last; index++) {
+		if (!list.rows.has(index)) {
+			const row = list.pool.pop() || createRow(list);
+			bindRow(list, row, index, viewModels[index]);
+			list.rows.set(index, row);
+		}
 	}
 
-	app.appendChild(list);
+	for (const row of list.pool) {
+		row.style.display = 'none';
+	}
+
+	if (list.canvas) {
+		paintGraphCanvas(list);
+	}
+
+	if (last >= viewModels.length - LOAD_MORE_THRESHOLD_ROWS) {
+		loadMore();
+	}
+}
+
+function createRow(list) {
+	const row = document.createElement('div');
+	row.className = 'commit-row';
+	row.setAttribute('role', 'listitem');
+
+	const graphCol = document.createElement('div');
+	graphCol.className = 'graph-col';
+
+	const content = document.createElement('div');
+	content.className = 'content';
+
+	const subject = document.createElement('span');
+	subject.className = 'subject';
+
+	const author = document.createElement('span');
+	author.className = 'author';
+
+	content.appendChild(subject);
+	content.appendChild(author);
+	row.appendChild(graphCol);
+	row.appendChild(content);
+	list.viewport.appendChild(row);
+	return row;
+}
+
+function setHoveredNode(list, index) {
+	if (list.hoveredNode === index) { return; }
+	list.hoveredNode = index;
+	paintGraphCanvas(list);
+}
+
+function bindRow(list, row, index, vm) {
+	const commit = vm.historyItem;
+	row.dataset.index = String(index);
+	row.style.display = '';
+	row.style.transform = `translateY(${index * ROW_HEIGHT}px)`;
+
+	const [graphCol, content] = row.children;
+	if (list.canvas) {
+		// Reserve the cell's width; the graph itself is painted on the canvas
+		graphCol.replaceChildren();
+		graphCol.style.width = `${rowGraph(vm).width}px`;
+	} else {
+		graphCol.replaceChildren(renderRowGraph(vm));
+	}
+
+	const [subject, author] = content.children;
+	subject.textContent = commit.subject || commit.hash;
+	subject.title = commit.subject || commit.hash;
+	author.textContent = commit.author || '';
+	author.title = commit.author || '';
+	author.hidden = !commit.author;
 }
 
 // Render initial state from cache or show loading
-if (state.commits && state.commits.length > 0) {
-	renderList(state.commits, state.repoPath);
+if (state.commits && state.commits.length > 0 && Array.isArray(state.rows) && state.rows.length === state.commits.length) {
+	renderList(state.commits, state.rows, state.repoPath);
 } else {
+	state.seq = 0;
 	document.getElementById('app').textContent = 'Loading history…';
-}
\ No newline at end of file
+}
+
+// Tell the extension which history is shown, so it sends the current one if it differs
+vscode.postMessage({ command: 'ready', seq: state.seq, count: state.commits.length });
\ No newline at end of file
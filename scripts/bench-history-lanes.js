@@ -0,0 +1,155 @@
+// scripts/bench-history-lanes.js
+/**
+ * Micro-benchmark of the History lane engine (src/utils/HistoryLanes.ts) against the
+ * previous deep-cloning `buildViewModels`, on synthetic merge-heavy DAGs.
+ *
+ * Usage: npm run bench:lanes -- [commits] [branches]
+ * (runs against the test build in out/, see `npm run compile-tests`)
+ */
+const path = require('path');
+const { HistoryLaneEngine } = require(path.join(__dirname, '..', 'out', 'utils', 'HistoryLanes.js'));
+
+const LANE_COLORS = ['#FFB000', '#DC267F', '#994F00', '#40B0A6', '#B66DFF'];
+const DEFAULT_REF_COLOR = '#007acc';
+const PAGE_SIZE = 100;
+
+// ---------- previous implementation, kept as the baseline ----------
+function rot(n, m) { return ((n % m) + m) % m; }
+function deepClone(obj) { return obj ? JSON.parse(JSON.stringify(obj)) : obj; }
+
+function buildViewModels(historyItems) {
+	let colorIndex = -1;
+	const vms = [];
+
+	for (let idx = 0; idx < historyItems.length; idx++) {
+		const item = historyItems[idx];
+		const parents = Array.isArray(item.parents) ? item.parents : [];
+
+		const prevOutput = vms.at(-1)?.outputSwimlanes ?? [];
+		const inputSwimlanes = prevOutput.map(n => deepClone(n));
+		const outputSwimlanes = [];
+
+		let firstParentAdded = false;
+
+		if (parents.length > 0) {
+			for (const node of inputSwimlanes) {
+				if (node.id === item.hash) {
+					if (!firstParentAdded) {
+						outputSwimlanes.push({
+							id: parents[0],
+							color: node.color || DEFAULT_REF_COLOR
+						});
+						firstParentAdded = true;
+					}
+					continue;
+				}
+				outputSwimlanes.push(deepClone(node));
+			}
+		}
+
+		for (let i = firstParentAdded ? 1 : 0; i < parents.length; i++) {
+			colorIndex = rot(colorIndex + 1, LANE_COLORS.length);
+			outputSwimlanes.push({
+				id: parents[i],
+				color: LANE_COLORS[colorIndex]
+			});
+		}
+
+		const isCurrent = Array.isArray(item.refs) && item.refs.some(r => String(r).includes('HEAD'));
+
+		vms.push({
+			historyItem: item,
+			isCurrent,
+			inputSwimlanes,
+			outputSwimlanes
+		});
+	}
+
+	return vms;
+}
+
+// ---------- synthetic history ----------
+/**
+ * Newest-first commits on `branches` long-lived branches that fork from and merge into main
+ */
+function syntheticHistory(count, branches) {
+	let seed = 42;
+	const random = () => {
+		seed = (seed * 1103515245 + 12345) % 2147483648;
+		return seed / 2147483648;
+	};
+
+	// Build oldest-first, then reverse
+	const commits = [];
+	const tips = new Array(branches + 1).fill(undefined);
+	for (let i = 0; i < count; i++) {
+		const hash = i.toString(16).padStart(40, '0');
+		const branch = Math.floor(random() * (branches + 1));
+		const parents = tips[branch] ? [tips[branch]] : (tips[0] ? [tips[0]] : []);
+		if (branch === 0 && random() < 0.3) {
+			const other = 1 + Math.floor(random() * branches);
+			if (tips[other] && tips[other] !== parents[0]) {
+				parents.push(tips[other]);
+			}
+		}
+		tips[branch] = hash;
+		commits.push({ hash, parents, refs: i === count - 1 ? ['HEAD -> main'] : [] });
+	}
+	return commits.reverse();
+}
+
+// ---------- checks ----------
+function lanesEqual(expected, lanes) {
+	return expected.length === lanes.length && expected.every((node, i) => node.id === lanes[i].id && node.color === LANE_COLORS[lanes[i].color]);
+}
+
+function verify(items) {
+	const expected = buildViewModels(items);
+	const engine = new HistoryLaneEngine(LANE_COLORS.length);
+	expected.forEach((vm, i) => {
+		const [row] = engine.append([items[i]]);
+		if (!lanesEqual(vm.outputSwimlanes, engine.lanes)) {
+			throw new Error(`Lane mismatch at row ${i}`);
+		}
+		const inputIndex = vm.inputSwimlanes.findIndex(n => n.id === vm.historyItem.hash);
+		if (row.circleIndex !== (inputIndex !== -1 ? inputIndex : vm.inputSwimlanes.length)) {
+			throw new Error(`Circle index mismatch at row ${i}`);
+		}
+	});
+}
+
+function time(label, fn, runs = 5) {
+	fn();
+	const samples = [];
+	for (let i = 0; i < runs; i++) {
+		const start = process.hrtime.bigint();
+		fn();
+		samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+	}
+	samples.sort((a, b) => a - b);
+	console.log(`${label.padEnd(36)} median ${samples[Math.floor(runs / 2)].toFixed(1).padStart(9)} ms`);
+	return samples[Math.floor(runs / 2)];
+}
+
+const count = Number(process.argv[2]) || 20000;
+const branches = Number(process.argv[3]) || 16;
+const items = syntheticHistory(count, branches);
+verify(items.slice(0, Math.min(items.length, 5000)));
+
+console.log(`${count} commits, ${branches} branches`);
+const baseline = time('buildViewModels (deep clone)', () => buildViewModels(items));
+const engine = time('lane engine, all at once', () => {
+	new HistoryLaneEngine(LANE_COLORS.length).append(items);
+});
+time(`lane engine, pages of ${PAGE_SIZE}`, () => {
+	const paged = new HistoryLaneEngine(LANE_COLORS.length);
+	for (let i = 0; i < items.length; i += PAGE_SIZE) {
+		paged.append(items.slice(i, i + PAGE_SIZE));
+	}
+});
+time(`baseline, re-run per page (2000 rows)`, () => {
+	for (let i = PAGE_SIZE; i <= Math.min(items.length, 2000); i += PAGE_SIZE) {
+		buildViewModels(items.slice(0, i));
+	}
+}, 3);
+console.log(`speedup ${(baseline / engine).toFixed(1)}x`);
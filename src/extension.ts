@@ -14,24 +14,76 @@
 // along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import * as vscode from 'vscode';
+import * as path from 'path';
 import { DiffGraphExplorerProvider } from './providers/DiffGraphExplorerProvider';
 import { DiffGraphViewProvider } from './providers/DiffGraphViewProvider';
 import { HistoryViewProvider } from './providers/HistoryViewProvider';
+import { DiffGraphCache } from './services/DiffGraphCache';
+import { DiffGraphStore } from './services/DiffGraphStore';
+import { DiffGraphAssets } from './services/DiffGraphAssets';
+import { CliService } from './services/CliService';
 import { DiffService } from './services/DiffService';
+import { DiffAutoGenerator } from './services/DiffAutoGenerator';
+import { CommitPrefetcher } from './services/CommitPrefetcher';
 import { GitService } from './services/GitService';
+import { WildDaemon } from './services/WildDaemon';
+import { CliQueueOrder } from './utils/types';
 
 // This method is called when your extension is activated
 // Your extension is activated the very first time the command is executed
 export function activate(context: vscode.ExtensionContext) {
+	// Persist generated DiffGraphs across reloads
+	try {
+		const store = new DiffGraphStore(path.join(context.globalStorageUri.fsPath, 'diffgraphs'));
+		DiffGraphCache.getInstance().attachStore(store);
+		context.subscriptions.push({ dispose: () => store.flush() });
+	} catch (error) {
+		console.error('WildestAI: Failed to open DiffGraph store, caching in memory only:', error);
+	}
+	applyCacheLimits();
+	applySchedulerOptions();
+	context.subscriptions.push(vscode.workspace.onDidChangeConfiguration(event => {
+		if (event.affectsConfiguration('wildestai.cache')) {
+			applyCacheLimits();
+		}
+		if (event.affectsConfiguration('wildestai.cli')) {
+			applySchedulerOptions();
+		}
+	}));
+
+	// Shared renderer scripts and styles of cached DiffGraphs, split off when they are cached
+	let diffGraphAssets: DiffGraphAssets | undefined;
+	try {
+		diffGraphAssets = new DiffGraphAssets(path.join(context.globalStorageUri.fsPath, 'diffgraph-assets'));
+		DiffGraphCache.getInstance().attachAssets(diffGraphAssets);
+	} catch (error) {
+		console.error('WildestAI: Failed to open DiffGraph assets directory, loading graphs whole:', error);
+	}
+
 	// Keep the old provider for backwards compatibility with generate command
-	const diffGraphWebViewProvider = new DiffGraphViewProvider(context.extensionUri);
+	const diffGraphWebViewProvider = new DiffGraphViewProvider(context.extensionUri, diffGraphAssets);
 	context.subscriptions.push(
-		vscode.window.registerWebviewViewProvider('wildestai.diffGraphView', diffGraphWebViewProvider)
+		vscode.window.registerWebviewViewProvider('wildestai.diffGraphView', diffGraphWebViewProvider, {
+			// Resident graphs only survive hiding the view if its context is retained
+			webviewOptions: { retainContextWhenHidden: vscode.workspace.getConfiguration('wildestai.diffGraph').get<number>('residentGraphs', 5) > 1 }
+		})
 	);
 
 	// Register services with provider reference
 	const diffService = new DiffService(context, diffGraphWebViewProvider);
 
+	// Route wild runs through a persistent daemon, logging to the WildestAI output channel (wildestai.cli.daemon)
+	const logDaemon = (message: string) => diffService.log(`wild daemon: ${message}`);
+	applyDaemonOption(context, logDaemon);
+	context.subscriptions.push(vscode.workspace.onDidChangeConfiguration(event => {
+		if (event.affectsConfiguration('wildestai.cli.daemon')) {
+			applyDaemonOption(context, logDaemon);
+		}
+	}));
+
+	// Regenerate DiffGraphs in the background as repositories change (wildestai.autoGenerate.*)
+	context.subscriptions.push(new DiffAutoGenerator(context, diffService));
+
 	// Register the Changes webview provider
 	const changesProvider = new DiffGraphExplorerProvider();
 	context.subscriptions.push(
@@ -45,13 +97,18 @@ export function activate(context: vscode.ExtensionContext) {
 		changesProvider.updateRepositories();
 	}));
 
+	// Warm the cache for recent commits shown in the History view (wildestai.prefetch.*)
+	const commitPrefetcher = new CommitPrefetcher(context, diffService);
+	context.subscriptions.push(commitPrefetcher);
+
 	// Register the History webview provider with commit click callback
 	const historyProvider = new HistoryViewProvider(
 		context.extensionUri,
 		context,
 		async (commitHash: string, repoPath: string) => {
 			await diffService.openCommitDiff(context, commitHash, repoPath);
-		}
+		},
+		(repoPath, commits) => commitPrefetcher.prefetch(repoPath, commits)
 	);
 	context.subscriptions.push(
 		vscode.window.registerWebviewViewProvider('wildestai.historyView', historyProvider)
@@ -100,7 +157,63 @@ export function activate(context: vscode.ExtensionContext) {
 		}
 	});
 	context.subscriptions.push(refreshStagedChangesDisposable);
+
+	context.subscriptions.push(vscode.commands.registerCommand('wildestai.openRangeDiff', async (treeItemOrRepoPath?: any, rangeText?: string) => {
+		const repoPath = await GitService.getRepositoryPath(treeItemOrRepoPath);
+		if (!repoPath) {
+			return;
+		}
+		const text = rangeText ?? await vscode.window.showInputBox({
+			title: 'Compare Revisions',
+			prompt: 'base..head compares two revisions, base...head compares head with its merge base, a single revision compares it with its parent',
+			value: 'main...HEAD'
+		});
+		const range = text !== undefined ? GitService.parseRange(text) : undefined;
+		if (range) {
+			await diffService.openRangeDiff(context, range, repoPath);
+		}
+	}));
+
+	context.subscriptions.push(vscode.commands.registerCommand('wildestai.generateAll', async () => {
+		await diffService.generateAll(context);
+	}));
+
+	context.subscriptions.push(vscode.commands.registerCommand('wildestai.showCacheStats', () => {
+		diffService.showCacheStats();
+	}));
+}
+
+function applyCacheLimits() {
+	const config = vscode.workspace.getConfiguration('wildestai.cache');
+	const defaults = DiffGraphCache.DEFAULT_LIMITS;
+	DiffGraphCache.getInstance().setLimits({
+		maxEntries: config.get<number>('maxEntries', defaults.maxEntries),
+		maxBytes: config.get<number>('maxSizeMB', defaults.maxBytes / (1024 * 1024)) * 1024 * 1024
+	});
+}
+
+function applySchedulerOptions() {
+	const config = vscode.workspace.getConfiguration('wildestai.cli');
+	CliService.configureScheduler({
+		maxParallelism: config.get<number>('maxParallelism', 0),
+		order: config.get<CliQueueOrder>('queueOrder', 'lifo')
+	});
+}
+
+function applyDaemonOption(context: vscode.ExtensionContext, log: (message: string) => void) {
+	if (!vscode.workspace.getConfiguration('wildestai.cli').get<boolean>('daemon', false)) {
+		CliService.setDaemon(undefined);
+		return;
+	}
+	try {
+		CliService.setDaemon(new WildDaemon(CliService.setupCommand(['serve', '--stdio'], context), log));
+	} catch (error) {
+		console.error('WildestAI: Failed to set up the wild daemon, spawning wild per run:', error);
+		CliService.setDaemon(undefined);
+	}
 }
 
 // This method is called when your extension is deactivated
-export function deactivate() { }
+export function deactivate() {
+	CliService.killAll();
+}
@@ -2,14 +2,33 @@ import * as fs from 'fs';
 import * as path from 'path';
 import * as vscode from 'vscode';
 import { NotificationService } from '../services/NotificationService';
+import { DiffGraphAssets } from '../services/DiffGraphAssets';
+
+/** Characters of generated HTML per message when streaming a DiffGraph */
+const STREAM_CHUNK_SIZE = 256 * 1024;
+
+/** What the view shows, so it can be shown again when the webview is reloaded */
+type ShownContent = { kind: 'graph'; htmlPath: string; documentPath?: string } | { kind: 'screen'; html: string };
 
 export class DiffGraphViewProvider implements vscode.WebviewViewProvider {
 	private _view?: vscode.WebviewView;
 	private _outputChannel: vscode.OutputChannel;
 	private _notificationService: NotificationService;
+	/** Resolves once the streaming shell in the webview is ready; unset while other HTML is shown */
+	private _shellReady?: Promise<void>;
+	private _resolveShellReady?: () => void;
+	/** Id of the latest streamed graph, so an older stream stops when a newer one starts */
+	private _streamId = 0;
+	/** Contents of media/diffgraph/index.html, read on first use */
+	private _shellTemplate?: string;
+	/** Keys of fully written graphs kept in frames of the shell, least recently shown first */
+	private _resident: string[] = [];
+	/** The graph or screen shown last */
+	private _shown?: ShownContent;
 
 	constructor(
-		private readonly _extensionUri: vscode.Uri) {
+		private readonly _extensionUri: vscode.Uri,
+		private readonly _assets?: DiffGraphAssets) {
 		this._outputChannel = vscode.window.createOutputChannel('DiffGraph');
 		this._notificationService = new NotificationService(this._outputChannel);
 	}
@@ -20,14 +39,25 @@ export class DiffGraphViewProvider implements vscode.WebviewViewProvider {
 		_token: vscode.CancellationToken,
 	) {
 		this._view = webviewView;
+		this.resetShell();
 		webviewView.webview.options = {
 			enableScripts: true,
-			localResourceRoots: [this._extensionUri]
+			localResourceRoots: this.baseResourceRoots()
 		};
+
+		webviewView.webview.onDidReceiveMessage(message => {
+			if (message.command === 'ready') {
+				this.onShellReady(webviewView);
+			}
+		});
+		// A view resolved again starts out empty
+		this.showAgain();
 	}
 
 	public update(htmlContent: string) {
 		if (this._view) {
+			this.resetShell();
+			this._streamId++;
 			this._view.webview.html = htmlContent;
 			this._view.show?.(true);
 		}
@@ -41,12 +71,12 @@ export class DiffGraphViewProvider implements vscode.WebviewViewProvider {
 			if (!fs.existsSync(staticHtmlUri.fsPath)) {
 				console.warn(`${name} HTML file not found, using fallback message.`);
 				// Fallback to backup message
-				this.update(backupHtmlContent);
+				this.showScreen(backupHtmlContent);
 				return;
 			}
 
 			const htmlContent = fs.readFileSync(staticHtmlUri.fsPath, 'utf8');
-			this.update(htmlContent);
+			this.showScreen(htmlContent);
 
 			// Reveal the view if it's not visible
 			if (this._view && !this._view.visible) {
@@ -55,7 +85,7 @@ export class DiffGraphViewProvider implements vscode.WebviewViewProvider {
 		} catch (error: any) {
 			console.error(`Error showing ${name} screen:`, error);
 			// Fallback to backup message
-			this.update(backupHtmlContent);
+			this.showScreen(backupHtmlContent);
 		}
 	}
 
@@ -74,28 +104,60 @@ export class DiffGraphViewProvider implements vscode.WebviewViewProvider {
 		await this.showStaticHtmlScreen(noChangesHtmlPath, backupNoChangesHtml, 'no changes');
 	}
 
+	public async showCancelledScreen() {
+		const cancelledHtmlPath = 'cancelled-screen.html';
+		const backupCancelledHtml = '<div style="padding: 20px; text-align: center; color: var(--vscode-foreground);">DiffGraph generation cancelled.</div>';
+		await this.showStaticHtmlScreen(cancelledHtmlPath, backupCancelledHtml, 'cancelled');
+	}
+
 	/**
 	 * Shows the diff graph by loading HTML content from the specified file path
 	 * @param htmlPath - Path to the HTML file to display
+	 * @param documentPath - The graph's split document, loaded instead when split assets are enabled
 	 */
-	public async showDiffGraph(htmlPath: string) {
+	public async showDiffGraph(htmlPath: string, documentPath?: string) {
 		try {
 			if (!fs.existsSync(htmlPath)) {
 				throw new Error(`HTML file not found: ${htmlPath}`);
 			}
-
-			const htmlContent = await fs.promises.readFile(htmlPath, 'utf8');
+			this._shown = { kind: 'graph', htmlPath, documentPath };
 
 			// Update localResourceRoots to include the HTML file's directory
 			if (this._view) {
 				const htmlDir = vscode.Uri.file(path.dirname(htmlPath));
-				this._view.webview.options = {
-					enableScripts: true,
-					localResourceRoots: [this._extensionUri, htmlDir]
-				};
+				const roots = this._view.webview.options.localResourceRoots ?? [];
+				// Assigning options reloads the webview, so only do it when the roots change
+				if (!roots.some(root => root.fsPath === htmlDir.fsPath)) {
+					this.resetShell();
+					this._view.webview.options = {
+						enableScripts: true,
+						localResourceRoots: [...this.baseResourceRoots(), htmlDir]
+					};
+				}
 			}
 
-			this.update(htmlContent);
+			// Identifies the content, since a regenerated graph can reuse the path
+			const key = `${htmlPath}:${(await fs.promises.stat(htmlPath)).mtimeMs}`;
+			const split = this.splitDocument(documentPath);
+			if (this._view && this.shellEnabled && this._shellReady && this._resident.includes(key)) {
+				this.showResident(this._view, key);
+			} else if (this._view && this.shellEnabled) {
+				const webview = this._view.webview;
+				const chunks = split ? split.assets.resolve(readChunks(split.documentPath), assetPath => this.assetUri(webview, assetPath)) : readChunks(htmlPath);
+				// Not awaited: the shell only loads once the view is visible
+				this.streamDiffGraph(this._view, chunks, key).catch(error => {
+					vscode.window.showErrorMessage(`Failed to show diff graph: ${error.message}`);
+				});
+			} else if (this._view && split) {
+				const webview = this._view.webview;
+				let document = '';
+				for await (const text of split.assets.resolve(readChunks(split.documentPath), assetPath => this.assetUri(webview, assetPath))) {
+					document += text;
+				}
+				this.update(document);
+			} else {
+				this.update(await fs.promises.readFile(htmlPath, 'utf8'));
+			}
 
 			// Reveal the view if it's not visible
 			if (this._view && !this._view.visible) {
@@ -105,4 +167,177 @@ export class DiffGraphViewProvider implements vscode.WebviewViewProvider {
 			vscode.window.showErrorMessage(`Failed to show diff graph: ${error.message}`);
 		}
 	}
+
+	private get shellEnabled(): boolean {
+		return vscode.workspace.getConfiguration('wildestai.diffGraph').get<boolean>('streaming', true);
+	}
+
+	/**
+	 * Forget the shell and its resident graphs, after the webview document was replaced
+	 */
+	private resetShell(): void {
+		this._shellReady = undefined;
+		this._resolveShellReady = undefined;
+		this._resident = [];
+	}
+
+	/**
+	 * The shell posts `ready` whenever it loads. Unless we are waiting for a shell we just set,
+	 * VS Code reloaded it, e.g. when a view whose context is not retained is shown again:
+	 * its frames are gone, so the graph or screen shown last is streamed again.
+	 */
+	private onShellReady(view: vscode.WebviewView): void {
+		if (this._view !== view) {
+			return;
+		}
+		if (this._resolveShellReady) {
+			this._resolveShellReady();
+			this._resolveShellReady = undefined;
+			return;
+		}
+		this._shellReady = Promise.resolve();
+		this._resident = [];
+		this.showAgain();
+	}
+
+	/**
+	 * Show the graph or screen shown last, if any
+	 */
+	private showAgain(): void {
+		const shown = this._shown;
+		if (shown?.kind === 'screen') {
+			this.showScreen(shown.html);
+		} else if (shown && fs.existsSync(shown.htmlPath)) {
+			this.showDiffGraph(shown.htmlPath, shown.documentPath);
+		}
+	}
+
+	/**
+	 * Show a screen (loading, no changes, ...) in the shell's screen frame, keeping resident graphs
+	 */
+	private showScreen(htmlContent: string): void {
+		this._shown = { kind: 'screen', html: htmlContent };
+		if (!this._view || !this.shellEnabled) {
+			this.update(htmlContent);
+			return;
+		}
+		// Not awaited: the shell only loads once the view is visible
+		this.streamDiffGraph(this._view, chunksOf(htmlContent)).catch(error => {
+			console.error('WildestAI: Failed to show DiffGraph screen:', error);
+		});
+	}
+
+	/**
+	 * Bring back a resident graph by switching frames, keeping its scroll and zoom state
+	 */
+	private showResident(view: vscode.WebviewView, key: string): void {
+		const id = ++this._streamId;
+		this._resident = this._resident.filter(resident => resident !== key).concat(key);
+		view.webview.postMessage({ type: 'show', id, key });
+		view.show?.(true);
+	}
+
+	/**
+	 * Mark a fully written graph as resident, evicting the least recently shown beyond the cap
+	 */
+	private makeResident(view: vscode.WebviewView, key: string): void {
+		const cap = Math.max(1, vscode.workspace.getConfiguration('wildestai.diffGraph').get<number>('residentGraphs', 5));
+		this._resident = this._resident.filter(resident => resident !== key).concat(key);
+		const evicted = this._resident.splice(0, Math.max(0, this._resident.length - cap));
+		if (evicted.length > 0) {
+			view.webview.postMessage({ type: 'evict', keys: evicted });
+		}
+	}
+
+	private baseResourceRoots(): vscode.Uri[] {
+		return this._assets ? [this._extensionUri, vscode.Uri.file(this._assets.assetsDir)] : [this._extensionUri];
+	}
+
+	/**
+	 * The split document to load instead of the generated one, or undefined to load it whole
+	 */
+	private splitDocument(documentPath: string | undefined): { assets: DiffGraphAssets; documentPath: string } | undefined {
+		const enabled = vscode.workspace.getConfiguration('wildestai.diffGraph').get<boolean>('splitAssets', true);
+		if (!enabled || !this._assets || !documentPath || !fs.existsSync(documentPath)) {
+			return undefined;
+		}
+		return { assets: this._assets, documentPath };
+	}
+
+	private assetUri(webview: vscode.Webview, assetPath: string): string {
+		return webview.asWebviewUri(vscode.Uri.file(assetPath)).toString();
+	}
+
+	/**
+	 * Load the shell document (media/diffgraph) unless it is already shown
+	 */
+	private loadShell(view: vscode.WebviewView): Promise<void> {
+		if (!this._shellReady) {
+			this._shellReady = new Promise(resolve => { this._resolveShellReady = resolve; });
+			view.webview.html = this.getShellHtml(view.webview);
+		}
+		return this._shellReady;
+	}
+
+	/**
+	 * Show a generated DiffGraph by posting its HTML to the shell in chunks as it is read
+	 * The shell writes the chunks into a frame, so the graph starts rendering before the
+	 * whole file is read and parsed, and the extension host never holds the whole file.
+	 * Graphs with a key stay resident in the shell once written; screens have none.
+	 */
+	private async streamDiffGraph(view: vscode.WebviewView, chunks: AsyncIterable<string>, key?: string): Promise<void> {
+		const id = ++this._streamId;
+		const ready = this.loadShell(view);
+		view.show?.(true);
+		await ready;
+		if (id !== this._streamId) {
+			return;
+		}
+
+		await view.webview.postMessage({ type: 'begin', id, key });
+		for await (const text of chunks) {
+			// Superseded by another graph or screen; leaving the loop closes the file
+			if (id !== this._streamId || this._view !== view) {
+				return;
+			}
+			await view.webview.postMessage({ type: 'chunk', id, text });
+		}
+		await view.webview.postMessage({ type: 'end', id });
+		if (key && this._view === view) {
+			this.makeResident(view, key);
+		}
+	}
+
+	private getShellHtml(webview: vscode.Webview): string {
+		const mediaUri = vscode.Uri.joinPath(this._extensionUri, 'media', 'diffgraph');
+		if (this._shellTemplate === undefined) {
+			this._shellTemplate = fs.readFileSync(vscode.Uri.joinPath(mediaUri, 'index.html').fsPath, 'utf8');
+		}
+		let html = this._shellTemplate;
+
+		// Patch the paths in the HTML file
+		html = html.replace('"main.js"', `"${webview.asWebviewUri(vscode.Uri.joinPath(mediaUri, 'main.js')).toString()}"`);
+		html = html.replace('"style.css"', `"${webview.asWebviewUri(vscode.Uri.joinPath(mediaUri, 'style.css')).toString()}"`);
+
+		// No CSP: the frame's document inherits it, and generated graphs rely on inline scripts and styles
+		return html;
+	}
+}
+
+/**
+ * Read a file in chunks, opening it only once the first chunk is wanted
+ */
+async function* readChunks(filePath: string): AsyncIterable<string> {
+	const stream = fs.createReadStream(filePath, { encoding: 'utf8', highWaterMark: STREAM_CHUNK_SIZE });
+	try {
+		yield* stream;
+	} finally {
+		stream.destroy();
+	}
+}
+
+async function* chunksOf(text: string): AsyncIterable<string> {
+	for (let i = 0; i < text.length; i += STREAM_CHUNK_SIZE) {
+		yield text.substring(i, i + STREAM_CHUNK_SIZE);
+	}
 }
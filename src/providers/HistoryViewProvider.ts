@@ -2,18 +2,69 @@ import * as vscode from 'vscode';
 import * as path from 'path';
 import { GitService } from '../services/GitService';
 import { CliService } from '../services/CliService';
-import { GitCommit, GitGraphNode, CliCommand } from '../utils/types';
+import { GitCommit, CliCommand, HistoryGraphRow } from '../utils/types';
 import { GitHistoryCache } from '../services/GitHistoryCache';
+import { HistoryLaneEngine } from '../utils/HistoryLanes';
+import { diffHistory, encodeHistoryPage } from '../utils/HistoryWire';
+
+/** Commits fetched per page of history */
+const HISTORY_PAGE_SIZE = 100;
+
+/** Size of the lane color palette in media/history/main.js */
+const LANE_COLOR_COUNT = 5;
+
+/** History loaded so far; later pages continue below the loaded commits */
+interface LoadedHistory {
+	repoRoot: string;
+	/** Parents of loaded commits that are not loaded yet, where the next page starts; new commits don't shift it */
+	frontier: Set<string>;
+	commits: GitCommit[];
+	rows: HistoryGraphRow[];
+	/** Lane state after the last loaded page, so later pages continue the graph */
+	lanes: HistoryLaneEngine;
+	hasMore: boolean;
+}
+
+/** What the webview currently shows, so refreshes can be sent as deltas */
+interface ShownHistory {
+	repoRoot: string;
+	commits: GitCommit[];
+	rows: HistoryGraphRow[];
+	hasMore: boolean;
+	/** Number of the message that made the webview show this; deltas apply on top of it */
+	seq: number;
+}
+
+/**
+ * Move the frontier of a loaded history past a page read from it, returning the page
+ * A page lists children before parents, so its commits leave the frontier and their
+ * parents join it until they are loaded too.
+ */
+function continueFrom(frontier: Set<string>, page: GitCommit[]): GitCommit[] {
+	for (const commit of page) {
+		frontier.delete(commit.hash);
+		commit.parents.forEach(parent => frontier.add(parent));
+	}
+	return page;
+}
 
 export class HistoryViewProvider implements vscode.WebviewViewProvider {
 	public static readonly viewType = 'wildestai.historyView';
 	private _view?: vscode.WebviewView;
 	private _currentRepoRoot?: string;
+	private _history?: LoadedHistory;
+	private _shown?: ShownHistory;
+	/** Contents of media/history/index.html, read on first use */
+	private _htmlTemplate?: string;
+	private _loadingMore = false;
+	/** Number of the last history message; starts from the clock so state restored from an earlier session never matches */
+	private _seq = Date.now();
 
 	constructor(
 		private readonly _extensionUri: vscode.Uri,
 		private readonly _context: vscode.ExtensionContext,
-		private readonly _onCommitClicked: (commitHash: string, repoPath: string) => Promise<void>
+		private readonly _onCommitClicked: (commitHash: string, repoPath: string) => Promise<void>,
+		private readonly _onHistoryLoaded?: (repoPath: string, commits: GitCommit[]) => void
 	) { }
 
 	public resolveWebviewView(
@@ -27,8 +78,22 @@ export class HistoryViewProvider implements vscode.WebviewViewProvider {
 			localResourceRoots: [this._extensionUri]
 		};
 
-		// Initialize webview HTML shell
-		webviewView.webview.html = this.getHtmlForWebview(webviewView.webview, '');
+		// Set the HTML shell once; everything after this is sent as messages
+		webviewView.webview.html = this.getHtmlForWebview(webviewView.webview);
+		this._shown = undefined;
+		this.postSettings();
+
+		const configListener = vscode.workspace.onDidChangeConfiguration(e => {
+			if (e.affectsConfiguration('wildestai.history')) {
+				this.postSettings();
+			}
+		});
+		webviewView.onDidChangeVisibility(() => {
+			if (webviewView.visible && !this._shown) {
+				this.showLoadedHistory();
+			}
+		});
+		webviewView.onDidDispose(() => configListener.dispose());
 
 		// Set up message handling from webview
 		webviewView.webview.onDidReceiveMessage(async (message) => {
@@ -36,6 +101,10 @@ export class HistoryViewProvider implements vscode.WebviewViewProvider {
 				await this._onCommitClicked(message.commitHash, message.repoPath);
 			} else if (message.command === 'refresh') {
 				await this.refresh();
+			} else if (message.command === 'loadMore') {
+				await this.loadMoreHistory();
+			} else if (message.command === 'ready' || message.command === 'resync') {
+				this.resync(message.seq, message.count);
 			}
 		});
 
@@ -55,6 +124,17 @@ export class HistoryViewProvider implements vscode.WebviewViewProvider {
 		}
 	}
 
+	/**
+	 * Send the rendering settings the webview reads from `wildestai.history.*`
+	 */
+	private postSettings(): void {
+		const config = vscode.workspace.getConfiguration('wildestai.history');
+		this._view?.webview.postMessage({
+			type: 'settings',
+			graphRenderer: config.get<'canvas' | 'svg'>('graphRenderer', 'canvas')
+		});
+	}
+
 	private async loadGitHistory(): Promise<void> {
 		if (!this._view) {
 			return;
@@ -71,41 +151,34 @@ export class HistoryViewProvider implements vscode.WebviewViewProvider {
 			}
 
 			const repoRoot = repositories[0].repoRoot;
-			const repoName = path.basename(repoRoot);
 
-			// Ensure HTML shell is set (idempotent)
-			this._view.webview.html = this.getHtmlForWebview(this._view.webview, repoName);
+			// Pages loaded before are loaded again, so a refresh doesn't cut the list back to the first page
+			const loaded = this._history?.repoRoot === repoRoot ? this._history.commits.length : 0;
 
-			// Check cache and show cached data immediately if available
-			const cached = GitHistoryCache.getCached(repoRoot);
+			// Check cache and show cached data immediately if nothing is shown yet
+			const cached = loaded === 0 ? GitHistoryCache.getCached(repoRoot) : null;
 			if (cached) {
-				const graphData = this.buildGraphData(cached.commits, cached.graphLines);
-				this._view.webview.postMessage({
-					type: 'commits',
-					commits: graphData.map(node => ({
-						...node.commit,
-						color: node.color
-					})),
-					graphLines: cached.graphLines,
-					repoPath: repoRoot,
-					repoName
-				});
+				// Paging continues once the fresh first page is in
+				this.showHistory(repoRoot, cached.commits, new HistoryLaneEngine(LANE_COLOR_COUNT).append(cached.commits), false);
 			}
 
 			// Always fetch fresh data
-			const { commits, graphLines } = await this.getGitCommits(repoRoot);
+			const commits = await this.readPage(repoRoot, ['HEAD']);
+			GitHistoryCache.update(repoRoot, commits);
+			const frontier = new Set<string>();
+			continueFrom(frontier, commits);
+			while (frontier.size > 0 && commits.length < loaded) {
+				const page = await this.readPage(repoRoot, [...frontier]);
+				commits.push(...continueFrom(frontier, page));
+			}
 
-			const graphData = this.buildGraphData(commits, graphLines);
-			this._view.webview.postMessage({
-				type: 'commits',
-				commits: graphData.map(node => ({
-					...node.commit,
-					color: node.color
-				})),
-				graphLines,
-				repoPath: repoRoot,
-				repoName
-			});
+			const lanes = new HistoryLaneEngine(LANE_COLOR_COUNT);
+			const rows = lanes.append(commits);
+			const hasMore = frontier.size > 0;
+			this._history = { repoRoot, frontier, commits, rows, lanes, hasMore };
+
+			this.showHistory(repoRoot, commits, rows, hasMore);
+			this._onHistoryLoaded?.(repoRoot, commits.slice(0, HISTORY_PAGE_SIZE));
 		} catch (error: any) {
 			this._view.webview.postMessage({ type: 'error', message: error.message ?? String(error) });
 		} finally {
@@ -114,62 +187,220 @@ export class HistoryViewProvider implements vscode.WebviewViewProvider {
 		}
 	}
 
-	private async getGitCommits(repoPath: string): Promise<{ commits: GitCommit[], graphLines: string[] }> {
-		try {
-			// Always fetch fresh data
-			const args = ['log', '--graph', '-n', '50', '--pretty=format:%H|%h|%an|%ae|%ad|%s|%P|%D'];
-			const command = CliService.setupCommand(args, this._context);
-			const { stdout } = await CliService.execute(command, repoPath);
-			const result = this.parseGitGraphLog(stdout);
+	/**
+	 * Show a history in the webview, sending only what differs from the history it shows now
+	 * Nothing is sent while the view is hidden, since the webview may not get it; it is
+	 * sent in full once the view is shown again.
+	 */
+	private showHistory(repoRoot: string, commits: GitCommit[], rows: HistoryGraphRow[], hasMore: boolean): void {
+		if (!this._view) {
+			return;
+		}
+		if (!this._view.visible) {
+			this._shown = undefined;
+			return;
+		}
+		const shown = this._shown;
+		const delta = shown?.repoRoot === repoRoot ? diffHistory(shown.commits, shown.rows, commits, rows) : undefined;
+
+		if (!delta) {
+			const seq = ++this._seq;
+			this._shown = { repoRoot, commits: [...commits], rows: [...rows], hasMore, seq };
+			this.postHistory({
+				type: 'commits',
+				seq,
+				page: encodeHistoryPage(commits, rows, 0),
+				repoPath: repoRoot,
+				repoName: path.basename(repoRoot),
+				hasMore
+			});
+			return;
+		}
 
-			// Update cache with fresh data
-			GitHistoryCache.update(repoPath, result.commits, result.graphLines);
+		const { prepended, kept, changed } = delta;
+		const unchanged = prepended === 0 && changed.length === 0 && kept === shown!.commits.length && kept === commits.length;
+		if (unchanged && hasMore === shown!.hasMore) {
+			return;
+		}
+		const seq = ++this._seq;
+		this._shown = { repoRoot, commits: [...commits], rows: [...rows], hasMore, seq };
+		const tail = prepended + kept;
+		this.postHistory({
+			type: 'historyDelta',
+			seq,
+			base: shown!.seq,
+			prepend: encodeHistoryPage(commits.slice(0, prepended), rows.slice(0, prepended), 0),
+			kept,
+			patches: changed.map(index => ({ index, refs: commits[index].refs, row: rows[index] })),
+			tail: encodeHistoryPage(commits.slice(tail), rows.slice(tail), tail),
+			hasMore
+		});
+	}
+
+	/**
+	 * Post a numbered history message, forgetting what is shown if the webview did not get it
+	 */
+	private postHistory(message: { type: string; seq: number; [key: string]: unknown }): void {
+		this._view?.webview.postMessage(message).then(delivered => {
+			if (!delivered && this._shown?.seq === message.seq) {
+				this._shown = undefined;
+			}
+		});
+	}
+
+	/**
+	 * Show the loaded history in full
+	 */
+	private showLoadedHistory(): void {
+		const history = this._history;
+		if (history) {
+			this.showHistory(history.repoRoot, history.commits, history.rows, history.hasMore);
+		}
+	}
 
-			return result;
+	/**
+	 * Send the loaded history in full unless the webview shows what was last sent
+	 * The webview reports the number of the last history message it applied when it loads,
+	 * e.g. after a hidden view was reloaded from its saved state, and when a message
+	 * doesn't apply on top of what it shows.
+	 * @param count - Commits shown; saved state keeps only the first page, the rest is sent again on loadMore
+	 */
+	private resync(seq: number | undefined, count?: number): void {
+		const shown = this._shown;
+		if (shown && shown.seq === seq) {
+			if (count !== undefined && count < shown.commits.length) {
+				shown.commits = shown.commits.slice(0, count);
+				shown.rows = shown.rows.slice(0, count);
+				shown.hasMore = true;
+			}
+			return;
+		}
+		this._shown = undefined;
+		this.showLoadedHistory();
+	}
+
+	/**
+	 * Load the next page of history and append it in the webview
+	 */
+	private async loadMoreHistory(): Promise<void> {
+		const history = this._history;
+		if (!this._view || !history || this._loadingMore) {
+			return;
+		}
+		const shown = this._shown;
+		if (this._view.visible && shown?.repoRoot === history.repoRoot && shown.commits.length < history.commits.length) {
+			// Restored from saved state; send the next of the pages loaded before
+			const start = shown.commits.length;
+			const end = Math.min(start + HISTORY_PAGE_SIZE, history.commits.length);
+			this.appendShown(history.commits.slice(start, end), history.rows.slice(start, end), end < history.commits.length || history.hasMore);
+			return;
+		}
+		if (!history.hasMore) {
+			return;
+		}
+
+		this._loadingMore = true;
+		try {
+			const commits = await this.readPage(history.repoRoot, [...history.frontier]);
+			if (this._history !== history) {
+				// Refreshed while the page was loading
+				return;
+			}
+			const start = history.commits.length;
+			const rows = history.lanes.append(continueFrom(history.frontier, commits));
+			history.commits.push(...commits);
+			history.rows.push(...rows);
+			history.hasMore = history.frontier.size > 0;
+
+			const shown = this._shown;
+			if (!this._view.visible || shown?.repoRoot !== history.repoRoot || shown.commits.length !== start) {
+				// Not showing the pages loaded before; send the difference to what it shows
+				this.showLoadedHistory();
+				return;
+			}
+			this.appendShown(commits, rows, history.hasMore);
 		} catch (error: any) {
-			throw new Error(`Failed to get git history: ${error.message}`);
+			vscode.window.showErrorMessage(error.message ?? String(error));
+			this._view.webview.postMessage({ type: 'appendCommits', hasMore: false });
+		} finally {
+			this._loadingMore = false;
 		}
 	}
 
-	private parseGitGraphLog(gitOutput: string): { commits: GitCommit[], graphLines: string[] } {
-		const commits: GitCommit[] = [];
-		const graphLines: string[] = [];
-		const lines = gitOutput.split('\n');
+	/**
+	 * Append commits below the ones the webview shows
+	 */
+	private appendShown(commits: GitCommit[], rows: HistoryGraphRow[], hasMore: boolean): void {
+		const shown = this._shown!;
+		const start = shown.commits.length;
+		const seq = ++this._seq;
+		const base = shown.seq;
+		shown.commits.push(...commits);
+		shown.rows.push(...rows);
+		shown.hasMore = hasMore;
+		shown.seq = seq;
+		this.postHistory({
+			type: 'appendCommits',
+			seq,
+			base,
+			page: encodeHistoryPage(commits, rows, start),
+			hasMore
+		});
+	}
 
-		for (const line of lines) {
-			// Extract graph part (everything before the commit hash)
-			const commitMatch = line.match(/^(.*?)([a-f0-9]{40}\|.*)/);
-			if (commitMatch) {
-				const [, graphPart, commitPart] = commitMatch;
-				graphLines.push(graphPart);
-
-				// Parse commit data
-				const parts = commitPart.split('|');
-				if (parts.length >= 7) {
-					// Take first 5 tokens as fixed fields (to avoid issues if subject contains '|')
-					const [hash, shortHash, author, email, date, ...rest] = parts;
-					// Take last two elements as parents and refs
-					const refs = rest.pop() || '';
-					const parents = rest.pop() || '';
-					// Join remaining elements back into subject (in case subject contained '|')
-					const subject = rest.join('|');
-
-					commits.push({
-						hash: hash.trim(),
-						shortHash: shortHash.trim(),
-						author: author.trim(),
-						email: email.trim(),
-						date: new Date(date.trim()),
-						message: subject.trim(),
-						subject: subject.trim(),
-						parents: parents ? parents.trim().split(' ').filter(p => p) : [],
-						refs: refs ? refs.trim().split(', ').filter(r => r) : []
-					});
+	/**
+	 * Read one page of history, in topological order, from the given commits down
+	 * Later pages start from the frontier of the loaded commits rather than skipping them,
+	 * and `-n` keeps git from listing more than the page.
+	 */
+	private async readPage(repoPath: string, from: string[]): Promise<GitCommit[]> {
+		const commits: GitCommit[] = [];
+		try {
+			const args = ['log', '--topo-order', '-n', String(HISTORY_PAGE_SIZE), '--pretty=format:%H|%h|%an|%ae|%ad|%s|%P|%D', ...from];
+			const command = CliService.setupCommand(args, this._context);
+			for await (const line of CliService.stream(command, repoPath)) {
+				const commit = line.stream === 'stdout' ? this.parseGitLogLine(line.text) : undefined;
+				if (commit) {
+					commits.push(commit);
 				}
 			}
+		} catch (error: any) {
+			throw new Error(`Failed to get git history: ${error.message}`);
 		}
+		return commits;
+	}
 
-		return { commits, graphLines };
+	/**
+	 * Parse one line of `log` output, or return undefined if it holds no commit
+	 */
+	private parseGitLogLine(line: string): GitCommit | undefined {
+		if (!/^[a-f0-9]{40}\|/.test(line)) {
+			return undefined;
+		}
+
+		const parts = line.split('|');
+		if (parts.length < 7) {
+			return undefined;
+		}
+		// Take first 5 tokens as fixed fields (to avoid issues if subject contains '|')
+		const [hash, shortHash, author, email, date, ...rest] = parts;
+		// Take last two elements as parents and refs
+		const refs = rest.pop() || '';
+		const parents = rest.pop() || '';
+		// Join remaining elements back into subject (in case subject contained '|')
+		const subject = rest.join('|');
+
+		return {
+			hash: hash.trim(),
+			shortHash: shortHash.trim(),
+			author: author.trim(),
+			email: email.trim(),
+			date: new Date(date.trim()),
+			message: subject.trim(),
+			subject: subject.trim(),
+			parents: parents ? parents.trim().split(' ').filter(p => p) : [],
+			refs: refs ? refs.trim().split(', ').filter(r => r) : []
+		};
 	}
 
 	private parseGitLog(gitOutput: string): GitCommit[] {
@@ -206,54 +437,18 @@ export class HistoryViewProvider implements vscode.WebviewViewProvider {
 		return commits;
 	}
 
-	private buildGraphData(commits: GitCommit[], graphLines: string[]): GitGraphNode[] {
-		const colors = ['#007acc', '#f44747', '#ffcc00', '#00aa00', '#aa00ff', '#ff6600', '#00aaaa'];
-
-		return commits.map((commit, index) => {
-			const graphLine = graphLines[index] || '';
-			const branchPosition = this.calculateBranchPosition(graphLine);
-
-			return {
-				commit,
-				x: branchPosition.x,
-				color: colors[branchPosition.branch % colors.length],
-				connections: branchPosition.connections
-			};
-		});
-	}
-
-	private calculateBranchPosition(graphLine: string): { x: number, branch: number, connections: any[] } {
-		// Analyze git graph symbols to determine branch position
-		const cleanLine = graphLine.replace(/\s/g, '');
-		let x = 0;
-		let branch = 0;
-
-		// Find the commit position (marked by * or |)
-		for (let i = 0; i < cleanLine.length; i++) {
-			const char = cleanLine[i];
-			if (char === '*') {
-				x = i * 20; // Position in pixels
-				branch = i;
-				break;
-			} else if (char === '|' && i === 0) {
-				x = i * 20;
-				branch = i;
-				break;
-			}
+	private getHtmlForWebview(webview: vscode.Webview): string {
+		if (this._htmlTemplate === undefined) {
+			const htmlPath = vscode.Uri.joinPath(this._extensionUri, 'media', 'history', 'index.html');
+			this._htmlTemplate = require('fs').readFileSync(htmlPath.fsPath, 'utf8') as string;
 		}
-
-		return { x, branch, connections: [] };
-	}
-
-	private getHtmlForWebview(webview: vscode.Webview, repoName: string): string {
-		const htmlPath = vscode.Uri.joinPath(this._extensionUri, 'media', 'history', 'index.html');
-		let html = require('fs').readFileSync(htmlPath.fsPath, 'utf8');
+		let html = this._htmlTemplate;
 
 		const scriptUri = webview.asWebviewUri(vscode.Uri.joinPath(this._extensionUri, 'media', 'history', 'main.js'));
 		const styleUri = webview.asWebviewUri(vscode.Uri.joinPath(this._extensionUri, 'media', 'history', 'style.css'));
 
 		// Patch the paths in the HTML file
-		html = html.replace('main.js', scriptUri.toString());
+		html = html.replace('"main.js"', `"${scriptUri.toString()}"`);
 		html = html.replace('style.css', styleUri.toString());
 
 		// Inject CSP meta tag (important for Webview security)
@@ -0,0 +1,104 @@
+import { CliPhaseTiming, CliProgressEvent } from '../utils/types';
+
+/** File descriptor wild writes progress events to, advertised via WILD_PROGRESS_FD */
+export const PROGRESS_FD = 3;
+
+/**
+ * Parse one line of the progress channel, ignoring anything that is not a progress event
+ */
+export function parseProgressEvent(line: string): CliProgressEvent | undefined {
+	if (!line.startsWith('{')) {
+		return undefined;
+	}
+	try {
+		const event = JSON.parse(line);
+		if (event && (event.event === 'phase' || event.event === 'progress' || event.event === 'done')) {
+			return event as CliProgressEvent;
+		}
+	} catch {
+		// Not JSON
+	}
+	return undefined;
+}
+
+/**
+ * Turns progress events into vscode.Progress reports and records how long each phase took
+ */
+export class CliProgressTracker {
+	private _percent = 0;
+	private _phase?: { name: string; startedAt: number };
+	private _timings: CliPhaseTiming[] = [];
+
+	/**
+	 * Apply an event and return what to report, with increment as the delta since the last report
+	 */
+	public handle(event: CliProgressEvent, now: number = Date.now()): { message?: string; increment?: number } {
+		if (event.event === 'done') {
+			this.finish(now);
+			return { increment: Math.max(0, 100 - this._percent) };
+		}
+
+		if (event.phase && event.phase !== this._phase?.name) {
+			this.endPhase(now);
+			this._phase = { name: event.phase, startedAt: now };
+		}
+
+		let increment: number | undefined;
+		if (typeof event.percent === 'number') {
+			const percent = Math.min(100, Math.max(this._percent, event.percent));
+			increment = percent - this._percent;
+			this._percent = percent;
+		}
+
+		return { message: this.formatMessage(event), increment: increment || undefined };
+	}
+
+	/**
+	 * Close the current phase, e.g. once the process has exited
+	 */
+	public finish(now: number = Date.now()): void {
+		this.endPhase(now);
+	}
+
+	/**
+	 * Completed phases in the order they ran
+	 */
+	public get timings(): CliPhaseTiming[] {
+		return [...this._timings];
+	}
+
+	private endPhase(now: number): void {
+		if (this._phase) {
+			this._timings.push({ phase: this._phase.name, durationMs: now - this._phase.startedAt });
+			this._phase = undefined;
+		}
+	}
+
+	private formatMessage(event: CliProgressEvent): string {
+		const parts: string[] = [];
+		const phase = event.phase ?? this._phase?.name;
+		if (phase) {
+			parts.push(phase);
+		}
+		if (typeof event.filesTotal === 'number') {
+			parts.push(`${event.filesDone ?? 0}/${event.filesTotal} files`);
+		}
+		if (event.message) {
+			parts.push(event.message);
+		}
+		return parts.join(' | ');
+	}
+}
+
+/**
+ * Format phase timings for the output channel, e.g. `parse 12.3s, analyze 1m 20s`
+ */
+export function formatPhaseTimings(timings: CliPhaseTiming[]): string {
+	return timings.map(({ phase, durationMs }) => {
+		const seconds = durationMs / 1000;
+		const duration = seconds < 60
+			? `${seconds.toFixed(1)}s`
+			: `${Math.floor(seconds / 60)}m ${Math.round(seconds % 60)}s`;
+		return `${phase} ${duration}`;
+	}).join(', ');
+}
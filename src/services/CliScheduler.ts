@@ -0,0 +1,145 @@
+import * as vscode from 'vscode';
+import * as os from 'os';
+import { CliPriority, CliQueueOrder, CliSchedulerOptions } from '../utils/types';
+
+interface QueuedJob {
+	start: () => void;
+	cancel: () => void;
+}
+
+/** Priority classes, highest first */
+const PRIORITIES: CliPriority[] = ['foreground', 'background', 'idle'];
+
+/**
+ * Limits how many wild processes run at once across all repositories and commits
+ * Pending jobs are started by priority class (foreground before background before idle),
+ * and within a class in FIFO or LIFO order. LIFO serves the most recent click first.
+ */
+export class CliScheduler {
+	private _maxParallelism: number;
+	private _order: CliQueueOrder;
+	private _queues: Record<CliPriority, QueuedJob[]> = { foreground: [], background: [], idle: [] };
+	private _running: Record<CliPriority, number> = { foreground: 0, background: 0, idle: 0 };
+	private _onDidChange = new vscode.EventEmitter<void>();
+
+	/** Fires whenever a job starts or finishes */
+	public readonly onDidChange: vscode.Event<void> = this._onDidChange.event;
+
+	constructor(options: Partial<CliSchedulerOptions> = {}) {
+		this._maxParallelism = CliScheduler.resolveParallelism(options.maxParallelism);
+		this._order = options.order ?? 'lifo';
+	}
+
+	/**
+	 * Update the limits; newly allowed jobs start immediately
+	 */
+	public configure(options: Partial<CliSchedulerOptions>): void {
+		if (options.maxParallelism !== undefined) {
+			this._maxParallelism = CliScheduler.resolveParallelism(options.maxParallelism);
+		}
+		this._order = options.order ?? this._order;
+		this.drain();
+	}
+
+	/**
+	 * Run a task once a slot is free
+	 * Cancelling the token while the task is still queued removes it and rejects with vscode.CancellationError
+	 * @param onQueued - Called if the task has to wait for a slot
+	 */
+	public schedule<T>(
+		priority: CliPriority,
+		task: () => Promise<T>,
+		token?: vscode.CancellationToken,
+		onQueued?: () => void
+	): Promise<T> {
+		if (token?.isCancellationRequested) {
+			return Promise.reject(new vscode.CancellationError());
+		}
+
+		return new Promise<T>((resolve, reject) => {
+			let cancellation: vscode.Disposable | undefined;
+			const job: QueuedJob = {
+				start: () => {
+					cancellation?.dispose();
+					this._running[priority]++;
+					this._onDidChange.fire();
+					Promise.resolve()
+						.then(task)
+						.then(resolve, reject)
+						.finally(() => {
+							this._running[priority]--;
+							this._onDidChange.fire();
+							this.drain();
+						});
+				},
+				cancel: () => {
+					cancellation?.dispose();
+					reject(new vscode.CancellationError());
+				}
+			};
+
+			const queue = this._queues[priority];
+			queue.push(job);
+			cancellation = token?.onCancellationRequested(() => {
+				const index = queue.indexOf(job);
+				if (index !== -1) {
+					queue.splice(index, 1);
+					job.cancel();
+				}
+			});
+
+			this.drain();
+			if (queue.includes(job)) {
+				onQueued?.();
+			}
+		});
+	}
+
+	/**
+	 * Number of running jobs, optionally of one priority class
+	 */
+	public runningCount(priority?: CliPriority): number {
+		return priority ? this._running[priority] : PRIORITIES.reduce((sum, p) => sum + this._running[p], 0);
+	}
+
+	/**
+	 * Number of queued jobs, optionally of one priority class
+	 */
+	public pendingCount(priority?: CliPriority): number {
+		return priority ? this._queues[priority].length : PRIORITIES.reduce((sum, p) => sum + this._queues[p].length, 0);
+	}
+
+	public get maxParallelism(): number {
+		return this._maxParallelism;
+	}
+
+	private drain(): void {
+		while (this.runningCount() < this._maxParallelism) {
+			const job = this.nextJob();
+			if (!job) {
+				return;
+			}
+			job.start();
+		}
+	}
+
+	private nextJob(): QueuedJob | undefined {
+		for (const priority of PRIORITIES) {
+			const queue = this._queues[priority];
+			if (queue.length > 0) {
+				return this._order === 'lifo' ? queue.pop() : queue.shift();
+			}
+		}
+		return undefined;
+	}
+
+	/**
+	 * 0 or unset means one process per core
+	 */
+	private static resolveParallelism(maxParallelism?: number): number {
+		if (!maxParallelism || maxParallelism < 1) {
+			return Math.max(1, os.availableParallelism());
+		}
+		return Math.floor(maxParallelism);
+	}
+}
@@ -3,9 +3,27 @@ import * as cp from 'child_process';
 import * as os from 'os';
 import * as fs from 'fs';
 import * as path from 'path';
-import { CliCommand, CliOutput } from '../utils/types';
+import { Readable } from 'stream';
+import { CliCommand, CliExecuteOptions, CliLine, CliOutput, CliOutputSink, CliSchedulerOptions } from '../utils/types';
+import { AsyncQueue } from '../utils/AsyncQueue';
+import { CliExitError } from '../utils/CliExitError';
+import { LineSplitter } from '../utils/LineSplitter';
+import { RingBuffer } from '../utils/RingBuffer';
+import { CliScheduler } from './CliScheduler';
+import { CliProgressTracker, parseProgressEvent, PROGRESS_FD } from './CliProgress';
+import { WildDaemon, WildDaemonUnavailableError } from './WildDaemon';
+
+/** How long a cancelled process tree gets to exit after SIGTERM before it is killed */
+const KILL_GRACE_PERIOD_MS = 3000;
+
+/** Lines of output kept per stream for CliOutput, unless stdout is captured in full */
+const OUTPUT_TAIL_LINES = 500;
 
 export class CliService {
+	private static _running: Set<cp.ChildProcess> = new Set();
+	private static _scheduler = new CliScheduler();
+	private static _daemon?: WildDaemon;
+
 	public static setupCommand(args: string[] = [], context: vscode.ExtensionContext): CliCommand {
 		let env = Object.assign({}, process.env);
 		const isDevMode = process.env.WILDEST_DEV_MODE === '1' ||
@@ -18,16 +36,124 @@ export class CliService {
 		}
 	}
 
+	/**
+	 * Update the global limits on concurrent wild processes
+	 */
+	public static configureScheduler(options: Partial<CliSchedulerOptions>): void {
+		this._scheduler.configure(options);
+	}
+
+	/**
+	 * The scheduler all wild runs go through
+	 */
+	public static get scheduler(): CliScheduler {
+		return this._scheduler;
+	}
+
+	/**
+	 * Route runs of the daemon's executable through a persistent `wild serve` worker, or stop doing so
+	 * The previous daemon, if any, is shut down.
+	 */
+	public static setDaemon(daemon: WildDaemon | undefined): void {
+		this._daemon?.dispose();
+		this._daemon = daemon;
+	}
+
+	/**
+	 * Run wild once the scheduler has a free slot for the run's priority
+	 */
 	public static async execute(
 		command: CliCommand,
 		repoRoot: string,
-		progress?: vscode.Progress<{ message: string }>
+		progress?: vscode.Progress<{ message?: string; increment?: number }>,
+		options: CliExecuteOptions = {}
 	): Promise<CliOutput> {
-		let cliStdout = '', cliStderr = '';
+		return this._scheduler.schedule(
+			options.priority ?? 'foreground',
+			() => this.run(command, repoRoot, progress, options),
+			options.token,
+			() => progress?.report({ message: 'Waiting for other wild runs to finish…' })
+		);
+	}
+
+	/**
+	 * Run wild and iterate over its output lines as they arrive
+	 * The iterator throws if wild fails or is cancelled, after yielding the lines received until then.
+	 * Leaving the loop early kills the process.
+	 */
+	public static stream(
+		command: CliCommand,
+		repoRoot: string,
+		progress?: vscode.Progress<{ message?: string; increment?: number }>,
+		options: CliExecuteOptions = {}
+	): AsyncIterableIterator<CliLine> {
+		const source = new vscode.CancellationTokenSource();
+		const subscription = options.token?.onCancellationRequested(() => source.cancel());
+		const queue = new AsyncQueue<CliLine>(() => source.cancel());
+		this.execute(command, repoRoot, progress, {
+			...options,
+			token: source.token,
+			onLine: (line) => {
+				options.onLine?.(line);
+				queue.push(line);
+			}
+		}).then(() => queue.end(), (error) => queue.fail(error)).finally(() => {
+			subscription?.dispose();
+			source.dispose();
+		});
+		return queue;
+	}
+
+	private static async run(
+		command: CliCommand,
+		repoRoot: string,
+		progress: vscode.Progress<{ message?: string; increment?: number }> | undefined,
+		options: CliExecuteOptions
+	): Promise<CliOutput> {
+		if (options.token?.isCancellationRequested) {
+			throw new vscode.CancellationError();
+		}
+
+		const daemon = this._daemon;
+		if (daemon?.accepts(command)) {
+			let started = false;
+			try {
+				return await this.collect(progress, options, (sink) => daemon.run(command.args, repoRoot, {
+					line: (line) => { started = true; sink.line(line); },
+					progress: (event) => { started = true; sink.progress(event); }
+				}, options.token));
+			} catch (error) {
+				if (!(error instanceof WildDaemonUnavailableError)) {
+					throw error;
+				}
+				if (started) {
+					// Running it again would repeat the output already passed on
+					throw new Error(`${error.message} during the run`);
+				}
+				console.warn(`WildestAI: ${error.message}, spawning wild instead`);
+			}
+		}
+
+		return this.collect(progress, options, (sink) => this.spawn(command, repoRoot, sink, options.token));
+	}
+
+	/**
+	 * Buffer output and report progress for one run, whichever transport carries it
+	 */
+	private static async collect(
+		progress: vscode.Progress<{ message?: string; increment?: number }> | undefined,
+		options: CliExecuteOptions,
+		transport: (sink: CliOutputSink) => Promise<void>
+	): Promise<CliOutput> {
+		const stdoutTail = new RingBuffer<string>(OUTPUT_TAIL_LINES);
+		const stderrTail = new RingBuffer<string>(OUTPUT_TAIL_LINES);
+		const stdoutLines: string[] = [];
+		const tracker = new CliProgressTracker();
 		const startTime = Date.now();
 		let interval: NodeJS.Timeout | undefined = undefined;
 		let lastCliLine = '';
 
+		// Fallback for wild versions without structured progress; stopped at the first progress event
 		interval = setInterval(() => {
 			const elapsed = Math.floor((Date.now() - startTime) / 1000);
 			const mins = Math.floor(elapsed / 60);
@@ -37,42 +163,160 @@ export class CliService {
 			progress?.report({ message });
 		}, 1000);
 
+		const sink: CliOutputSink = {
+			line: (line) => {
+				if (options.captureStdout && line.stream === 'stdout') {
+					stdoutLines.push(line.text);
+				} else if (line.text.length > 0) {
+					// Blank lines are only kept in captured stdout, they would crowd out the tail
+					(line.stream === 'stderr' ? stderrTail : stdoutTail).push(line.text);
+				}
+				if (line.text.length > 0) {
+					lastCliLine = this.lastSegment(line.text);
+				}
+				options.onLine?.(line);
+			},
+			progress: (event) => {
+				if (interval) {
+					clearInterval(interval);
+					interval = undefined;
+				}
+				progress?.report(tracker.handle(event));
+			}
+		};
+
+		try {
+			await transport(sink);
+		} catch (error) {
+			if (error instanceof CliExitError) {
+				throw new CliExitError(error.exitCode, stderrTail.toArray().join('\n'));
+			}
+			throw error;
+		} finally {
+			if (interval) { clearInterval(interval); }
+			tracker.finish();
+		}
+
+		return {
+			stdout: (options.captureStdout ? stdoutLines : stdoutTail.toArray()).join('\n'),
+			stderr: stderrTail.toArray().join('\n'),
+			phases: tracker.timings
+		};
+	}
+
+	/**
+	 * Run wild as a child process, resolving when it exits successfully
+	 */
+	private static async spawn(
+		command: CliCommand,
+		repoRoot: string,
+		sink: CliOutputSink,
+		token?: vscode.CancellationToken
+	): Promise<void> {
+		let cancellation: vscode.Disposable | undefined;
+
 		try {
 			await new Promise((resolve, reject) => {
 				const child = cp.spawn(command.executable, command.args, {
 					cwd: repoRoot,
-					env: command.env
+					env: Object.assign({}, command.env, { WILD_PROGRESS_FD: String(PROGRESS_FD) }),
+					// Extra pipe for structured progress, see CliProgressEvent
+					stdio: ['pipe', 'pipe', 'pipe', 'pipe'],
+					// Own process group, so the whole tree can be killed on cancellation
+					detached: process.platform !== 'win32'
 				});
+				this._running.add(child);
 
-				child.stdout.setEncoding('utf8');
-				child.stderr.setEncoding('utf8');
-
-				child.stdout.on('data', (data: string) => {
-					cliStdout += data;
-					const lines = data.split(/\r?\n/).filter(Boolean);
-					if (lines.length > 0) {
-						lastCliLine = lines[lines.length - 1];
-					}
+				let cancelled = false;
+				cancellation = token?.onCancellationRequested(() => {
+					cancelled = true;
+					this.killProcessTree(child);
 				});
 
-				child.stderr.on('data', (data: string) => {
-					cliStderr += data;
-					const lines = data.split(/\r?\n/).filter(Boolean);
-					if (lines.length > 0) {
-						lastCliLine = lines[lines.length - 1];
+				const stdoutSplitter = new LineSplitter((text) => sink.line({ stream: 'stdout', text }));
+				const stderrSplitter = new LineSplitter((text) => sink.line({ stream: 'stderr', text }));
+				const progressSplitter = new LineSplitter((text) => {
+					const event = parseProgressEvent(text);
+					if (event) {
+						sink.progress(event);
 					}
 				});
 
-				child.on('error', reject);
+				child.stdout?.setEncoding('utf8');
+				child.stderr?.setEncoding('utf8');
+				child.stdout?.on('data', (data: string) => stdoutSplitter.push(data));
+				child.stderr?.on('data', (data: string) => stderrSplitter.push(data));
+
+				const progressPipe = child.stdio[PROGRESS_FD] as Readable | null | undefined;
+				progressPipe?.setEncoding('utf8');
+				progressPipe?.on('data', (data: string) => progressSplitter.push(data));
+				// The pipe closes with the process; errors on it must not fail the run
+				progressPipe?.on('error', () => { });
+
+				child.on('error', (error) => {
+					this._running.delete(child);
+					reject(error);
+				});
 				child.on('close', (code: number) => {
-					code === 0 ? resolve(undefined) : reject(new Error(`wild exited with code ${code}`));
+					this._running.delete(child);
+					stdoutSplitter.flush();
+					stderrSplitter.flush();
+					progressSplitter.flush();
+					if (cancelled) {
+						reject(new vscode.CancellationError());
+					} else {
+						code === 0 ? resolve(undefined) : reject(new CliExitError(code));
+					}
 				});
 			});
 		} finally {
-			if (interval) { clearInterval(interval); }
+			cancellation?.dispose();
+		}
+	}
+
+	/**
+	 * Progress bars redraw with `\r`; only the last redraw is worth showing
+	 */
+	private static lastSegment(line: string): string {
+		return line.substring(line.lastIndexOf('\r') + 1);
+	}
+
+	/**
+	 * Kill every wild process still running, e.g. when the extension is deactivated
+	 */
+	public static killAll(): void {
+		this.setDaemon(undefined);
+		for (const child of this._running) {
+			this.killProcessTree(child);
+		}
+	}
+
+	/**
+	 * Terminate a child and everything it spawned
+	 * POSIX: SIGTERM to the process group, then SIGKILL after a grace period.
+	 * Windows: taskkill /T walks the tree.
+	 */
+	private static killProcessTree(child: cp.ChildProcess): void {
+		const pid = child.pid;
+		if (pid === undefined || child.exitCode !== null || child.signalCode !== null) {
+			return;
 		}
 
-		return { stdout: cliStdout, stderr: cliStderr };
+		if (process.platform === 'win32') {
+			cp.execFile('taskkill', ['/pid', String(pid), '/T', '/F'], () => { });
+			return;
+		}
+
+		const killGroup = (signal: NodeJS.Signals) => {
+			try {
+				process.kill(-pid, signal);
+			} catch {
+				// Group already gone
+			}
+		};
+		killGroup('SIGTERM');
+		// Children may outlive the group leader, so escalate regardless of its exit
+		setTimeout(() => killGroup('SIGKILL'), KILL_GRACE_PERIOD_MS).unref();
 	}
 
 	private static getDevCommand(args: string[] = [], env: NodeJS.ProcessEnv): CliCommand {
@@ -0,0 +1,124 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as vscode from 'vscode';
+import { CliService } from './CliService';
+import { DiffService } from './DiffService';
+import { GitCommit } from '../utils/types';
+
+interface PrefetchItem {
+	repoRoot: string;
+	commitHash: string;
+}
+
+/**
+ * Warms the DiffGraph cache for the most recent commits shown in the History view
+ * One commit is generated at a time at idle priority. While foreground work is running
+ * or queued, the current prefetch is cancelled and retried later. Each history load gets
+ * a time budget (`wildestai.prefetch.budgetSeconds`) after which prefetching stops.
+ * Controlled by the `wildestai.prefetch.*` settings.
+ */
+export class CommitPrefetcher implements vscode.Disposable {
+	private _queue: PrefetchItem[] = [];
+	private _running?: { item: PrefetchItem; source: vscode.CancellationTokenSource };
+	/** Wall-clock time spent on prefetches since the queue was last replaced */
+	private _spentMs = 0;
+	private _subscription: vscode.Disposable;
+
+	constructor(
+		private readonly _context: vscode.ExtensionContext,
+		private readonly _diffService: DiffService
+	) {
+		this._subscription = CliService.scheduler.onDidChange(() => this.onSchedulerChange());
+	}
+
+	/**
+	 * Replace the queue with HEAD and the next commits of a freshly loaded history
+	 */
+	public prefetch(repoRoot: string, commits: GitCommit[]): void {
+		const config = vscode.workspace.getConfiguration('wildestai.prefetch');
+		if (!config.get<boolean>('enabled', false)) {
+			return;
+		}
+		const count = config.get<number>('commits', 5);
+
+		this._queue = commits
+			.slice(0, count)
+			.map(commit => ({ repoRoot, commitHash: commit.hash }));
+		this._spentMs = 0;
+
+		// Keep the current run if it is still wanted, otherwise make room for the new queue
+		const running = this._running;
+		if (running && !this._queue.some(item => item.commitHash === running.item.commitHash)) {
+			running.source.cancel();
+		}
+		this._queue = this._queue.filter(item => item.commitHash !== running?.item.commitHash);
+		this.pump();
+	}
+
+	public dispose(): void {
+		this._subscription.dispose();
+		this._queue = [];
+		this._running?.source.cancel();
+	}
+
+	private get foregroundBusy(): boolean {
+		const scheduler = CliService.scheduler;
+		return scheduler.runningCount('foreground') + scheduler.pendingCount('foreground') > 0;
+	}
+
+	private onSchedulerChange(): void {
+		if (!this.foregroundBusy) {
+			this.pump();
+			return;
+		}
+		// Pause: give the slot and the CPU back to the user's request, retry afterwards
+		const running = this._running;
+		if (running && !running.source.token.isCancellationRequested) {
+			this._queue.unshift(running.item);
+			running.source.cancel();
+		}
+	}
+
+	private async pump(): Promise<void> {
+		if (this._running || this.foregroundBusy || this._queue.length === 0) {
+			return;
+		}
+
+		const budgetMs = vscode.workspace.getConfiguration('wildestai.prefetch').get<number>('budgetSeconds', 300) * 1000;
+		if (this._spentMs >= budgetMs) {
+			this._diffService.log(`Commit prefetch budget used up, ${this._queue.length} commit(s) not prefetched`);
+			this._queue = [];
+			return;
+		}
+
+		const item = this._queue.shift()!;
+		const source = new vscode.CancellationTokenSource();
+		this._running = { item, source };
+		const startTime = Date.now();
+		try {
+			await this._diffService.prefetchCommitDiff(this._context, item.repoRoot, item.commitHash, source.token);
+		} catch (error: any) {
+			if (!(error instanceof vscode.CancellationError)) {
+				this._diffService.log(`Prefetch of commit ${item.commitHash.substring(0, 7)} failed: ${error.message}`);
+			}
+		} finally {
+			this._spentMs += Date.now() - startTime;
+			this._running = undefined;
+			source.dispose();
+		}
+		this.pump();
+	}
+}
@@ -0,0 +1,149 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as vscode from 'vscode';
+import * as path from 'path';
+import { GitService } from './GitService';
+import { DiffService } from './DiffService';
+
+type DiffStage = 'staged' | 'unstaged';
+
+/**
+ * Regenerates working tree and staged DiffGraphs in the background when repositories change
+ * Git state changes are coalesced over a debounce window; a stage is only regenerated
+ * when its content fingerprint differs from the last one seen, and a generation still
+ * running for an older fingerprint is cancelled first.
+ * Controlled by the `wildestai.autoGenerate.*` settings.
+ */
+export class DiffAutoGenerator implements vscode.Disposable {
+	private _pending: Set<string> = new Set();
+	private _timer: NodeJS.Timeout | undefined;
+	/** Last fingerprint handed to generation per `{repoRoot}:{stage}` */
+	private _lastFingerprints: Map<string, string> = new Map();
+	/** Generation started per `{repoRoot}:{stage}`, until it settles */
+	private _runs: Map<string, { source: vscode.CancellationTokenSource; done: Promise<void> }> = new Map();
+	private _subscriptions: vscode.Disposable[];
+
+	constructor(
+		private readonly _context: vscode.ExtensionContext,
+		private readonly _diffService: DiffService
+	) {
+		this._subscriptions = [
+			GitService.onDidChangeRepository(repoRoot => this.schedule(repoRoot)),
+			vscode.workspace.onDidChangeConfiguration(event => {
+				if (event.affectsConfiguration('wildestai.autoGenerate.enabled')) {
+					this.initializeGit();
+				}
+			})
+		];
+		this.initializeGit();
+	}
+
+	public dispose(): void {
+		this._subscriptions.forEach(subscription => subscription.dispose());
+		if (this._timer) {
+			clearTimeout(this._timer);
+			this._timer = undefined;
+		}
+		this._pending.clear();
+		this._runs.forEach(run => run.source.cancel());
+	}
+
+	private get enabled(): boolean {
+		return vscode.workspace.getConfiguration('wildestai.autoGenerate').get<boolean>('enabled', false);
+	}
+
+	/**
+	 * Repository events only flow once the Git API is initialized
+	 */
+	private initializeGit(): void {
+		if (this.enabled) {
+			GitService.getRepositories().catch(() => undefined);
+		}
+	}
+
+	private schedule(repoRoot: string): void {
+		if (!this.enabled) {
+			return;
+		}
+		this._pending.add(repoRoot);
+		if (this._timer) {
+			clearTimeout(this._timer);
+		}
+		const debounceMs = vscode.workspace.getConfiguration('wildestai.autoGenerate').get<number>('debounceMs', 2000);
+		this._timer = setTimeout(() => this.flush(), Math.max(0, debounceMs));
+	}
+
+	private async flush(): Promise<void> {
+		this._timer = undefined;
+		const repoRoots = [...this._pending];
+		this._pending.clear();
+		const stages = vscode.workspace.getConfiguration('wildestai.autoGenerate')
+			.get<DiffStage[]>('stages', ['unstaged', 'staged']);
+
+		for (const repoRoot of repoRoots) {
+			for (const stage of stages) {
+				await this.regenerateIfChanged(repoRoot, stage);
+			}
+		}
+	}
+
+	private async regenerateIfChanged(repoRoot: string, stage: DiffStage): Promise<void> {
+		const slot = `${repoRoot}:${stage}`;
+		let fingerprint: string;
+		try {
+			fingerprint = await GitService.getDiffFingerprint(repoRoot, stage);
+		} catch (error: any) {
+			this._diffService.log(`Auto-generate: could not fingerprint ${stage} diff for ${path.basename(repoRoot)}: ${error.message}`);
+			return;
+		}
+		if (this._lastFingerprints.get(slot) === fingerprint) {
+			return;
+		}
+		this._lastFingerprints.set(slot, fingerprint);
+
+		// Whatever a generation of the older content would produce is out of date
+		const previous = this._runs.get(slot);
+		if (previous) {
+			previous.source.cancel();
+			await previous.done;
+		}
+
+		const forget = () => {
+			if (this._lastFingerprints.get(slot) === fingerprint) {
+				this._lastFingerprints.delete(slot);
+			}
+		};
+		const source = new vscode.CancellationTokenSource();
+		// Not awaited, so other repositories and stages are queued behind it in the scheduler
+		const done = this._diffService.generateInBackground(this._context, repoRoot, stage, fingerprint, 'background', source.token).then((outcome) => {
+			// Not cached because another run was busy or the diff moved on; check again on the next change
+			if (outcome === 'in progress' || outcome === 'changed meanwhile') {
+				forget();
+			}
+		}, (error) => {
+			forget();
+			if (!(error instanceof vscode.CancellationError)) {
+				this._diffService.log(`Auto-generate of ${stage} diff in ${path.basename(repoRoot)} failed: ${error.message}`);
+			}
+		}).finally(() => {
+			if (this._runs.get(slot)?.source === source) {
+				this._runs.delete(slot);
+			}
+			source.dispose();
+		});
+		this._runs.set(slot, { source, done });
+	}
+}
@@ -0,0 +1,175 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as path from 'path';
+
+/** Inline blocks smaller than this stay in the document */
+const MIN_ASSET_SIZE = 1024;
+/** Unreferenced files younger than this are kept, another window may be about to record them */
+const UNREFERENCED_GRACE_MS = 60 * 1000;
+
+/**
+ * Inline `<script>` or `<style>` blocks, matched in one pass so that text inside a block
+ * (such as `<style>` in JSON graph data) is never taken for a block of its own
+ */
+const BLOCK_PATTERN = /<script\b([^>]*)>([\s\S]*?)<\/script>|<style\b([^>]*)>([\s\S]*?)<\/style>/gi;
+/** Script types the browser executes, and can therefore load from a `src` */
+const EXECUTABLE_SCRIPT_TYPE = /^\s*$|^(text|application)\/(javascript|ecmascript)$|^module$/i;
+
+/** A generated DiffGraph split into a document and the asset files it loads */
+export interface DiffGraphSplit {
+	/** The document, referencing its assets with `\0asset:{name}\0` placeholders */
+	documentPath: string;
+	/** File names in the assets directory, the document included */
+	assets: string[];
+	/** Bytes of the document and its assets */
+	size: number;
+}
+
+/**
+ * Splits generated DiffGraph HTML into a small document plus content-hashed asset files
+ * `wild` inlines its renderer scripts, styles and graph data into one document. Large inline
+ * `<script>` and `<style>` blocks are moved to `<sha256>.js`/`.css` files in a shared directory
+ * and referenced by URI, so renderer code that is identical across graphs is written once and
+ * loaded from the same URL, and only the small document and per-graph data differ.
+ * Graphs are split once when they are cached; the cache deletes files no entry references.
+ */
+export class DiffGraphAssets {
+	constructor(private readonly _assetsDir: string) {
+		fs.mkdirSync(this._assetsDir, { recursive: true });
+	}
+
+	public get assetsDir(): string {
+		return this._assetsDir;
+	}
+
+	/**
+	 * Split a generated document, writing the document and its assets to the assets directory
+	 */
+	public split(htmlPath: string): DiffGraphSplit {
+		const assets = new Map<string, string>();
+		const document = this.externalize(fs.readFileSync(htmlPath, 'utf8'), assets);
+		const documentName = `${sha256(document)}.html`;
+		assets.set(documentName, document);
+
+		let size = 0;
+		for (const [name, content] of assets) {
+			size += this.writeAsset(name, content);
+		}
+		return { documentPath: path.join(this._assetsDir, documentName), assets: [...assets.keys()], size };
+	}
+
+	/**
+	 * Replace the asset placeholders of a split document, read in chunks, with the URIs the webview loads them from
+	 */
+	public async *resolve(chunks: AsyncIterable<string>, toUri: (assetPath: string) => string): AsyncIterable<string> {
+		let carry = '';
+		for await (const chunk of chunks) {
+			let text = carry + chunk;
+			carry = '';
+			// An odd number of delimiters means the last placeholder continues in the next chunk
+			if ((text.match(/\0/g)?.length ?? 0) % 2 === 1) {
+				const open = text.lastIndexOf('\0');
+				carry = text.substring(open);
+				text = text.substring(0, open);
+			}
+			yield this.resolveText(text, toUri);
+		}
+		if (carry) {
+			yield this.resolveText(carry, toUri);
+		}
+	}
+
+	/**
+	 * Delete files no longer referenced by a cached graph
+	 * @returns The number of files removed
+	 */
+	public removeUnreferenced(referenced: Set<string>): number {
+		const cutoff = Date.now() - UNREFERENCED_GRACE_MS;
+		let removed = 0;
+		for (const name of fs.readdirSync(this._assetsDir)) {
+			if (referenced.has(name)) {
+				continue;
+			}
+			const assetPath = path.join(this._assetsDir, name);
+			try {
+				if (fs.statSync(assetPath).mtimeMs < cutoff) {
+					fs.rmSync(assetPath, { force: true });
+					removed++;
+				}
+			} catch {
+				// Removed by another window
+			}
+		}
+		return removed;
+	}
+
+	private resolveText(text: string, toUri: (assetPath: string) => string): string {
+		return text.replace(/\0asset:([^\0]+)\0/g, (_match, name: string) => toUri(path.join(this._assetsDir, name)));
+	}
+
+	/**
+	 * Move large inline blocks to assets, leaving `\0asset:{name}\0` placeholders for their URIs
+	 */
+	private externalize(html: string, assets: Map<string, string>): string {
+		const asset = (content: string, extension: string): string => {
+			const name = `${sha256(content)}.${extension}`;
+			assets.set(name, content);
+			return `\0asset:${name}\0`;
+		};
+
+		return html.replace(BLOCK_PATTERN, (block: string, scriptAttributes?: string, script?: string, styleAttributes?: string, style?: string) => {
+			if (script !== undefined) {
+				const type = /\btype\s*=\s*["']?([^"'\s>]*)/i.exec(scriptAttributes!)?.[1] ?? '';
+				if (script.length < MIN_ASSET_SIZE || /\bsrc\s*=/i.test(scriptAttributes!) || !EXECUTABLE_SCRIPT_TYPE.test(type)) {
+					return block;
+				}
+				// `async` and `defer` have no effect on inline classic scripts; keep it that way
+				const kept = /^module$/i.test(type) ? scriptAttributes : scriptAttributes!.replace(/\s(async|defer)\b(\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?/gi, '');
+				return `<script${kept} src="${asset(script, 'js')}"></script>`;
+			}
+			if (style!.length < MIN_ASSET_SIZE) {
+				return block;
+			}
+			const media = /\bmedia\s*=\s*("[^"]*"|'[^']*')/i.exec(styleAttributes!)?.[0];
+			return `<link rel="stylesheet" href="${asset(style!, 'css')}"${media ? ` ${media}` : ''}>`;
+		});
+	}
+
+	/**
+	 * Write an asset unless another graph already did, returning its size
+	 */
+	private writeAsset(name: string, content: string): number {
+		const assetPath = path.join(this._assetsDir, name);
+		const now = new Date();
+		try {
+			// Already written for another graph; mark it as used
+			fs.utimesSync(assetPath, now, now);
+			return fs.statSync(assetPath).size;
+		} catch {
+			// Not there yet
+		}
+		const tempPath = `${assetPath}.${process.pid}.tmp`;
+		fs.writeFileSync(tempPath, content, 'utf8');
+		fs.renameSync(tempPath, assetPath);
+		return Buffer.byteLength(content, 'utf8');
+	}
+}
+
+function sha256(content: string): string {
+	return crypto.createHash('sha256').update(content).digest('hex');
+}
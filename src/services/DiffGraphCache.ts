@@ -13,16 +13,37 @@
 // You should have received a copy of the GNU General Public License
 // along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import { DiffGraphCacheEntry, DiffGraphCacheKey } from '../utils/types';
+import * as fs from 'fs';
+import { DiffGraphCacheEntry, DiffGraphCacheKey, DiffGraphCacheLimits, DiffGraphCacheStats, DiffGraphStage } from '../utils/types';
+import { DiffGraphStore } from './DiffGraphStore';
+import { DiffGraphAssets } from './DiffGraphAssets';
 
 /**
  * In-memory cache for DiffGraph HTML content
- * Keyed by `{repoRoot}:{staged|unstaged}` format
+ * Keyed by `{repoRoot}:{stage}:{fingerprint}` format, where the fingerprint
+ * identifies the content of the diff input (see GitService.getDiffFingerprint)
+ * When a persistent store is attached, entries are written through to disk and
+ * lazily rehydrated into memory on first access after a reload.
+ * With assets attached as well, graphs are split into a document and shared
+ * assets when they are cached (see DiffGraphAssets), and those count against
+ * the byte budget.
+ * Least recently used entries are evicted, and their HTML deleted, once the
+ * entry or byte budget is exceeded; assets are deleted once no entry uses them.
  */
 
 export class DiffGraphCache {
     private static _instance: DiffGraphCache;
     private _cache: Map<DiffGraphCacheKey, DiffGraphCacheEntry> = new Map();
+    private _store?: DiffGraphStore;
+    private _assets?: DiffGraphAssets;
+    private _limits: DiffGraphCacheLimits = { ...DiffGraphCache.DEFAULT_LIMITS };
+    private _stats = { hits: 0, misses: 0, evictions: 0 };
+    private _clock = 0;
+
+    public static readonly DEFAULT_LIMITS: DiffGraphCacheLimits = {
+        maxEntries: 200,
+        maxBytes: 500 * 1024 * 1024
+    };
 
     private constructor() { }
 
@@ -37,47 +58,131 @@ export class DiffGraphCache {
     }
 
     /**
-     * Create a cache key from repository root and stage status
+     * Attach a persistent store that entries are written through to
+     * Pass undefined to detach and go back to in-memory only
+     */
+    public attachStore(store: DiffGraphStore | undefined): void {
+        this._store = store;
+        this.enforceLimits();
+    }
+
+    /**
+     * Split graphs into shared assets when they are cached, or stop doing so
+     * Only takes effect with a store attached, which records what the assets are used by.
+     */
+    public attachAssets(assets: DiffGraphAssets | undefined): void {
+        this._assets = assets;
+        this.releaseAssets();
+    }
+
+    /**
+     * Set the entry and byte budgets, evicting entries if they are now exceeded
      */
-    private createKey(repoRoot: string, stage: 'staged' | 'unstaged'): DiffGraphCacheKey {
-        return `${repoRoot}:${stage}`;
+    public setLimits(limits: DiffGraphCacheLimits): void {
+        this._limits = { ...limits };
+        this.enforceLimits();
+    }
+
+    /**
+     * Create a cache key from repository root, stage and content fingerprint
+     */
+    public createKey(repoRoot: string, stage: DiffGraphStage, fingerprint: string): DiffGraphCacheKey {
+        return `${repoRoot}:${stage}:${fingerprint}`;
+    }
+
+    /**
+     * Get a cached entry for the given repository, stage and content fingerprint
+     */
+    public get(repoRoot: string, stage: DiffGraphStage, fingerprint: string): DiffGraphCacheEntry | undefined {
+        const key = this.createKey(repoRoot, stage, fingerprint);
+        let entry = this._cache.get(key);
+        if (!entry && this._store) {
+            // Rehydrate from disk
+            entry = this._store.get(key);
+            if (entry) {
+                this._cache.set(key, entry);
+            }
+        }
+        if (!entry) {
+            this._stats.misses++;
+            return undefined;
+        }
+
+        this._stats.hits++;
+        entry.lastAccessedAt = this.tick();
+        this._store?.touch(key, entry.lastAccessedAt);
+        return entry;
     }
 
     /**
-     * Get a cached entry for the given repository and stage
+     * Get a cached entry without counting it as a use
+     * Neither the hit/miss counters nor its LRU position are updated, e.g. when
+     * looking for a baseline rather than opening the DiffGraph
      */
-    public get(repoRoot: string, stage: 'staged' | 'unstaged'): DiffGraphCacheEntry | undefined {
-        const key = this.createKey(repoRoot, stage);
-        return this._cache.get(key);
+    public peek(repoRoot: string, stage: DiffGraphStage, fingerprint: string): DiffGraphCacheEntry | undefined {
+        const key = this.createKey(repoRoot, stage, fingerprint);
+        return this._cache.get(key) ?? this._store?.get(key);
     }
 
     /**
-     * Set a cache entry for the given repository and stage
+     * Set a cache entry for the given repository, stage and content fingerprint
+     * With a store attached the HTML file is moved into it, so callers must use
+     * the htmlPath of the returned entry
      */
-    public set(repoRoot: string, stage: 'staged' | 'unstaged', htmlPath: string): void {
-        const key = this.createKey(repoRoot, stage);
-        const entry: DiffGraphCacheEntry = {
+    public set(repoRoot: string, stage: DiffGraphStage, fingerprint: string, htmlPath: string): DiffGraphCacheEntry {
+        const key = this.createKey(repoRoot, stage, fingerprint);
+        const now = this.tick();
+        const htmlExists = fs.existsSync(htmlPath);
+        let entry: DiffGraphCacheEntry = {
+            repoRoot,
+            stage,
+            fingerprint,
             htmlPath,
-            generatedAt: Date.now()
+            size: htmlExists ? fs.statSync(htmlPath).size : 0,
+            generatedAt: now,
+            lastAccessedAt: now
         };
+        // wild writes no file when there are no changes; nothing to persist then
+        if (this._store && this._assets && htmlExists) {
+            try {
+                const split = this._assets.split(htmlPath);
+                entry = { ...entry, documentPath: split.documentPath, assets: split.assets, assetsSize: split.size };
+            } catch (error) {
+                console.warn('WildestAI: Failed to split DiffGraph assets, it will be loaded whole:', error);
+            }
+        }
+        if (this._store && htmlExists) {
+            try {
+                entry = this._store.put(key, entry);
+            } catch (error) {
+                console.warn('WildestAI: Failed to persist DiffGraph, keeping it in memory only:', error);
+            }
+        }
         this._cache.set(key, entry);
+        this.enforceLimits(key);
+        return entry;
     }
 
     /**
-     * Invalidate cache entries for a specific repository and stage
-     * If stage is not provided, invalidates both staged and unstaged entries for the repo
+     * Invalidate cache entries for a specific repository and stage, whatever their fingerprint
+     * If stage is not provided, invalidates all entries for the repo
      */
-    public invalidate(repoRoot: string, stage?: 'staged' | 'unstaged'): void {
-        if (stage) {
-            const key = this.createKey(repoRoot, stage);
-            this._cache.delete(key);
-        } else {
-            // Invalidate both staged and unstaged for this repo
-            const stagedKey = this.createKey(repoRoot, 'staged');
-            const unstagedKey = this.createKey(repoRoot, 'unstaged');
-            this._cache.delete(stagedKey);
-            this._cache.delete(unstagedKey);
+    public invalidate(repoRoot: string, stage?: DiffGraphStage): void {
+        for (const [key, entry] of this._cache) {
+            if (entry.repoRoot === repoRoot && (!stage || entry.stage === stage)) {
+                this._cache.delete(key);
+            }
         }
+        if (this._store) {
+            const storedKeys: DiffGraphCacheKey[] = [];
+            for (const [key, record] of this._store.getRecords()) {
+                if (record.repoRoot === repoRoot && (!stage || record.stage === stage)) {
+                    storedKeys.push(key);
+                }
+            }
+            this._store.delete(...storedKeys);
+        }
+        this.releaseAssets();
     }
 
     /**
@@ -89,33 +194,166 @@ export class DiffGraphCache {
     }
 
     /**
-     * Clear all cache entries
+     * Clear all in-memory cache entries; entries in the attached store are kept
      * This is useful for cleanup or testing purposes
      */
     public clear(): void {
         this._cache.clear();
+        this._stats = { hits: 0, misses: 0, evictions: 0 };
+    }
+
+    /**
+     * Clear all cache entries and delete every artifact of the attached store
+     */
+    public purge(): void {
+        this._store?.delete(...this._store.getKeys());
+        this.clear();
+        this.releaseAssets();
     }
 
     /**
-     * Get the number of cached entries
+     * Get the split document of a cached graph, if it was split
+     */
+    public getDocumentPath(htmlPath: string): string | undefined {
+        for (const entry of this._cache.values()) {
+            if (entry.htmlPath === htmlPath) {
+                return entry.documentPath;
+            }
+        }
+        return undefined;
+    }
+
+    /**
+     * Get the number of cached entries, in memory or on disk
      */
     public size(): number {
-        return this._cache.size;
+        return this.getKeys().length;
+    }
+
+    /**
+     * Get the in-memory cache entries
+     */
+    public getEntries(): DiffGraphCacheEntry[] {
+        return Array.from(this._cache.values());
     }
 
     /**
-     * Get all cache keys (useful for debugging)
+     * Get hit/miss/eviction counters and current usage against the budgets
+     */
+    public getStats(): DiffGraphCacheStats {
+        let bytes = 0;
+        const usage = this.getUsage();
+        for (const { size } of usage.values()) {
+            bytes += size;
+        }
+        return {
+            ...this._stats,
+            ...this._limits,
+            entries: usage.size,
+            bytes
+        };
+    }
+
+    /**
+     * Get all cache keys, in memory or on disk (useful for debugging)
      */
     public getKeys(): DiffGraphCacheKey[] {
-        return Array.from(this._cache.keys());
+        const keys = new Set(this._cache.keys());
+        for (const key of this._store?.getKeys() ?? []) {
+            keys.add(key);
+        }
+        return Array.from(keys);
+    }
+
+    /**
+     * Check if a cache entry exists for the given content fingerprint
+     */
+    public has(repoRoot: string, stage: DiffGraphStage, fingerprint: string): boolean {
+        const key = this.createKey(repoRoot, stage, fingerprint);
+        return this._cache.has(key) || (this._store?.has(key) ?? false);
+    }
+
+    /**
+     * Evict least recently used entries until both budgets are met
+     * The protected key (the entry just generated) is never evicted
+     */
+    private enforceLimits(protectedKey?: DiffGraphCacheKey): void {
+        const usage = this.getUsage();
+        let bytes = 0;
+        for (const { size } of usage.values()) {
+            bytes += size;
+        }
+        let entries = usage.size;
+
+        const evicted: DiffGraphCacheKey[] = [];
+        const leastRecentFirst = Array.from(usage).sort((a, b) => a[1].lastAccessedAt - b[1].lastAccessedAt);
+        for (const [key, { size }] of leastRecentFirst) {
+            if (entries <= this._limits.maxEntries && bytes <= this._limits.maxBytes) {
+                break;
+            }
+            if (key === protectedKey) {
+                continue;
+            }
+            evicted.push(key);
+            entries--;
+            bytes -= size;
+        }
+        if (evicted.length === 0) {
+            return;
+        }
+
+        for (const key of evicted) {
+            const entry = this._cache.get(key);
+            this._cache.delete(key);
+            if (entry && !this._store?.has(key)) {
+                // Not owned by the store, e.g. a temp file; delete it ourselves
+                fs.rmSync(entry.htmlPath, { force: true });
+            }
+        }
+        this._store?.delete(...evicted);
+        this._stats.evictions += evicted.length;
+        this.releaseAssets();
+    }
+
+    /**
+     * Delete assets no entry uses any more, in this window or, through the store, in others
+     */
+    private releaseAssets(): void {
+        if (!this._assets || !this._store) {
+            return;
+        }
+        const referenced = new Set<string>();
+        const entries = [...this._store.getRecords().values(), ...this._cache.values()];
+        for (const { assets } of entries) {
+            assets?.forEach(name => referenced.add(name));
+        }
+        try {
+            this._assets.removeUnreferenced(referenced);
+        } catch (error) {
+            console.warn('WildestAI: Failed to remove unused DiffGraph assets:', error);
+        }
+    }
+
+    /**
+     * Size (HTML and assets) and last access of every entry, in memory or on disk
+     * Assets shared by several entries are counted for each of them.
+     */
+    private getUsage(): Map<DiffGraphCacheKey, { size: number; lastAccessedAt: number }> {
+        const usage = new Map<DiffGraphCacheKey, { size: number; lastAccessedAt: number }>();
+        for (const [key, record] of this._store?.getRecords() ?? []) {
+            usage.set(key, { size: record.size + (record.assetsSize ?? 0), lastAccessedAt: record.lastAccessedAt });
+        }
+        for (const [key, entry] of this._cache) {
+            usage.set(key, { size: entry.size + (entry.assetsSize ?? 0), lastAccessedAt: entry.lastAccessedAt });
+        }
+        return usage;
     }
 
     /**
-     * Check if a cache entry exists and is still valid
-     * This can be extended in the future to include TTL logic
+     * Current time, strictly increasing so LRU order is stable within a millisecond
      */
-    public has(repoRoot: string, stage: 'staged' | 'unstaged'): boolean {
-        const key = this.createKey(repoRoot, stage);
-        return this._cache.has(key);
+    private tick(): number {
+        this._clock = Math.max(Date.now(), this._clock + 1);
+        return this._clock;
     }
 }
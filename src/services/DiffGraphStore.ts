@@ -0,0 +1,333 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as path from 'path';
+import { DiffGraphCacheEntry, DiffGraphCacheKey, DiffGraphStoreIndex, DiffGraphStoreRecord } from '../utils/types';
+
+const INDEX_FILE = 'index.json';
+const ARTIFACTS_DIR = 'artifacts';
+const INDEX_VERSION = 1;
+/** Access times are written back to the index at most this often */
+const TOUCH_FLUSH_DELAY_MS = 5000;
+
+/**
+ * Persistent on-disk store for DiffGraph HTML artifacts
+ * Lives under the extension's global storage, so generated graphs survive window reloads.
+ * Artifacts are named by their sha256 and listed in an index file mapping cache keys to artifacts.
+ */
+export class DiffGraphStore {
+	private _records: Map<DiffGraphCacheKey, DiffGraphStoreRecord> = new Map();
+	private _indexMtime = 0;
+	/** Keys whose artifact hash has been verified since the index was loaded */
+	private _verified: Set<DiffGraphCacheKey> = new Set();
+	/** Access times not yet written to the index */
+	private _touched: Map<DiffGraphCacheKey, number> = new Map();
+	private _flushTimer?: NodeJS.Timeout;
+
+	constructor(private readonly _storageDir: string) {
+		fs.mkdirSync(path.join(this._storageDir, ARTIFACTS_DIR), { recursive: true });
+		this.loadIndex();
+	}
+
+	/**
+	 * Get the entry stored under a key, verifying the artifact on first access
+	 */
+	public get(key: DiffGraphCacheKey): DiffGraphCacheEntry | undefined {
+		this.reloadIfChanged();
+		const record = this._records.get(key);
+		if (!record) {
+			return undefined;
+		}
+
+		if (!this._verified.has(key)) {
+			if (!this.verifyArtifact(record, true)) {
+				this.delete(key);
+				return undefined;
+			}
+			this._verified.add(key);
+		}
+
+		return this.toEntry(record);
+	}
+
+	/**
+	 * Check whether a key is stored, without verifying the artifact hash
+	 */
+	public has(key: DiffGraphCacheKey): boolean {
+		this.reloadIfChanged();
+		return this._records.has(key);
+	}
+
+	/**
+	 * Move a generated HTML file into the store and record it under the key
+	 * Returns the stored entry, whose htmlPath points into the store
+	 */
+	public put(key: DiffGraphCacheKey, entry: DiffGraphCacheEntry): DiffGraphCacheEntry {
+		const sha256 = this.hashFile(entry.htmlPath);
+		const file = path.join(ARTIFACTS_DIR, `${sha256}.html`);
+		const target = path.join(this._storageDir, file);
+
+		if (fs.existsSync(target)) {
+			// Identical output already stored
+			fs.rmSync(entry.htmlPath, { force: true });
+		} else {
+			this.moveFile(entry.htmlPath, target);
+		}
+
+		const record: DiffGraphStoreRecord = {
+			repoRoot: entry.repoRoot,
+			stage: entry.stage,
+			fingerprint: entry.fingerprint,
+			file,
+			size: fs.statSync(target).size,
+			sha256,
+			generatedAt: entry.generatedAt,
+			lastAccessedAt: entry.lastAccessedAt,
+			documentPath: entry.documentPath,
+			assets: entry.assets,
+			assetsSize: entry.assetsSize
+		};
+		this.updateIndex(index => { index.entries[key] = record; });
+		this._verified.add(key);
+
+		return this.toEntry(record);
+	}
+
+	/**
+	 * Record that a stored entry was served, so LRU order survives reloads
+	 * The access time is kept in memory and written to the index debounced, or by flush().
+	 */
+	public touch(key: DiffGraphCacheKey, lastAccessedAt: number): void {
+		const record = this._records.get(key);
+		if (!record) {
+			return;
+		}
+		record.lastAccessedAt = lastAccessedAt;
+		this._touched.set(key, lastAccessedAt);
+		if (!this._flushTimer) {
+			this._flushTimer = setTimeout(() => this.flush(), TOUCH_FLUSH_DELAY_MS);
+			this._flushTimer.unref?.();
+		}
+	}
+
+	/**
+	 * Write pending access times to the index, e.g. on shutdown
+	 */
+	public flush(): void {
+		clearTimeout(this._flushTimer);
+		this._flushTimer = undefined;
+		if (this._touched.size > 0) {
+			try {
+				this.updateIndex(() => { });
+			} catch (error) {
+				console.warn('WildestAI: Failed to write DiffGraph access times:', error);
+			}
+		}
+	}
+
+	/**
+	 * Remove the given keys from the store, deleting artifacts no longer referenced
+	 */
+	public delete(...keys: DiffGraphCacheKey[]): void {
+		if (keys.length === 0) {
+			return;
+		}
+		const removed: DiffGraphStoreRecord[] = [];
+		this.updateIndex(index => {
+			for (const key of keys) {
+				const record = index.entries[key];
+				if (record) {
+					removed.push(record);
+					delete index.entries[key];
+				}
+			}
+		});
+		for (const key of keys) {
+			this._verified.delete(key);
+		}
+		this.deleteUnreferencedArtifacts(removed);
+	}
+
+	/**
+	 * Get all stored keys
+	 */
+	public getKeys(): DiffGraphCacheKey[] {
+		this.reloadIfChanged();
+		return Array.from(this._records.keys());
+	}
+
+	/**
+	 * Get all stored records (without verifying artifacts)
+	 */
+	public getRecords(): Map<DiffGraphCacheKey, DiffGraphStoreRecord> {
+		this.reloadIfChanged();
+		return new Map(this._records);
+	}
+
+	/**
+	 * Get the directory where artifacts are stored
+	 */
+	public get artifactsDir(): string {
+		return path.join(this._storageDir, ARTIFACTS_DIR);
+	}
+
+	private toEntry(record: DiffGraphStoreRecord): DiffGraphCacheEntry {
+		return {
+			repoRoot: record.repoRoot,
+			stage: record.stage,
+			fingerprint: record.fingerprint,
+			htmlPath: path.join(this._storageDir, record.file),
+			size: record.size,
+			generatedAt: record.generatedAt,
+			lastAccessedAt: record.lastAccessedAt,
+			documentPath: record.documentPath,
+			assets: record.assets,
+			assetsSize: record.assetsSize
+		};
+	}
+
+	/**
+	 * Read the index from disk, dropping records whose artifact is missing or has the wrong size
+	 * Hashes are only checked lazily in get(), as artifacts can be several megabytes each
+	 */
+	private loadIndex(): void {
+		const index = this.readIndex();
+		this._records = new Map();
+		this._verified.clear();
+		let dropped = false;
+		for (const [key, record] of Object.entries(index.entries)) {
+			if (this.verifyArtifact(record, false)) {
+				this._records.set(key as DiffGraphCacheKey, record);
+			} else {
+				dropped = true;
+			}
+		}
+		this.applyTouched(this._records);
+		if (dropped) {
+			this.updateIndex(() => { });
+		}
+	}
+
+	/**
+	 * Another window may have written the index since we last read it
+	 */
+	private reloadIfChanged(): void {
+		try {
+			if (fs.statSync(this.indexPath).mtimeMs !== this._indexMtime) {
+				this.loadIndex();
+			}
+		} catch {
+			// No index on disk yet
+		}
+	}
+
+	private readIndex(): DiffGraphStoreIndex {
+		try {
+			const stat = fs.statSync(this.indexPath);
+			const index = JSON.parse(fs.readFileSync(this.indexPath, 'utf8')) as DiffGraphStoreIndex;
+			this._indexMtime = stat.mtimeMs;
+			if (index.version === INDEX_VERSION && index.entries && typeof index.entries === 'object') {
+				// Records written before access times were tracked
+				for (const record of Object.values(index.entries)) {
+					if (typeof record.lastAccessedAt !== 'number') {
+						record.lastAccessedAt = record.generatedAt ?? 0;
+					}
+				}
+				return index;
+			}
+		} catch {
+			// Missing or corrupt index, start over
+		}
+		return { version: INDEX_VERSION, entries: {} };
+	}
+
+	/**
+	 * Read-modify-write the index, merging with what other windows may have written
+	 */
+	private updateIndex(mutate: (index: DiffGraphStoreIndex) => void): void {
+		const index = this.readIndex();
+		for (const [key, record] of Object.entries(index.entries)) {
+			if (!this.verifyArtifact(record, false)) {
+				delete index.entries[key];
+			}
+		}
+		mutate(index);
+		this.applyTouched(new Map(Object.entries(index.entries) as [DiffGraphCacheKey, DiffGraphStoreRecord][]));
+		this._touched.clear();
+
+		const tmpPath = `${this.indexPath}.${process.pid}.tmp`;
+		fs.writeFileSync(tmpPath, JSON.stringify(index));
+		fs.renameSync(tmpPath, this.indexPath);
+
+		this._indexMtime = fs.statSync(this.indexPath).mtimeMs;
+		this._records = new Map(Object.entries(index.entries) as [DiffGraphCacheKey, DiffGraphStoreRecord][]);
+	}
+
+	/**
+	 * Carry pending access times over to records read from disk, keeping the later time
+	 */
+	private applyTouched(records: Map<DiffGraphCacheKey, DiffGraphStoreRecord>): void {
+		for (const [key, lastAccessedAt] of this._touched) {
+			const record = records.get(key);
+			if (record && record.lastAccessedAt < lastAccessedAt) {
+				record.lastAccessedAt = lastAccessedAt;
+			}
+		}
+	}
+
+	private verifyArtifact(record: DiffGraphStoreRecord, checkHash: boolean): boolean {
+		try {
+			const artifactPath = path.join(this._storageDir, record.file);
+			if (fs.statSync(artifactPath).size !== record.size) {
+				return false;
+			}
+			return !checkHash || this.hashFile(artifactPath) === record.sha256;
+		} catch {
+			return false;
+		}
+	}
+
+	private deleteUnreferencedArtifacts(records: DiffGraphStoreRecord[]): void {
+		const referenced = new Set(Array.from(this._records.values(), record => record.file));
+		for (const record of records) {
+			if (!referenced.has(record.file)) {
+				fs.rmSync(path.join(this._storageDir, record.file), { force: true });
+			}
+		}
+	}
+
+	private hashFile(filePath: string): string {
+		return crypto.createHash('sha256').update(fs.readFileSync(filePath)).digest('hex');
+	}
+
+	private moveFile(source: string, target: string): void {
+		try {
+			fs.renameSync(source, target);
+		} catch (error: any) {
+			if (error.code !== 'EXDEV') {
+				throw error;
+			}
+			// tmpdir and global storage are on different filesystems
+			fs.copyFileSync(source, target);
+			fs.rmSync(source, { force: true });
+		}
+	}
+
+	private get indexPath(): string {
+		return path.join(this._storageDir, INDEX_FILE);
+	}
+}
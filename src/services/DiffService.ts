@@ -19,22 +19,95 @@ import * as fs from 'fs';
 import * as path from 'path';
 import { GitService } from './GitService';
 import { CliService } from './CliService';
+import { formatPhaseTimings } from './CliProgress';
 import { DiffGraphCache } from './DiffGraphCache';
 import { NotificationService } from './NotificationService';
-import { CliCommand } from '../utils/types';
+import { CliExitError } from '../utils/CliExitError';
+import { SingleFlight } from '../utils/SingleFlight';
+import { runPool } from '../utils/WorkerPool';
+import { CliCommand, CliExecuteOptions, CliPhaseTiming, CliPriority, DiffGraphRange, DiffGraphStage, ResolvedDiffRange } from '../utils/types';
 import { DiffGraphViewProvider } from '../providers/DiffGraphViewProvider';
 
+/** A generation in progress for one repository and stage */
+interface ActiveRun {
+	/** Cancelled by the user via the progress notification, or by a newer run */
+	source: vscode.CancellationTokenSource;
+	subscription: vscode.Disposable;
+	/** True when a newer request for the same repository and stage took over */
+	preempted: boolean;
+}
+
+/**
+ * How a background generation went
+ * 'changed meanwhile' means the diff changed while wild ran, so the graph was not cached.
+ */
+export type BackgroundGenerationOutcome = 'generated' | 'up to date' | 'in progress' | 'changed meanwhile';
+
+/** How one stage of one repository went in a "Generate all" run */
+type GenerateAllOutcome = BackgroundGenerationOutcome | 'no changes' | 'failed' | 'cancelled';
+
+/** Temp files older than this that no cache entry references are swept on startup */
+const ORPHANED_TEMP_FILE_AGE_MS = 60 * 60 * 1000;
+
+/** Incremental runs re-analyze at most this many files; larger changes regenerate the whole diff */
+const MAX_INCREMENTAL_PATHS = 100;
+
+/** Range and commit graphs remembered per base tree as baselines for incremental runs */
+const MAX_RANGE_BASELINES = 20;
+
+/** A generated range or commit graph and the per-file fingerprints it was generated from */
+interface RangeGraphFiles {
+	stage: DiffGraphStage;
+	fingerprint: string;
+	files: Map<string, string>;
+}
+
 export class DiffService {
 	private _outputChannel: vscode.OutputChannel;
 	private _notificationService: NotificationService;
 	private _cache: DiffGraphCache;
 	private _diffGraphViewProvider?: DiffGraphViewProvider;
+	/** Generations in progress, keyed like the cache; resolves to the HTML path to show */
+	private _inFlight = new SingleFlight<string>();
+	/** Background generations and commit prefetches in flight, keyed like the cache; an interactive request replaces them */
+	private _background: Map<string, Promise<string>> = new Map();
+	/** Latest generation per `{repoRoot}:{stage}`, preempted when a newer one starts */
+	private _activeRuns: Map<string, ActiveRun> = new Map();
+	/** Per-file fingerprints of the last graph per `{repoRoot}:{stage}`, the baseline for incremental runs */
+	private _graphFiles: Map<string, { fingerprint: string; files: Map<string, string> }> = new Map();
+	/** Range and commit graphs per `{repoRoot}:{baseTree}`, most recent last, the baselines for incremental range runs */
+	private _rangeFiles: Map<string, RangeGraphFiles[]> = new Map();
+	/** Cleared when wild rejects an incremental run */
+	private _incrementalSupported = true;
 
 	constructor(context: vscode.ExtensionContext, diffGraphViewProvider?: DiffGraphViewProvider) {
 		this._outputChannel = vscode.window.createOutputChannel('WildestAI');
 		this._notificationService = new NotificationService(this._outputChannel);
 		this._cache = DiffGraphCache.getInstance();
 		this._diffGraphViewProvider = diffGraphViewProvider;
+		this.sweepOrphanedTempFiles();
+	}
+
+	/**
+	 * Writes a line to the WildestAI output channel
+	 */
+	public log(message: string): void {
+		this._outputChannel.appendLine(message);
+	}
+
+	/**
+	 * Shows cache hit/miss/eviction counters and disk usage
+	 */
+	public showCacheStats(): void {
+		const stats = this._cache.getStats();
+		const toMB = (bytes: number) => (bytes / (1024 * 1024)).toFixed(1);
+		const lookups = stats.hits + stats.misses;
+		const hitRate = lookups > 0 ? Math.round((stats.hits / lookups) * 100) : 0;
+		const message = `DiffGraph cache: ${stats.entries}/${stats.maxEntries} entries, ` +
+			`${toMB(stats.bytes)}/${toMB(stats.maxBytes)} MB, ` +
+			`${stats.hits} hits, ${stats.misses} misses (${hitRate}% hit rate), ${stats.evictions} evictions`;
+		this._outputChannel.appendLine(message);
+		vscode.window.showInformationMessage(message);
 	}
 
 	/**
@@ -72,16 +145,15 @@ export class DiffService {
 	 */
 	public async openCommitDiff(context: vscode.ExtensionContext, commitHash: string, repoPath?: string): Promise<void> {
 		try {
-			const repositories = await GitService.getRepositories();
-			const repoRoot = repoPath || repositories[0]?.repoRoot;
+			const repoRoot = repoPath || (await GitService.getRepositories())[0]?.repoRoot;
 			if (!repoRoot) {
 				vscode.window.showErrorMessage('No repository found for the commit');
 				return;
 			}
-			const stage = `commit-${commitHash}`;
+			const stage: DiffGraphStage = `commit-${commitHash}`;
 
-			// Check cache first
-			const cachedEntry = this._cache.get(repoRoot, stage as any);
+			// Check cache first (a commit hash already identifies its diff content)
+			const cachedEntry = this._cache.get(repoRoot, stage, commitHash);
 			if (cachedEntry && fs.existsSync(cachedEntry.htmlPath)) {
 				this._outputChannel.appendLine(`Using cached commit diff for ${commitHash}`);
 				await this.showWebviewWithContent(cachedEntry.htmlPath, stage);
@@ -91,10 +163,45 @@ export class DiffService {
 			// Generate new content
 			await this.generateCommitDiff(context, repoRoot, commitHash);
 		} catch (error: any) {
+			if (error instanceof vscode.CancellationError) {
+				return;
+			}
 			vscode.window.showErrorMessage(`Failed to open commit diff: ${error.message}`);
 		}
 	}
 
+	/**
+	 * Opens a DiffGraph of a commit range (`base..head`) or of a branch against its merge base (`base...head`)
+	 * The graph is cached by the base and head trees, so equal comparisons share it whatever they are called.
+	 */
+	public async openRangeDiff(context: vscode.ExtensionContext, range: DiffGraphRange, repoPath?: string): Promise<void> {
+		try {
+			const repositories = await GitService.getRepositories();
+			const repoRoot = repoPath || repositories[0]?.repoRoot;
+			if (!repoRoot) {
+				vscode.window.showErrorMessage('No repository found for the range');
+				return;
+			}
+			const resolved = await GitService.resolveRange(repoRoot, range);
+			const stage: DiffGraphStage = 'range';
+			const fingerprint = `${resolved.baseTree}..${resolved.headTree}`;
+
+			const cachedEntry = this._cache.get(repoRoot, stage, fingerprint);
+			if (cachedEntry && fs.existsSync(cachedEntry.htmlPath)) {
+				this._outputChannel.appendLine(`Using cached diff for ${describeRange(range)}`);
+				await this.showWebviewWithContent(cachedEntry.htmlPath, stage);
+				return;
+			}
+
+			await this.generateRangeDiff(context, repoRoot, stage, fingerprint, resolved, describeRange(range));
+		} catch (error: any) {
+			if (error instanceof vscode.CancellationError) {
+				return;
+			}
+			vscode.window.showErrorMessage(`Failed to open diff of ${describeRange(range)}: ${error.message}`);
+		}
+	}
+
 	/**
 	 * Opens a diff view, using cache if available
 	 */
@@ -104,8 +211,9 @@ export class DiffService {
 			const repoRoot = repoPath || repositories[0]?.repoRoot;
 			const stage = staged ? 'staged' : 'unstaged';
 
-			// Check cache first
-			const cachedEntry = this._cache.get(repoRoot, stage);
+			// Check cache first, only serving an entry generated from identical diff content
+			const fingerprint = await this.getFingerprint(repoRoot, stage);
+			const cachedEntry = fingerprint ? this._cache.get(repoRoot, stage, fingerprint) : undefined;
 			if (cachedEntry && fs.existsSync(cachedEntry.htmlPath)) {
 				this._outputChannel.appendLine(`Using cached ${stage} diff for ${path.basename(repoRoot)}`);
 				await this.showWebviewWithContent(cachedEntry.htmlPath, stage);
@@ -113,8 +221,11 @@ export class DiffService {
 			}
 
 			// Generate new content
-			await this.generateAndShowDiff(context, repoRoot, stage);
+			await this.generateAndShowDiff(context, repoRoot, stage, fingerprint);
 		} catch (error: any) {
+			if (error instanceof vscode.CancellationError) {
+				return;
+			}
 			vscode.window.showErrorMessage(`Failed to open ${staged ? 'staged' : 'unstaged'} changes: ${error.message}`);
 		}
 	}
@@ -133,107 +244,686 @@ export class DiffService {
 			this._outputChannel.appendLine(`Cache invalidated for ${stage} diff in ${path.basename(repoRoot)}`);
 
 			// Generate new content
-			await this.generateAndShowDiff(context, repoRoot, stage);
+			const fingerprint = await this.getFingerprint(repoRoot, stage);
+			await this.generateAndShowDiff(context, repoRoot, stage, fingerprint);
 		} catch (error: any) {
+			if (error instanceof vscode.CancellationError) {
+				return;
+			}
 			vscode.window.showErrorMessage(`Failed to refresh ${staged ? 'staged' : 'unstaged'} changes: ${error.message}`);
 		}
 	}
 
 	/**
 	 * Generates and shows commit diff content, caching the result
+	 * Concurrent requests for the same commit share a single wild run
 	 */
 	private async generateCommitDiff(
 		context: vscode.ExtensionContext,
 		repoRoot: string,
 		commitHash: string
 	): Promise<void> {
-		const startTime = Date.now();
-		await this.showLoadingScreen();
+		const resolved = await GitService.resolveRange(repoRoot, { kind: 'commit', head: commitHash });
+		await this.generateRangeDiff(context, repoRoot, `commit-${commitHash}`, commitHash, resolved, `commit ${commitHash.substring(0, 7)}`);
+	}
 
-		await vscode.window.withProgress({
-			location: vscode.ProgressLocation.Notification,
-			title: `Generating DiffGraph for commit ${commitHash.substring(0, 7)}...`,
-			cancellable: false
-		}, async (progress) => {
-			try {
-				// Build temp file path
-				const htmlFilePath = this.buildTempFilePath(repoRoot, `commit-${commitHash}`);
-
-				// Call CLI via CliService with commit range
-				const args = ['diff', `${commitHash}~1..${commitHash}`, '--output', htmlFilePath, '--no-open'];
-				const cliCommand = CliService.setupCommand(args, context);
-				const { stdout, stderr } = await CliService.execute(cliCommand, repoRoot, progress);
-
-				// Log output
-				const cmdString = `${cliCommand.executable} ${cliCommand.args.join(' ')}`;
-				this.logOutput(cmdString, stdout, stderr);
-
-				// Cache the result
-				this._cache.set(repoRoot, `commit-${commitHash}` as any, htmlFilePath);
-
-				// Show notification
-				this._notificationService.sendOperationComplete(
-					`Commit DiffGraph`,
-					`${commitHash.substring(0, 7)} in ${path.basename(repoRoot)}`,
-					{ startTime }
-				);
-
-				// Show content
-				await this.showWebviewWithContent(htmlFilePath, `commit-${commitHash}`);
-			} catch (error: any) {
-				throw error;
+	/**
+	 * Generates and shows the diff of a resolved range, caching the result under stage and fingerprint
+	 * Concurrent requests for the same graph share a single wild run
+	 */
+	private async generateRangeDiff(
+		context: vscode.ExtensionContext,
+		repoRoot: string,
+		stage: DiffGraphStage,
+		fingerprint: string,
+		range: ResolvedDiffRange,
+		label: string
+	): Promise<void> {
+		const key = this._cache.createKey(repoRoot, stage, fingerprint);
+		// Ranges share a stage, so each graph preempts only earlier runs of itself
+		const slot = `${repoRoot}:${stage}:${fingerprint}`;
+		if (this._background.has(key)) {
+			// The prefetcher abandons its run once this request makes foreground work
+			const prefetched = await this.takeOverBackgroundRun(key, slot);
+			if (prefetched) {
+				await this.showWebviewWithContent(prefetched, stage);
+				return;
 			}
+		} else if (this._inFlight.has(key)) {
+			// Joining an interactive run started elsewhere
+			await this.showLoadingScreen();
+		}
+		const htmlPath = await this._inFlight.run(key, async () => {
+			const startTime = Date.now();
+			await this.showLoadingScreen();
+
+			return vscode.window.withProgress({
+				location: vscode.ProgressLocation.Notification,
+				title: `Generating DiffGraph for ${label}...`,
+				cancellable: true
+			}, async (progress, token) => {
+				const run = this.startRun(slot, token);
+
+				// Build temp file path
+				const htmlFilePath = this.buildTempFilePath(repoRoot, stage);
+
+				try {
+					const files = await this.runRangeDiff(context, repoRoot, range, htmlFilePath, progress, { token: run.source.token });
+
+					// Cache the result (commits and trees never change, so this is kept across reloads)
+					const entry = this._cache.set(repoRoot, stage, fingerprint, htmlFilePath);
+					this.recordRangeFiles(repoRoot, range.baseTree, { stage, fingerprint, files });
+
+					// Show notification
+					this._notificationService.sendOperationComplete(
+						'DiffGraph',
+						`${label} in ${path.basename(repoRoot)}`,
+						{ startTime }
+					);
+
+					return entry.htmlPath;
+				} catch (error) {
+					await this.handleGenerationError(error, htmlFilePath, run, label);
+					throw error;
+				} finally {
+					this.endRun(slot, run);
+				}
+			});
 		});
+
+		// Show content
+		await this.showWebviewWithContent(htmlPath, stage);
 	}
 
 	/**
 	 * Generates and shows diff content, caching the result
+	 * Concurrent requests for the same repository, stage and content share a single wild run
 	 */
 	private async generateAndShowDiff(
 		context: vscode.ExtensionContext,
 		repoRoot: string,
-		stage: 'staged' | 'unstaged'
+		stage: 'staged' | 'unstaged',
+		fingerprint?: string
 	): Promise<void> {
+		const key = this._cache.createKey(repoRoot, stage, fingerprint ?? '');
+		const slot = `${repoRoot}:${stage}`;
+		if (this._background.has(key)) {
+			const generated = await this.takeOverBackgroundRun(key, slot);
+			if (generated) {
+				await this.showWebviewWithContent(generated, stage);
+				return;
+			}
+		} else if (this._inFlight.has(key)) {
+			// Joining an interactive run started elsewhere
+			await this.showLoadingScreen();
+		}
+		const htmlPath = await this._inFlight.run(key, async () => {
+			const startTime = Date.now();
+			await this.showLoadingScreen();
+
+			return vscode.window.withProgress({
+				location: vscode.ProgressLocation.Notification,
+				title: `Generating ${stage} DiffGraph for ${path.basename(repoRoot)}...`,
+				cancellable: true
+			}, async (progress, token) => {
+				const run = this.startRun(slot, token);
+
+				// Build temp file path
+				const htmlFilePath = this.buildTempFilePath(repoRoot, stage);
+
+				try {
+					// Call CLI via CliService
+					const files = await this.runDiff(context, repoRoot, stage, htmlFilePath, progress, { token: run.source.token });
+
+					// Cache the result, unless the diff input changed while wild was running
+					let shownPath = htmlFilePath;
+					if (fingerprint && fingerprint === await this.getFingerprint(repoRoot, stage)) {
+						shownPath = this._cache.set(repoRoot, stage, fingerprint, htmlFilePath).htmlPath;
+						this.recordGraphFiles(slot, fingerprint, files);
+					} else {
+						this._outputChannel.appendLine(`${stage} diff in ${path.basename(repoRoot)} changed during generation, result not cached`);
+					}
+
+					// Show notification
+					this._notificationService.sendOperationComplete(
+						`${stage.charAt(0).toUpperCase() + stage.slice(1)} DiffGraph`,
+						path.basename(repoRoot),
+						{ startTime }
+					);
+
+					return shownPath;
+				} catch (error) {
+					await this.handleGenerationError(error, htmlFilePath, run, `${stage} diff in ${path.basename(repoRoot)}`);
+					throw error;
+				} finally {
+					this.endRun(slot, run);
+				}
+			});
+		});
+
+		// Show content
+		await this.showWebviewWithContent(htmlPath, stage);
+	}
+
+	/**
+	 * Generates the staged and unstaged DiffGraphs of every repository without showing them
+	 * Repositories are worked through by a pool as wide as `wildestai.cli.maxParallelism`, so
+	 * a slow repository does not hold back the rest. The notification shows aggregated progress
+	 * and cancels the remaining work; the outcome per repository is written to the output channel.
+	 */
+	public async generateAll(context: vscode.ExtensionContext): Promise<void> {
+		const repositories = await GitService.getRepositories();
+		if (repositories.length === 0) {
+			vscode.window.showInformationMessage('No Git repositories found');
+			return;
+		}
+
+		const stages: ('staged' | 'unstaged')[] = ['staged', 'unstaged'];
+		const jobs = repositories.flatMap(repo => stages.map(stage => ({ repoRoot: repo.repoRoot, stage })));
 		const startTime = Date.now();
-		await this.showLoadingScreen();
+		this._outputChannel.appendLine(`Generating ${jobs.length} DiffGraphs for ${repositories.length} repositories`);
 
-		await vscode.window.withProgress({
+		const results = await vscode.window.withProgress({
 			location: vscode.ProgressLocation.Notification,
-			title: `Generating ${stage} DiffGraph for ${path.basename(repoRoot)}...`,
-			cancellable: false
+			title: `Generating DiffGraphs for ${repositories.length} repositories`,
+			cancellable: true
+		}, async (progress, token) => {
+			let done = 0;
+			return runPool(jobs, CliService.scheduler.maxParallelism, async ({ repoRoot, stage }): Promise<GenerateAllOutcome> => {
+				try {
+					return await this.generateForAll(context, repoRoot, stage, token);
+				} finally {
+					done++;
+					progress.report({
+						increment: 100 / jobs.length,
+						message: `${done}/${jobs.length} (${stage} in ${path.basename(repoRoot)})`
+					});
+				}
+			}, () => token.isCancellationRequested);
+		});
+
+		// Report per repository, in the order they are listed
+		const counts = new Map<GenerateAllOutcome, number>();
+		for (let i = 0; i < jobs.length; i += stages.length) {
+			const outcomes = stages.map((stage, offset) => {
+				const result = results[i + offset];
+				let outcome: GenerateAllOutcome;
+				let detail = '';
+				if (!result) {
+					outcome = 'cancelled';
+				} else if (result.status === 'fulfilled') {
+					outcome = result.value;
+				} else if (result.reason instanceof vscode.CancellationError) {
+					outcome = 'cancelled';
+				} else {
+					outcome = 'failed';
+					detail = ` (${result.reason?.message ?? result.reason})`;
+				}
+				counts.set(outcome, (counts.get(outcome) ?? 0) + 1);
+				return `${stage} ${outcome}${detail}`;
+			});
+			this._outputChannel.appendLine(`  ${path.basename(jobs[i].repoRoot)}: ${outcomes.join(', ')}`);
+		}
+
+		const elapsedSecs = ((Date.now() - startTime) / 1000).toFixed(1);
+		const summary = [...counts].map(([outcome, count]) => `${count} ${outcome}`).join(', ');
+		const message = `DiffGraphs for ${repositories.length} repositories in ${elapsedSecs}s: ${summary}`;
+		this._outputChannel.appendLine(message);
+		if (counts.has('failed')) {
+			const choice = await vscode.window.showWarningMessage(message, 'Show Output');
+			if (choice === 'Show Output') {
+				this._outputChannel.show(true);
+			}
+		} else {
+			vscode.window.showInformationMessage(message);
+		}
+	}
+
+	/**
+	 * Generates one stage of one repository for generateAll, skipping stages without changes
+	 */
+	private async generateForAll(
+		context: vscode.ExtensionContext,
+		repoRoot: string,
+		stage: 'staged' | 'unstaged',
+		token: vscode.CancellationToken
+	): Promise<GenerateAllOutcome> {
+		if (token.isCancellationRequested) {
+			return 'cancelled';
+		}
+		const changed = await GitService.getFileFingerprints(repoRoot, stage);
+		if (changed.size === 0) {
+			return 'no changes';
+		}
+		const fingerprint = await this.getFingerprint(repoRoot, stage);
+		if (!fingerprint) {
+			throw new Error('could not fingerprint the diff');
+		}
+		if (this._cache.has(repoRoot, stage, fingerprint)) {
+			return 'up to date';
+		}
+		return this.generateInBackground(context, repoRoot, stage, fingerprint, 'background', token);
+	}
+
+	/**
+	 * Generates a DiffGraph without showing it, so it is already cached when opened
+	 * Runs at background priority with only a status bar indicator. Skipped if the content is
+	 * already cached or a generation for the repository and stage is running; an interactive
+	 * request for the same stage preempts it.
+	 * @param token - Cancels the run, e.g. from a "Generate all" notification
+	 * @returns Whether a DiffGraph was generated and cached, or why not
+	 */
+	public async generateInBackground(
+		context: vscode.ExtensionContext,
+		repoRoot: string,
+		stage: 'staged' | 'unstaged',
+		fingerprint?: string,
+		priority: CliPriority = 'background',
+		token: vscode.CancellationToken = vscode.CancellationToken.None
+	): Promise<BackgroundGenerationOutcome> {
+		const slot = `${repoRoot}:${stage}`;
+		fingerprint = fingerprint ?? await this.getFingerprint(repoRoot, stage);
+		if (!fingerprint) {
+			throw new Error('could not fingerprint the diff');
+		}
+		if (this._cache.has(repoRoot, stage, fingerprint)) {
+			return 'up to date';
+		}
+		const key = this._cache.createKey(repoRoot, stage, fingerprint);
+		if (this._activeRuns.has(slot) || this._inFlight.has(key)) {
+			return 'in progress';
+		}
+
+		let cached = false;
+		const generation = this._inFlight.run(key, () => vscode.window.withProgress({
+			location: vscode.ProgressLocation.Window,
+			title: `Preparing ${stage} DiffGraph for ${path.basename(repoRoot)}`
 		}, async (progress) => {
+			const run = this.startRun(slot, token);
+			const htmlFilePath = this.buildTempFilePath(repoRoot, stage);
+
 			try {
-				// Build temp file path
-				const htmlFilePath = this.buildTempFilePath(repoRoot, stage);
+				const files = await this.runDiff(context, repoRoot, stage, htmlFilePath, progress, {
+					token: run.source.token,
+					priority
+				}, false);
 
-				// Call CLI via CliService
-				const args: string[] = ['diff', '--output', htmlFilePath, '--no-open'];
-				if (stage === 'staged') {
-					args.push('--staged');
+				// The file is kept even when not cached, a request that joined this run shows it
+				if (fingerprint === await this.getFingerprint(repoRoot, stage)) {
+					cached = true;
+					const entry = this._cache.set(repoRoot, stage, fingerprint, htmlFilePath);
+					this.recordGraphFiles(slot, fingerprint, files);
+					return entry.htmlPath;
 				}
-				const cliCommand = CliService.setupCommand(args, context);
-				const { stdout, stderr } = await CliService.execute(cliCommand, repoRoot, progress);
-
-				// Log output
-				const cmdString = `${cliCommand.executable} ${cliCommand.args.join(' ')}`;
-				this.logOutput(cmdString, stdout, stderr);
-
-				// Cache the result
-				this._cache.set(repoRoot, stage, htmlFilePath);
-
-				// Show notification
-				this._notificationService.sendOperationComplete(
-					`${stage.charAt(0).toUpperCase() + stage.slice(1)} DiffGraph`,
-					path.basename(repoRoot),
-					{ startTime }
-				);
-
-				// Show content
-				await this.showWebviewWithContent(htmlFilePath, stage);
-			} catch (error: any) {
+				this._outputChannel.appendLine(`${stage} diff in ${path.basename(repoRoot)} changed during background generation, result not cached`);
+				return htmlFilePath;
+			} catch (error) {
+				await this.handleGenerationError(error, htmlFilePath, run, `${stage} diff in ${path.basename(repoRoot)}`, false);
 				throw error;
+			} finally {
+				this.endRun(slot, run);
 			}
+		}));
+		this._background.set(key, generation);
+		try {
+			await generation;
+		} finally {
+			this._background.delete(key);
+		}
+		return cached ? 'generated' : 'changed meanwhile';
+	}
+
+	/**
+	 * Generates a commit DiffGraph at idle priority without showing it, to warm the cache
+	 * Cancelling the token abandons the run quietly; clicking the commit meanwhile replaces it
+	 * with a foreground run (see generateRangeDiff).
+	 * @returns Whether a DiffGraph was generated, false if it was already cached or in progress
+	 */
+	public async prefetchCommitDiff(
+		context: vscode.ExtensionContext,
+		repoRoot: string,
+		commitHash: string,
+		token: vscode.CancellationToken
+	): Promise<boolean> {
+		const stage: DiffGraphStage = `commit-${commitHash}`;
+		const key = this._cache.createKey(repoRoot, stage, commitHash);
+		if (this._cache.has(repoRoot, stage, commitHash) || this._inFlight.has(key)) {
+			return false;
+		}
+
+		const prefetch = this._inFlight.run(key, () => vscode.window.withProgress({
+			location: vscode.ProgressLocation.Window,
+			title: `Prefetching DiffGraph for commit ${commitHash.substring(0, 7)}`
+		}, async (progress) => {
+			const slot = `${repoRoot}:${stage}:${commitHash}`;
+			const run = this.startRun(slot, token);
+			const htmlFilePath = this.buildTempFilePath(repoRoot, stage);
+
+			try {
+				const range = await GitService.resolveRange(repoRoot, { kind: 'commit', head: commitHash });
+				const files = await this.runRangeDiff(context, repoRoot, range, htmlFilePath, progress, { token: run.source.token, priority: 'idle' }, false);
+				const entry = this._cache.set(repoRoot, stage, commitHash, htmlFilePath);
+				this.recordRangeFiles(repoRoot, range.baseTree, { stage, fingerprint: commitHash, files });
+				return entry.htmlPath;
+			} catch (error) {
+				await this.handleGenerationError(error, htmlFilePath, run, `commit ${commitHash.substring(0, 7)}`, false);
+				throw error;
+			} finally {
+				this.endRun(slot, run);
+			}
+		}));
+		this._background.set(key, prefetch);
+		try {
+			await prefetch;
+		} finally {
+			this._background.delete(key);
+		}
+		return true;
+	}
+
+	/**
+	 * Runs wild diff for a stage into htmlFilePath
+	 * With `wildestai.diff.incremental`, only files whose fingerprint changed since the last graph
+	 * of the stage are re-analyzed and merged into it (`--baseline <graph> --paths ...`); if that
+	 * fails, the full diff is generated, and if wild does not know the options incremental runs are off for the session.
+	 * @returns The per-file fingerprints the graph was generated from, when tracked
+	 */
+	private async runDiff(
+		context: vscode.ExtensionContext,
+		repoRoot: string,
+		stage: 'staged' | 'unstaged',
+		htmlFilePath: string,
+		progress: vscode.Progress<{ message?: string; increment?: number }>,
+		options: CliExecuteOptions,
+		reveal: boolean = true
+	): Promise<Map<string, string> | undefined> {
+		const files = await this.getFileFingerprints(repoRoot, stage);
+		const baseline = files && this.findBaseline(repoRoot, stage, files);
+		const args = this.buildDiffArgs(stage, htmlFilePath);
+		if (baseline && await this.executeIncremental(context, repoRoot, args, baseline, `${stage} diff in ${path.basename(repoRoot)}`, progress, options, reveal)) {
+			return files;
+		}
+
+		await this.executeDiff(context, repoRoot, args, progress, options, reveal);
+		return files;
+	}
+
+	/**
+	 * Runs wild diff for a resolved range into htmlFilePath
+	 * With `wildestai.diff.incremental`, the range is generated from the earlier range or commit
+	 * graph with the same base tree whose files differ least: only files whose change differs
+	 * are re-analyzed, and a graph of identical changes is copied without running wild.
+	 * @returns The per-file fingerprints the graph was generated from, when tracked
+	 */
+	private async runRangeDiff(
+		context: vscode.ExtensionContext,
+		repoRoot: string,
+		range: ResolvedDiffRange,
+		htmlFilePath: string,
+		progress: vscode.Progress<{ message?: string; increment?: number }>,
+		options: CliExecuteOptions,
+		reveal: boolean = true
+	): Promise<Map<string, string> | undefined> {
+		const files = await this.getRangeFileFingerprints(repoRoot, range);
+		const baseline = files && this.findRangeBaseline(repoRoot, range.baseTree, files);
+		if (baseline && baseline.paths.length === 0) {
+			this._outputChannel.appendLine(`Reusing the identical DiffGraph of ${range.base.substring(0, 7)}..${range.head.substring(0, 7)} in ${path.basename(repoRoot)}`);
+			await fs.promises.copyFile(baseline.htmlPath, htmlFilePath);
+			return files;
+		}
+
+		const args = ['diff', `${range.base}..${range.head}`, '--output', htmlFilePath, '--no-open'];
+		if (baseline && await this.executeIncremental(context, repoRoot, args, baseline, `diff of ${range.base.substring(0, 7)}..${range.head.substring(0, 7)}`, progress, options, reveal)) {
+			return files;
+		}
+
+		await this.executeDiff(context, repoRoot, args, progress, options, reveal);
+		return files;
+	}
+
+	/**
+	 * Runs wild on the changed paths only, merging them into the baseline graph
+	 * @returns Whether it succeeded; if wild does not know the options, incremental runs are off for the session
+	 */
+	private async executeIncremental(
+		context: vscode.ExtensionContext,
+		repoRoot: string,
+		args: string[],
+		baseline: { htmlPath: string; paths: string[] },
+		label: string,
+		progress: vscode.Progress<{ message?: string; increment?: number }>,
+		options: CliExecuteOptions,
+		reveal: boolean
+	): Promise<boolean> {
+		this._outputChannel.appendLine(`Re-analyzing ${baseline.paths.length} changed file(s) of the ${label}`);
+		try {
+			await this.executeDiff(context, repoRoot, [...args, '--baseline', baseline.htmlPath, '--paths', ...baseline.paths], progress, options, reveal);
+			return true;
+		} catch (error: any) {
+			if (error instanceof vscode.CancellationError) {
+				throw error;
+			}
+			if (error instanceof CliExitError && error.rejectsOption('--baseline', '--paths')) {
+				this._incrementalSupported = false;
+				this._outputChannel.appendLine(`This wild build does not support incremental generation, generating the full ${label}`);
+			} else {
+				this._outputChannel.appendLine(`Incremental generation failed (${error.message}), generating the full ${label}`);
+			}
+			return false;
+		}
+	}
+
+	private async executeDiff(
+		context: vscode.ExtensionContext,
+		repoRoot: string,
+		args: string[],
+		progress: vscode.Progress<{ message?: string; increment?: number }>,
+		options: CliExecuteOptions,
+		reveal: boolean
+	): Promise<void> {
+		const cliCommand = CliService.setupCommand(args, context);
+		this.logCommand(cliCommand, reveal);
+		const output = await CliService.execute(cliCommand, repoRoot, progress, {
+			...options,
+			onLine: (line) => this._outputChannel.appendLine(line.text)
 		});
+		this.logPhaseTimings(output.phases);
+	}
+
+	/**
+	 * Per-file fingerprints for incremental generation, or undefined if it is off or git failed
+	 */
+	private async getFileFingerprints(repoRoot: string, stage: 'staged' | 'unstaged'): Promise<Map<string, string> | undefined> {
+		const enabled = vscode.workspace.getConfiguration('wildestai.diff').get<boolean>('incremental', false);
+		if (!enabled || !this._incrementalSupported) {
+			return undefined;
+		}
+		try {
+			return await GitService.getFileFingerprints(repoRoot, stage);
+		} catch (error: any) {
+			this._outputChannel.appendLine(`Could not fingerprint files of ${stage} diff for ${path.basename(repoRoot)}: ${error.message}`);
+			return undefined;
+		}
+	}
+
+	/**
+	 * Per-file fingerprints of a range for incremental generation, or undefined if it is off or git failed
+	 */
+	private async getRangeFileFingerprints(repoRoot: string, range: ResolvedDiffRange): Promise<Map<string, string> | undefined> {
+		const enabled = vscode.workspace.getConfiguration('wildestai.diff').get<boolean>('incremental', false);
+		if (!enabled || !this._incrementalSupported) {
+			return undefined;
+		}
+		try {
+			return await GitService.getRangeFileFingerprints(repoRoot, range.baseTree, range.headTree);
+		} catch (error: any) {
+			this._outputChannel.appendLine(`Could not fingerprint files of ${range.base}..${range.head} in ${path.basename(repoRoot)}: ${error.message}`);
+			return undefined;
+		}
+	}
+
+	/**
+	 * The cached range or commit graph with the same base tree whose files differ least, if worth an incremental run
+	 * No paths means the graph shows exactly the same changes.
+	 */
+	private findRangeBaseline(
+		repoRoot: string,
+		baseTree: string,
+		files: Map<string, string>
+	): { htmlPath: string; paths: string[] } | undefined {
+		let best: { htmlPath: string; paths: string[] } | undefined;
+		for (const previous of this._rangeFiles.get(`${repoRoot}:${baseTree}`) ?? []) {
+			const entry = this._cache.peek(repoRoot, previous.stage, previous.fingerprint);
+			if (!entry || !fs.existsSync(entry.htmlPath)) {
+				continue;
+			}
+			const paths = changedPaths(previous.files, files);
+			if (paths.size > MAX_INCREMENTAL_PATHS || (paths.size > 0 && paths.size >= files.size)) {
+				continue;
+			}
+			if (!best || paths.size < best.paths.length) {
+				best = { htmlPath: entry.htmlPath, paths: [...paths] };
+			}
+		}
+		return best;
+	}
+
+	private recordRangeFiles(repoRoot: string, baseTree: string, graph: { stage: DiffGraphStage; fingerprint: string; files: Map<string, string> | undefined }): void {
+		if (!graph.files) {
+			return;
+		}
+		const key = `${repoRoot}:${baseTree}`;
+		const graphs = (this._rangeFiles.get(key) ?? []).filter(previous => previous.stage !== graph.stage || previous.fingerprint !== graph.fingerprint);
+		graphs.push({ stage: graph.stage, fingerprint: graph.fingerprint, files: graph.files });
+		this._rangeFiles.set(key, graphs.slice(-MAX_RANGE_BASELINES));
+	}
+
+	/**
+	 * The last cached graph of the stage and the files that changed since, if worth an incremental run
+	 */
+	private findBaseline(
+		repoRoot: string,
+		stage: 'staged' | 'unstaged',
+		files: Map<string, string>
+	): { htmlPath: string; paths: string[] } | undefined {
+		const previous = this._graphFiles.get(`${repoRoot}:${stage}`);
+		const entry = previous && this._cache.peek(repoRoot, stage, previous.fingerprint);
+		if (!previous || !entry || !fs.existsSync(entry.htmlPath)) {
+			return undefined;
+		}
+
+		const paths = changedPaths(previous.files, files);
+
+		// Past this point a full run costs about the same and avoids a huge command line
+		if (paths.size === 0 || paths.size > MAX_INCREMENTAL_PATHS || paths.size >= files.size) {
+			return undefined;
+		}
+		return { htmlPath: entry.htmlPath, paths: [...paths] };
+	}
+
+	private recordGraphFiles(slot: string, fingerprint: string, files: Map<string, string> | undefined): void {
+		if (files) {
+			this._graphFiles.set(slot, { fingerprint, files });
+		}
+	}
+
+	/**
+	 * Registers a generation for a slot (a repository and stage, or a range or commit graph), preempting any older one
+	 * The returned run's token is cancelled by the progress notification or by preemption
+	 */
+	private startRun(slot: string, token: vscode.CancellationToken): ActiveRun {
+		this.preempt(slot);
+
+		const source = new vscode.CancellationTokenSource();
+		const run: ActiveRun = {
+			source,
+			subscription: token.onCancellationRequested(() => source.cancel()),
+			preempted: false
+		};
+		this._activeRuns.set(slot, run);
+		return run;
+	}
+
+	/**
+	 * Takes over a background generation or prefetch of a graph the user is now waiting for
+	 * It runs at a priority that foreground work queued meanwhile goes ahead of, so it is
+	 * cancelled and the caller generates the graph in the foreground, unless it finished first.
+	 * @returns The HTML path of the graph if the background run finished
+	 */
+	private async takeOverBackgroundRun(key: string, slot: string): Promise<string | undefined> {
+		const background = this._background.get(key);
+		await this.showLoadingScreen();
+		this.preempt(slot);
+		return background?.catch(() => undefined);
+	}
+
+	/**
+	 * Cancels the generation running in a slot, if any, in favour of a newer request
+	 */
+	private preempt(slot: string): void {
+		const previous = this._activeRuns.get(slot);
+		if (previous) {
+			previous.preempted = true;
+			previous.source.cancel();
+		}
+	}
+
+	private endRun(slot: string, run: ActiveRun): void {
+		if (this._activeRuns.get(slot) === run) {
+			this._activeRuns.delete(slot);
+		}
+		run.subscription.dispose();
+		run.source.dispose();
+	}
+
+	/**
+	 * Cleans up after a failed or cancelled generation, leaving the cache untouched
+	 * @param interactive - Whether the user is waiting on the webview for this generation
+	 */
+	private async handleGenerationError(
+		error: unknown,
+		htmlFilePath: string,
+		run: ActiveRun,
+		label: string,
+		interactive: boolean = true
+	): Promise<void> {
+		// Remove partial output
+		await fs.promises.rm(htmlFilePath, { force: true }).catch(() => undefined);
+
+		if (!(error instanceof vscode.CancellationError)) {
+			return;
+		}
+		if (run.preempted) {
+			this._outputChannel.appendLine(`Generation of ${label} superseded by a newer request`);
+		} else {
+			this._outputChannel.appendLine(`Generation of ${label} cancelled`);
+			if (interactive) {
+				await this._diffGraphViewProvider?.showCancelledScreen();
+			}
+		}
+	}
+
+	/**
+	 * Computes the content fingerprint for a stage, or undefined if git could not provide one
+	 */
+	private async getFingerprint(repoRoot: string, stage: 'staged' | 'unstaged'): Promise<string | undefined> {
+		try {
+			return await GitService.getDiffFingerprint(repoRoot, stage);
+		} catch (error: any) {
+			this._outputChannel.appendLine(`Could not fingerprint ${stage} diff for ${path.basename(repoRoot)}: ${error.message}`);
+			return undefined;
+		}
+	}
+
+	/**
+	 * Builds the wild arguments for a working tree or staged diff
+	 */
+	private buildDiffArgs(stage: 'staged' | 'unstaged', htmlFilePath: string): string[] {
+		const args: string[] = ['diff', '--output', htmlFilePath, '--no-open'];
+		if (stage === 'staged') {
+			args.push('--staged');
+		}
+		return args;
 	}
 
 	/**
@@ -245,6 +935,37 @@ export class DiffService {
 		return path.join(os.tmpdir(), `wildest-${repoName}-${stage}-${timestamp}.html`);
 	}
 
+	/**
+	 * Deletes `wildest-*.html` temp files left behind by earlier sessions
+	 * Files that are recent (possibly still being written by another window)
+	 * or referenced by a cache entry are kept
+	 */
+	private async sweepOrphanedTempFiles(): Promise<void> {
+		try {
+			const tmpDir = os.tmpdir();
+			const referenced = new Set(this._cache.getEntries().map(entry => entry.htmlPath));
+			const cutoff = Date.now() - ORPHANED_TEMP_FILE_AGE_MS;
+			let removed = 0;
+			for (const name of await fs.promises.readdir(tmpDir)) {
+				if (!/^wildest-.*\.html$/.test(name)) {
+					continue;
+				}
+				const filePath = path.join(tmpDir, name);
+				const stat = await fs.promises.stat(filePath).catch(() => undefined);
+				if (!stat?.isFile() || stat.mtimeMs > cutoff || referenced.has(filePath)) {
+					continue;
+				}
+				await fs.promises.rm(filePath, { force: true });
+				removed++;
+			}
+			if (removed > 0) {
+				this._outputChannel.appendLine(`Removed ${removed} orphaned DiffGraph temp file(s) from ${tmpDir}`);
+			}
+		} catch (error: any) {
+			this._outputChannel.appendLine(`Failed to sweep DiffGraph temp files: ${error.message}`);
+		}
+	}
+
 	/**
 	 * Shows the loading screen in the webview
 	 */
@@ -268,18 +989,53 @@ export class DiffService {
 			await this._diffGraphViewProvider.showNoChangesScreen();
 			return;
 		}
-		await this._diffGraphViewProvider.showDiffGraph(htmlFilePath);
+		await this._diffGraphViewProvider.showDiffGraph(htmlFilePath, this._cache.getDocumentPath(htmlFilePath));
 	}
 
 	/**
-	 * Logs CLI command output
+	 * Logs the CLI command; its output is forwarded line by line as it arrives
 	 */
-	private logOutput(command: string, stdout: string, stderr: string): void {
-		this._outputChannel.appendLine(`Executed: ${command}`);
-		this._outputChannel.appendLine('CLI stdout:\n' + stdout);
-		if (stderr) {
-			this._outputChannel.appendLine('CLI stderr:\n' + stderr);
+	private logCommand(command: CliCommand, reveal: boolean = true): void {
+		this._outputChannel.appendLine(`Executing: ${command.executable} ${command.args.join(' ')}`);
+		if (reveal) {
+			this._outputChannel.show(true);
 		}
-		this._outputChannel.show(true);
 	}
+
+	/**
+	 * Log how long each phase of a run took, when wild reported structured progress
+	 */
+	private logPhaseTimings(phases: CliPhaseTiming[]): void {
+		if (phases.length > 0) {
+			this._outputChannel.appendLine(`Phase timings: ${formatPhaseTimings(phases)}`);
+		}
+	}
+}
+
+/**
+ * Paths whose fingerprint differs between two per-file fingerprint maps, including files only in one of them
+ */
+function changedPaths(previous: Map<string, string>, files: Map<string, string>): Set<string> {
+	const paths = new Set<string>();
+	for (const [file, fingerprint] of files) {
+		if (previous.get(file) !== fingerprint) {
+			paths.add(file);
+		}
+	}
+	for (const file of previous.keys()) {
+		if (!files.has(file)) {
+			paths.add(file);
+		}
+	}
+	return paths;
+}
+
+/**
+ * How a range is shown in titles and messages, in git's notation
+ */
+function describeRange(range: DiffGraphRange): string {
+	if (range.kind === 'commit') {
+		return `commit ${range.head.substring(0, 7)}`;
+	}
+	return `${range.base}${range.kind === 'mergeBase' ? '...' : '..'}${range.head}`;
 }
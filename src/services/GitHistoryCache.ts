@@ -2,7 +2,6 @@ import { GitCommit } from '../utils/types';
 
 interface CacheEntry {
 	commits: GitCommit[];
-	graphLines: string[];
 	timestamp: number;
 }
 
@@ -10,7 +9,7 @@ export class GitHistoryCache {
 	private static cache: Map<string, CacheEntry> = new Map();
 	private static readonly CACHE_TTL = 5 * 60 * 1000; // 5 minutes
 
-	public static getCached(repoPath: string): { commits: GitCommit[]; graphLines: string[] } | null {
+	public static getCached(repoPath: string): { commits: GitCommit[] } | null {
 		const entry = this.cache.get(repoPath);
 		if (!entry) { return null; }
 
@@ -21,15 +20,13 @@ export class GitHistoryCache {
 		}
 
 		return {
-			commits: [...entry.commits],
-			graphLines: [...entry.graphLines]
+			commits: [...entry.commits]
 		};
 	}
 
-	public static update(repoPath: string, commits: GitCommit[], graphLines: string[]): void {
+	public static update(repoPath: string, commits: GitCommit[]): void {
 		this.cache.set(repoPath, {
 			commits: [...commits],
-			graphLines: [...graphLines],
 			timestamp: Date.now()
 		});
 	}
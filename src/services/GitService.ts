@@ -1,11 +1,21 @@
 import * as vscode from 'vscode';
+import * as cp from 'child_process';
+import * as crypto from 'crypto';
 import * as path from 'path';
-import { GitInfo } from '../utils/types';
+import { DiffGraphRange, GitInfo, ResolvedDiffRange } from '../utils/types';
+
+/** Hash of the empty tree, used as the base when HEAD does not exist yet */
+const EMPTY_TREE_HASH = '4b825dc642cb6eb9a060e54bf8d69288fbee4904';
 
 export class GitService {
 	private static gitAPI: any;
 	private static initializationPromise: Promise<void> | undefined;
 	private static stateChangeDisposable: vscode.Disposable | undefined;
+	private static repositoryListeners: Map<string, vscode.Disposable> = new Map();
+	private static _onDidChangeRepository = new vscode.EventEmitter<string>();
+
+	/** Fires with the repository root whenever the Git extension reports a change to a repository's state */
+	public static readonly onDidChangeRepository: vscode.Event<string> = GitService._onDidChangeRepository.event;
 
 	private static async waitForGitInitialization(maxAttempts: number = 10, delayMs: number = 1000): Promise<void> {
 		if (!this.initializationPromise) {
@@ -30,15 +40,17 @@ export class GitService {
 
 		// Dispose previous subscription to prevent memory leaks on re-initialization
 		this.stateChangeDisposable?.dispose();
+		for (const repoRoot of [...this.repositoryListeners.keys()]) {
+			this.unwatchRepository(repoRoot);
+		}
 
 		// Subscribe to repository change events
-		this.stateChangeDisposable = this.gitAPI.onDidChangeState(() => {
-			// TODO: Future feature - Auto-generate wild diff on git state changes (behind feature flag)
-			// When implementing:
-			// 1. Add a VSCode extension setting for enabling auto-diff generation
-			// 2. Check the feature flag from extension settings
-			// 3. If enabled, trigger CliService.generateDiff() for affected repositories
-		});
+		this.stateChangeDisposable = vscode.Disposable.from(
+			this.gitAPI.onDidChangeState(() => this.watchRepositories()),
+			this.gitAPI.onDidOpenRepository((repository: any) => this.watchRepository(repository)),
+			this.gitAPI.onDidCloseRepository((repository: any) => this.unwatchRepository(repository.rootUri.fsPath))
+		);
+		this.watchRepositories();
 
 		let attempts = 0;
 		const checkRepositories = async (): Promise<void> => {
@@ -58,6 +70,27 @@ export class GitService {
 		await checkRepositories();
 	}
 
+	private static watchRepositories(): void {
+		for (const repository of this.gitAPI?.repositories ?? []) {
+			this.watchRepository(repository);
+		}
+	}
+
+	private static watchRepository(repository: any): void {
+		const repoRoot: string = repository.rootUri.fsPath;
+		if (this.repositoryListeners.has(repoRoot)) {
+			return;
+		}
+		this.repositoryListeners.set(repoRoot, repository.state.onDidChange(() => {
+			this._onDidChangeRepository.fire(repoRoot);
+		}));
+	}
+
+	private static unwatchRepository(repoRoot: string): void {
+		this.repositoryListeners.get(repoRoot)?.dispose();
+		this.repositoryListeners.delete(repoRoot);
+	}
+
 	public static async getRepositories(): Promise<GitInfo[]> {
 		try {
 			await this.waitForGitInitialization();
@@ -123,4 +156,195 @@ export class GitService {
 
 		return selected?.repoPath;
 	}
+
+	/**
+	 * Compute a fingerprint of the diff input for a repository stage.
+	 * Staged: HEAD tree and the index entries (`git ls-files -s`). Unstaged: hash of the `git diff` patch.
+	 * Identical diff inputs always produce the same fingerprint, so reverting an edit
+	 * brings back the fingerprint of the earlier state.
+	 */
+	public static async getDiffFingerprint(repoRoot: string, stage: 'staged' | 'unstaged'): Promise<string> {
+		if (stage === 'staged') {
+			// Unlike write-tree this writes nothing, and it lists unmerged entries with their stage during a conflict
+			const index = await this.hashGitOutput(repoRoot, ['ls-files', '-s', '-z']);
+			const headTree = await this.resolveTree(repoRoot, 'HEAD') ?? EMPTY_TREE_HASH;
+			return crypto.createHash('sha256').update(`${headTree}..${index}`).digest('hex');
+		}
+		return this.hashGitOutput(repoRoot, ['diff', '--binary', '--no-color', '--no-ext-diff']);
+	}
+
+	/**
+	 * Compute a fingerprint per changed file of a repository stage, keyed by repository-relative path
+	 * Staged: mode and blob of the index entry. Unstaged: mode and blob hash of the working tree file.
+	 * Files whose working tree content matches the index (only their stat info changed) are left out.
+	 */
+	public static async getFileFingerprints(repoRoot: string, stage: 'staged' | 'unstaged'): Promise<Map<string, string>> {
+		const fingerprints = new Map<string, string>();
+		if (stage === 'staged') {
+			const base = await this.resolveTree(repoRoot, 'HEAD') ?? EMPTY_TREE_HASH;
+			for (const change of this.parseRawDiff(await this.execGit(repoRoot, ['diff-index', '--cached', '-z', '--no-renames', base]))) {
+				fingerprints.set(change.path, `${change.mode}:${change.blob}:${change.status}`);
+			}
+			return fingerprints;
+		}
+
+		const changes = this.parseRawDiff(await this.execGit(repoRoot, ['diff-files', '-z', '--no-renames']));
+		const present: typeof changes = [];
+		for (const change of changes) {
+			if (change.status === 'D') {
+				fingerprints.set(change.path, `deleted:${change.srcBlob}`);
+			} else if (change.mode === '160000') {
+				// Submodules can't be hashed as files; their commit is all the diff shows
+				fingerprints.set(change.path, `submodule:${change.blob}`);
+			} else {
+				present.push(change);
+			}
+		}
+		// Batched to stay within command line limits
+		for (let i = 0; i < present.length; i += 100) {
+			const batch = present.slice(i, i + 100);
+			const hashes = (await this.execGit(repoRoot, ['hash-object', '--', ...batch.map(change => change.path)])).trim().split('\n');
+			batch.forEach((change, index) => {
+				if (hashes[index] !== change.srcBlob) {
+					fingerprints.set(change.path, `${change.mode}:${hashes[index]}`);
+				}
+			});
+		}
+		return fingerprints;
+	}
+
+	/**
+	 * Parse `base..head`, `base...head` or a single revision (compared against its first parent)
+	 */
+	public static parseRange(text: string): DiffGraphRange | undefined {
+		const trimmed = text.trim();
+		const match = /^(.*?)(\.{2,3})(.*)$/.exec(trimmed);
+		if (!match) {
+			return trimmed ? { kind: 'commit', head: trimmed } : undefined;
+		}
+		// An omitted side means HEAD, as in git
+		const base = match[1] || 'HEAD';
+		const head = match[3] || 'HEAD';
+		return { kind: match[2] === '...' ? 'mergeBase' : 'range', base, head };
+	}
+
+	/**
+	 * Resolve a range to commits and trees, so DiffGraphs can be cached by what they compare
+	 * The base of a root commit is the empty tree.
+	 */
+	public static async resolveRange(repoRoot: string, range: DiffGraphRange): Promise<ResolvedDiffRange> {
+		const head = await this.resolveCommit(repoRoot, range.head);
+		let base: string;
+		if (range.kind === 'commit') {
+			base = await this.resolveCommit(repoRoot, `${head}^`).catch(() => EMPTY_TREE_HASH);
+		} else if (range.kind === 'mergeBase') {
+			const mergeBase = (await this.execGit(repoRoot, ['merge-base', range.base, head]).catch(() => '')).trim();
+			if (!mergeBase) {
+				throw new Error(`${range.base} and ${range.head} have no common ancestor`);
+			}
+			base = mergeBase;
+		} else {
+			base = await this.resolveCommit(repoRoot, range.base);
+		}
+
+		const baseTree = base === EMPTY_TREE_HASH ? EMPTY_TREE_HASH : await this.resolveTree(repoRoot, base);
+		const headTree = await this.resolveTree(repoRoot, head);
+		if (!baseTree || !headTree) {
+			throw new Error(`Could not resolve the trees of ${base}..${head}`);
+		}
+		return { base, head, baseTree, headTree };
+	}
+
+	/**
+	 * Compute a fingerprint per file changed between two trees, keyed by repository-relative path
+	 * Graphs of ranges with the same base tree can reuse the results of files with equal fingerprints.
+	 */
+	public static async getRangeFileFingerprints(repoRoot: string, baseTree: string, headTree: string): Promise<Map<string, string>> {
+		const fingerprints = new Map<string, string>();
+		for (const change of this.parseRawDiff(await this.execGit(repoRoot, ['diff-tree', '-r', '-z', '--no-renames', baseTree, headTree]))) {
+			fingerprints.set(change.path, `${change.mode}:${change.blob}:${change.status}`);
+		}
+		return fingerprints;
+	}
+
+	/**
+	 * Parse `git diff-* -z` raw output: `:srcMode dstMode srcBlob dstBlob status\0path\0`
+	 */
+	private static parseRawDiff(output: string): { path: string; mode: string; srcBlob: string; blob: string; status: string }[] {
+		const changes: { path: string; mode: string; srcBlob: string; blob: string; status: string }[] = [];
+		const fields = output.split('\0');
+		for (let i = 0; i + 1 < fields.length; i += 2) {
+			const [, mode, srcBlob, blob, status] = fields[i].substring(1).split(' ');
+			changes.push({ path: fields[i + 1], mode, srcBlob, blob, status: status.charAt(0) });
+		}
+		return changes;
+	}
+
+	/**
+	 * Resolve a revision to its tree hash, or undefined if it does not exist (e.g. unborn HEAD)
+	 */
+	public static async resolveTree(repoRoot: string, rev: string): Promise<string | undefined> {
+		try {
+			return (await this.execGit(repoRoot, ['rev-parse', '--verify', '--quiet', `${rev}^{tree}`])).trim() || undefined;
+		} catch {
+			return undefined;
+		}
+	}
+
+	/**
+	 * Resolve a revision to its commit hash, rejecting if it does not name a commit
+	 */
+	private static async resolveCommit(repoRoot: string, rev: string): Promise<string> {
+		const hash = (await this.execGit(repoRoot, ['rev-parse', '--verify', '--quiet', `${rev}^{commit}`]).catch(() => '')).trim();
+		if (!hash) {
+			throw new Error(`Unknown revision ${rev}`);
+		}
+		return hash;
+	}
+
+	/**
+	 * Run a git command in the repository and return its stdout
+	 */
+	public static execGit(repoRoot: string, args: string[]): Promise<string> {
+		return new Promise((resolve, reject) => {
+			cp.execFile(this.getGitPath(), args, {
+				cwd: repoRoot,
+				env: this.getGitEnv(),
+				maxBuffer: 64 * 1024 * 1024
+			}, (error, stdout, stderr) => {
+				if (error) {
+					reject(new Error(`git ${args[0]} failed: ${stderr || error.message}`));
+				} else {
+					resolve(stdout);
+				}
+			});
+		});
+	}
+
+	/**
+	 * Run a git command and return the sha256 of its stdout, without buffering the output
+	 */
+	private static hashGitOutput(repoRoot: string, args: string[]): Promise<string> {
+		return new Promise((resolve, reject) => {
+			const hash = crypto.createHash('sha256');
+			let stderr = '';
+			const child = cp.spawn(this.getGitPath(), args, { cwd: repoRoot, env: this.getGitEnv() });
+			child.stdout.on('data', (chunk: Buffer) => hash.update(chunk));
+			child.stderr.setEncoding('utf8');
+			child.stderr.on('data', (data: string) => { stderr += data; });
+			child.on('error', reject);
+			child.on('close', (code: number) => {
+				code === 0 ? resolve(hash.digest('hex')) : reject(new Error(`git ${args[0]} failed: ${stderr || `exit code ${code}`}`));
+			});
+		});
+	}
+
+	private static getGitPath(): string {
+		return this.gitAPI?.git?.path || 'git';
+	}
+
+	private static getGitEnv(): NodeJS.ProcessEnv {
+		// Don't contend with the Git extension for index.lock on read-only queries
+		return Object.assign({}, process.env, { GIT_OPTIONAL_LOCKS: '0' });
+	}
 }
@@ -0,0 +1,335 @@
+import * as vscode from 'vscode';
+import * as cp from 'child_process';
+import { CliCommand, CliOutputSink } from '../utils/types';
+import { CliExitError } from '../utils/CliExitError';
+import { LineSplitter } from '../utils/LineSplitter';
+
+/** How often a running daemon is pinged */
+const HEALTH_CHECK_INTERVAL_MS = 30 * 1000;
+/** How long the daemon gets to answer a ping, or to come up after starting */
+const HEALTH_CHECK_TIMEOUT_MS = 10 * 1000;
+/** How long a cancelled request gets to finish before it is abandoned and its worker retired */
+const CANCEL_GRACE_PERIOD_MS = 3000;
+/** Crashes tolerated within RESTART_WINDOW_MS before the daemon is given up on */
+const MAX_RESTARTS = 3;
+const RESTART_WINDOW_MS = 60 * 1000;
+
+/** JSON-RPC error code for a request cancelled by the client */
+const REQUEST_CANCELLED = -32800;
+
+/**
+ * The daemon cannot serve a request (not supported, crashed or unresponsive)
+ * The request was not completed and can be retried by spawning wild.
+ */
+export class WildDaemonUnavailableError extends Error {
+	constructor(message: string) {
+		super(message);
+		this.name = 'WildDaemonUnavailableError';
+	}
+}
+
+interface PendingRequest {
+	/** Worker the request was sent to */
+	child: cp.ChildProcess;
+	method: string;
+	resolve: (result: any) => void;
+	reject: (error: Error) => void;
+	sink?: CliOutputSink;
+}
+
+/**
+ * A persistent `wild serve --stdio` worker, so diffs skip process startup and model loading
+ *
+ * Speaks newline-delimited JSON-RPC 2.0 over stdin/stdout:
+ * - `run` `{args, cwd}` runs a wild command and resolves with `{exitCode}`
+ * - `output` `{id, stream, text}` and `progress` `{id, ...CliProgressEvent}` notifications carry its output
+ * - `cancel` `{id}` aborts a run, which then fails with error code -32800
+ * - `ping` is used for health checks
+ *
+ * Requests are multiplexed by id. The worker is started on first use and restarted after a crash;
+ * if it cannot start, or keeps crashing, the daemon reports itself unavailable and callers spawn wild.
+ * A worker that ignores a cancellation is retired: new requests go to a fresh worker, and the old
+ * one is killed once the requests it is still serving have finished.
+ */
+export class WildDaemon {
+	private _child?: cp.ChildProcess;
+	private _starting?: Promise<cp.ChildProcess>;
+	private _nextId = 1;
+	private _pending: Map<number, PendingRequest> = new Map();
+	private _healthCheck?: NodeJS.Timeout;
+	/** Workers no longer taking requests, killed once their requests are done */
+	private _retiring: Set<cp.ChildProcess> = new Set();
+	private _crashes: number[] = [];
+	private _disabled = false;
+	private _disposed = false;
+
+	/**
+	 * @param _log - Receives the worker's stderr and lifecycle messages, e.g. for the output channel
+	 */
+	constructor(private readonly _command: CliCommand, private readonly _log: (message: string) => void = () => { }) { }
+
+	/**
+	 * Whether a command can be sent to this daemon instead of being spawned
+	 */
+	public accepts(command: CliCommand): boolean {
+		return !this._disabled && !this._disposed && command.executable === this._command.executable;
+	}
+
+	/**
+	 * Run a wild command in the daemon
+	 * @throws WildDaemonUnavailableError if the daemon could not take or finish the request
+	 */
+	public async run(args: string[], cwd: string, sink: CliOutputSink, token?: vscode.CancellationToken): Promise<void> {
+		const child = await this.ensureStarted();
+		if (token?.isCancellationRequested) {
+			throw new vscode.CancellationError();
+		}
+
+		const id = this._nextId++;
+		let cancelTimer: NodeJS.Timeout | undefined;
+		const cancellation = token?.onCancellationRequested(() => {
+			this.send(child, { jsonrpc: '2.0', method: 'cancel', params: { id } });
+			// A request that ignores cancellation would keep its slot busy forever
+			cancelTimer = setTimeout(() => this.abandon(id, 'did not honour cancellation'), CANCEL_GRACE_PERIOD_MS);
+		});
+
+		try {
+			const result = await this.request(child, id, 'run', { args, cwd }, sink);
+			if (result?.exitCode !== 0) {
+				throw new CliExitError(result?.exitCode);
+			}
+		} catch (error) {
+			if (token?.isCancellationRequested) {
+				throw new vscode.CancellationError();
+			}
+			throw error;
+		} finally {
+			cancellation?.dispose();
+			if (cancelTimer) { clearTimeout(cancelTimer); }
+		}
+	}
+
+	/**
+	 * Stop the worker and fail any requests in flight
+	 */
+	public dispose(): void {
+		this._disposed = true;
+		const error = new WildDaemonUnavailableError('wild daemon was shut down');
+		for (const child of [this._child, ...this._retiring]) {
+			if (child) {
+				this.rejectPending(child, error);
+				child.kill();
+			}
+		}
+		this.stopHealthCheck();
+		this._child = undefined;
+		this._retiring.clear();
+	}
+
+	private ensureStarted(): Promise<cp.ChildProcess> {
+		if (this._disabled || this._disposed) {
+			return Promise.reject(new WildDaemonUnavailableError('wild daemon is not available'));
+		}
+		if (this._child) {
+			return Promise.resolve(this._child);
+		}
+		if (!this._starting) {
+			this._starting = this.start().finally(() => { this._starting = undefined; });
+		}
+		return this._starting;
+	}
+
+	private async start(): Promise<cp.ChildProcess> {
+		const child = cp.spawn(this._command.executable, this._command.args, {
+			env: this._command.env
+		});
+
+		const stdoutSplitter = new LineSplitter((line) => this.handleMessage(line));
+		const stderrSplitter = new LineSplitter((line) => {
+			if (line) {
+				this._log(line);
+			}
+		});
+		child.stdout.setEncoding('utf8');
+		child.stderr.setEncoding('utf8');
+		child.stdout.on('data', (data: string) => stdoutSplitter.push(data));
+		child.stderr.on('data', (data: string) => stderrSplitter.push(data));
+		child.stdin.on('error', () => { });
+
+		let ready = false;
+		const exited = new Promise<never>((_, reject) => {
+			const onExit = (reason: string) => {
+				this.rejectPending(child, new WildDaemonUnavailableError(`wild daemon ${reason}`));
+				this._retiring.delete(child);
+				if (this._child === child) {
+					this._child = undefined;
+					this.stopHealthCheck();
+					this.recordCrash();
+				}
+				if (!ready) {
+					// Most likely a wild build without `serve`; don't try again this session
+					this._disabled = true;
+				}
+				reject(new WildDaemonUnavailableError(`wild daemon ${reason}`));
+			};
+			child.on('error', (error) => onExit(`failed to start: ${error.message}`));
+			child.on('exit', (code, signal) => onExit(`exited (${signal ?? code})`));
+		});
+		exited.catch(() => { });
+
+		try {
+			await Promise.race([this.ping(child), exited]);
+		} catch (error) {
+			this.rejectPending(child, error as Error);
+			child.kill();
+			this._disabled = true;
+			throw error instanceof WildDaemonUnavailableError ? error : new WildDaemonUnavailableError(`wild daemon did not start: ${error}`);
+		}
+
+		ready = true;
+		this._child = child;
+		this._healthCheck = setInterval(() => {
+			this.ping(child).catch(() => {
+				// A worker busy with a large diff may answer late; only an idle worker is unhealthy
+				if (!this.hasPendingRuns(child)) {
+					this.retire(child, 'failed a health check');
+				}
+			});
+		}, HEALTH_CHECK_INTERVAL_MS);
+		this._healthCheck.unref();
+		return child;
+	}
+
+	private ping(child: cp.ChildProcess): Promise<void> {
+		const id = this._nextId++;
+		return new Promise<void>((resolve, reject) => {
+			const timer = setTimeout(() => {
+				this._pending.delete(id);
+				reject(new WildDaemonUnavailableError('wild daemon did not answer a ping'));
+			}, HEALTH_CHECK_TIMEOUT_MS);
+			this.request(child, id, 'ping', {}).then(
+				() => { clearTimeout(timer); resolve(); },
+				(error) => { clearTimeout(timer); reject(error); }
+			);
+		});
+	}
+
+	private request(child: cp.ChildProcess, id: number, method: string, params: object, sink?: CliOutputSink): Promise<any> {
+		return new Promise((resolve, reject) => {
+			this._pending.set(id, { child, method, resolve, reject, sink });
+			this.send(child, { jsonrpc: '2.0', id, method, params });
+		});
+	}
+
+	private send(child: cp.ChildProcess, message: object): void {
+		child.stdin?.write(JSON.stringify(message) + '\n');
+	}
+
+	private handleMessage(line: string): void {
+		if (!line) {
+			return;
+		}
+		let message: any;
+		try {
+			message = JSON.parse(line);
+		} catch {
+			this._log(line);
+			return;
+		}
+
+		if (message.id !== undefined && message.method === undefined) {
+			const pending = this._pending.get(message.id);
+			if (!pending) {
+				return;
+			}
+			this._pending.delete(message.id);
+			if (message.error) {
+				pending.reject(message.error.code === REQUEST_CANCELLED
+					? new vscode.CancellationError()
+					: new Error(message.error.message ?? 'wild daemon request failed'));
+			} else {
+				pending.resolve(message.result);
+			}
+			this.killIfDone(pending.child);
+			return;
+		}
+
+		const sink = this._pending.get(message.params?.id)?.sink;
+		if (message.method === 'output') {
+			sink?.line({ stream: message.params.stream === 'stderr' ? 'stderr' : 'stdout', text: String(message.params.text) });
+		} else if (message.method === 'progress') {
+			sink?.progress(message.params);
+		}
+	}
+
+	/**
+	 * Give up on a request that ignored its cancellation, and retire the worker running it
+	 */
+	private abandon(id: number, reason: string): void {
+		const pending = this._pending.get(id);
+		if (!pending) {
+			return;
+		}
+		this._pending.delete(id);
+		pending.reject(new vscode.CancellationError());
+		this.retire(pending.child, `request ${reason}`);
+	}
+
+	/**
+	 * Stop sending requests to an unhealthy worker; the next request starts a fresh one
+	 * Requests it is still serving are left to finish, then it is killed.
+	 */
+	private retire(child: cp.ChildProcess, reason: string): void {
+		if (this._retiring.has(child) || child.exitCode !== null || child.signalCode !== null) {
+			return;
+		}
+		this._log(`${reason}, restarting`);
+		if (this._child === child) {
+			this._child = undefined;
+			this.stopHealthCheck();
+		}
+		this._retiring.add(child);
+		this.recordCrash();
+		this.killIfDone(child);
+	}
+
+	private killIfDone(child: cp.ChildProcess): void {
+		if (this._retiring.has(child) && ![...this._pending.values()].some(pending => pending.child === child)) {
+			this._retiring.delete(child);
+			child.kill('SIGKILL');
+		}
+	}
+
+	private hasPendingRuns(child: cp.ChildProcess): boolean {
+		return [...this._pending.values()].some(pending => pending.child === child && pending.method === 'run');
+	}
+
+	/**
+	 * Fail the requests in flight on a worker
+	 */
+	private rejectPending(child: cp.ChildProcess, error: Error): void {
+		for (const [id, pending] of this._pending) {
+			if (pending.child === child) {
+				this._pending.delete(id);
+				pending.reject(error);
+			}
+		}
+	}
+
+	private stopHealthCheck(): void {
+		if (this._healthCheck) {
+			clearInterval(this._healthCheck);
+			this._healthCheck = undefined;
+		}
+	}
+
+	private recordCrash(): void {
+		const now = Date.now();
+		this._crashes = this._crashes.filter(time => now - time < RESTART_WINDOW_MS);
+		this._crashes.push(now);
+		if (this._crashes.length > MAX_RESTARTS) {
+			this._log('keeps failing, falling back to spawning wild for this session');
+			this._disabled = true;
+		}
+	}
+}
@@ -0,0 +1,72 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as os from 'os';
+import { CliService } from '../services/CliService';
+import { CliProgressTracker, formatPhaseTimings, parseProgressEvent } from '../services/CliProgress';
+
+suite('CLI Progress Test Suite', () => {
+	test('parseProgressEvent ignores anything but progress events', () => {
+		assert.strictEqual(parseProgressEvent('Analyzing files...'), undefined);
+		assert.strictEqual(parseProgressEvent('{not json'), undefined);
+		assert.strictEqual(parseProgressEvent('{"event":"other"}'), undefined);
+		assert.deepStrictEqual(parseProgressEvent('{"event":"progress","percent":10}'), { event: 'progress', percent: 10 });
+	});
+
+	test('tracker reports increments and per-phase timings', () => {
+		const tracker = new CliProgressTracker();
+
+		assert.deepStrictEqual(tracker.handle({ event: 'phase', phase: 'parse' }, 0), { message: 'parse', increment: undefined });
+		assert.deepStrictEqual(
+			tracker.handle({ event: 'progress', phase: 'parse', percent: 30, filesDone: 3, filesTotal: 10 }, 1000),
+			{ message: 'parse | 3/10 files', increment: 30 }
+		);
+		assert.strictEqual(tracker.handle({ event: 'progress', phase: 'analyze', percent: 25 }, 4000).increment, undefined,
+			'Progress should never go backwards');
+		assert.strictEqual(tracker.handle({ event: 'progress', percent: 80 }, 5000).increment, 50);
+		assert.deepStrictEqual(tracker.handle({ event: 'done' }, 94000), { increment: 20 });
+
+		assert.deepStrictEqual(tracker.timings, [
+			{ phase: 'parse', durationMs: 4000 },
+			{ phase: 'analyze', durationMs: 90000 }
+		]);
+		assert.strictEqual(formatPhaseTimings(tracker.timings), 'parse 4.0s, analyze 1m 30s');
+	});
+
+	test('CliService reads progress events from WILD_PROGRESS_FD', async () => {
+		const script = `
+			const fd = Number(process.env.WILD_PROGRESS_FD);
+			const fs = require('fs');
+			fs.writeSync(fd, JSON.stringify({ event: 'phase', phase: 'parse' }) + '\\n');
+			console.log('{"event":"progress","percent":99}');
+			fs.writeSync(fd, JSON.stringify({ event: 'progress', phase: 'render', percent: 60 }) + '\\n');
+			fs.writeSync(fd, JSON.stringify({ event: 'done' }) + '\\n');
+		`;
+		const command = {
+			executable: process.execPath,
+			args: ['-e', script],
+			env: Object.assign({}, process.env, { ELECTRON_RUN_AS_NODE: '1' })
+		};
+
+		const reports: { message?: string; increment?: number }[] = [];
+		const output = await CliService.execute(command, os.tmpdir(), { report: value => reports.push(value) });
+
+		const increments = reports.map(r => r.increment ?? 0);
+		assert.strictEqual(increments.reduce((sum, i) => sum + i, 0), 100, 'Increments should add up to 100%');
+		assert.ok(!reports.some(r => r.message?.startsWith('Elapsed')), 'Polling should stop once events arrive');
+		assert.deepStrictEqual(output.phases.map(p => p.phase), ['parse', 'render'], 'Stdout must not be parsed as progress');
+	});
+});
@@ -0,0 +1,99 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as vscode from 'vscode';
+import { CliScheduler } from '../services/CliScheduler';
+
+/** A task that runs until released, recording when it started */
+function deferredTask(name: string, started: string[]) {
+	let release!: () => void;
+	const done = new Promise<void>(resolve => { release = resolve; });
+	const task = async () => {
+		started.push(name);
+		await done;
+		return name;
+	};
+	return { task, release: () => release() };
+}
+
+suite('CliScheduler Test Suite', () => {
+	test('never runs more than maxParallelism tasks', async () => {
+		const scheduler = new CliScheduler({ maxParallelism: 2, order: 'fifo' });
+		const started: string[] = [];
+		const tasks = ['a', 'b', 'c'].map(name => deferredTask(name, started));
+		const results = tasks.map(t => scheduler.schedule('foreground', t.task));
+
+		await new Promise(resolve => setTimeout(resolve, 0));
+		assert.deepStrictEqual(started, ['a', 'b'], 'Only two tasks should start');
+		assert.strictEqual(scheduler.pendingCount(), 1, 'Third task should be queued');
+
+		tasks[0].release();
+		await results[0];
+		await new Promise(resolve => setTimeout(resolve, 0));
+		assert.deepStrictEqual(started, ['a', 'b', 'c'], 'Queued task should start when a slot frees');
+
+		tasks[1].release();
+		tasks[2].release();
+		await Promise.all(results);
+	});
+
+	test('foreground work is started before idle work, most recent first with lifo', async () => {
+		const scheduler = new CliScheduler({ maxParallelism: 1, order: 'lifo' });
+		const started: string[] = [];
+		const blocker = deferredTask('blocker', started);
+		const idle = deferredTask('idle', started);
+		const first = deferredTask('first-click', started);
+		const last = deferredTask('last-click', started);
+
+		const results = [
+			scheduler.schedule('foreground', blocker.task),
+			scheduler.schedule('idle', idle.task),
+			scheduler.schedule('foreground', first.task),
+			scheduler.schedule('foreground', last.task)
+		];
+		await new Promise(resolve => setTimeout(resolve, 0));
+
+		for (const t of [blocker, last, first, idle]) {
+			t.release();
+			await new Promise(resolve => setTimeout(resolve, 0));
+		}
+		await Promise.all(results);
+
+		assert.deepStrictEqual(started, ['blocker', 'last-click', 'first-click', 'idle']);
+	});
+
+	test('cancelling a queued task removes it', async () => {
+		const scheduler = new CliScheduler({ maxParallelism: 1, order: 'fifo' });
+		const started: string[] = [];
+		const blocker = deferredTask('blocker', started);
+		const queued = deferredTask('queued', started);
+		const source = new vscode.CancellationTokenSource();
+
+		const blockerResult = scheduler.schedule('foreground', blocker.task);
+		let queuedCallback = false;
+		const queuedResult = scheduler.schedule('background', queued.task, source.token, () => { queuedCallback = true; });
+		assert.ok(queuedCallback, 'onQueued should be called when no slot is free');
+
+		source.cancel();
+		await assert.rejects(queuedResult, (error: unknown) => error instanceof vscode.CancellationError);
+		assert.strictEqual(scheduler.pendingCount(), 0, 'Cancelled task should leave the queue');
+
+		blocker.release();
+		await blockerResult;
+		assert.deepStrictEqual(started, ['blocker'], 'Cancelled task should never start');
+		source.dispose();
+	});
+});
@@ -0,0 +1,143 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { CliService } from '../services/CliService';
+import { AsyncQueue } from '../utils/AsyncQueue';
+import { CliExitError } from '../utils/CliExitError';
+import { LineSplitter } from '../utils/LineSplitter';
+import { RingBuffer } from '../utils/RingBuffer';
+import { CliCommand, CliLine } from '../utils/types';
+
+/** Runs a node script with the test host's own runtime */
+function nodeCommand(script: string): CliCommand {
+	return {
+		executable: process.execPath,
+		args: ['-e', script],
+		env: Object.assign({}, process.env, { ELECTRON_RUN_AS_NODE: '1' })
+	};
+}
+
+suite('CLI Streaming Test Suite', () => {
+	test('LineSplitter joins lines split across chunks', () => {
+		const lines: string[] = [];
+		const splitter = new LineSplitter(line => lines.push(line));
+
+		splitter.push('first li');
+		splitter.push('ne\r\nsecond\n\nthi');
+		splitter.push('rd');
+		assert.deepStrictEqual(lines, ['first line', 'second', ''], 'Only complete lines should be emitted, blank ones included');
+
+		splitter.flush();
+		assert.deepStrictEqual(lines, ['first line', 'second', '', 'third'], 'Remainder should be emitted on flush');
+
+		splitter.push('last\n');
+		splitter.flush();
+		assert.deepStrictEqual(lines.slice(4), ['last'], 'A final newline should not add an empty line');
+	});
+
+	test('LineSplitter keeps bare carriage returns inside a line', () => {
+		const lines: string[] = [];
+		const splitter = new LineSplitter(line => lines.push(line));
+
+		splitter.push('10%\r50%\r100%\n');
+
+		assert.deepStrictEqual(lines, ['10%\r50%\r100%']);
+	});
+
+	test('RingBuffer keeps only the most recent items', () => {
+		const buffer = new RingBuffer<number>(3);
+		for (let i = 1; i <= 5; i++) {
+			buffer.push(i);
+		}
+
+		assert.deepStrictEqual(buffer.toArray(), [3, 4, 5]);
+		assert.strictEqual(buffer.dropped, 2);
+	});
+
+	test('AsyncQueue yields pushed items then ends', async () => {
+		const queue = new AsyncQueue<string>();
+		queue.push('a');
+		setTimeout(() => {
+			queue.push('b');
+			queue.end();
+		}, 0);
+
+		const items: string[] = [];
+		for await (const item of queue) {
+			items.push(item);
+		}
+		assert.deepStrictEqual(items, ['a', 'b']);
+	});
+
+	test('CliService.stream yields lines as the process writes them', async () => {
+		const command = nodeCommand('console.log("one"); console.error("warn"); console.log("two")');
+
+		const lines: CliLine[] = [];
+		for await (const line of CliService.stream(command, os.tmpdir())) {
+			lines.push(line);
+		}
+
+		assert.deepStrictEqual(lines.filter(l => l.stream === 'stdout').map(l => l.text), ['one', 'two']);
+		assert.deepStrictEqual(lines.filter(l => l.stream === 'stderr').map(l => l.text), ['warn']);
+	});
+
+	test('captured stdout keeps blank lines', async () => {
+		const command = nodeCommand('console.log("one\\n\\ntwo")');
+
+		const output = await CliService.execute(command, os.tmpdir(), undefined, { captureStdout: true });
+		assert.strictEqual(output.stdout, 'one\n\ntwo');
+	});
+
+	test('leaving a stream early kills the process', async () => {
+		const marker = path.join(os.tmpdir(), `wildest-stream-test-${process.pid}-${Date.now()}`);
+		const command = nodeCommand(`console.log("first"); setTimeout(() => require("fs").writeFileSync(${JSON.stringify(marker)}, "still running"), 500)`);
+
+		for await (const line of CliService.stream(command, os.tmpdir())) {
+			assert.strictEqual(line.text, 'first');
+			break;
+		}
+		await new Promise(resolve => setTimeout(resolve, 1000));
+
+		assert.strictEqual(fs.existsSync(marker), false, 'Process should have been killed');
+	});
+
+	test('CliService.execute keeps only the tail of stdout unless captured', async () => {
+		const command = nodeCommand('for (let i = 0; i < 2000; i++) { console.log("line " + i); }');
+
+		const tail = await CliService.execute(command, os.tmpdir());
+		const tailLines = tail.stdout.split('\n');
+		assert.ok(tailLines.length < 2000, 'Tail should be bounded');
+		assert.strictEqual(tailLines[tailLines.length - 1], 'line 1999', 'Tail should end with the last line');
+
+		const full = await CliService.execute(command, os.tmpdir(), undefined, { captureStdout: true });
+		assert.strictEqual(full.stdout.split('\n').length, 2000, 'Captured stdout should be complete');
+	});
+
+	test('a failed run reports its exit code and stderr', async () => {
+		const command = nodeCommand('console.error("Error: No such option: --baseline"); process.exit(2)');
+
+		await assert.rejects(CliService.execute(command, os.tmpdir()), (error: unknown) => {
+			assert.ok(error instanceof CliExitError);
+			assert.strictEqual(error.message, 'wild exited with code 2');
+			assert.ok(error.rejectsOption('--baseline', '--paths'), 'Usage error should name the option');
+			assert.ok(!new CliExitError(1, error.stderr).rejectsOption('--baseline'), 'Only usage errors reject options');
+			return true;
+		});
+	});
+});
@@ -0,0 +1,167 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import * as vscode from 'vscode';
+import { DiffAutoGenerator } from '../services/DiffAutoGenerator';
+import { DiffService } from '../services/DiffService';
+import { DiffGraphCache } from '../services/DiffGraphCache';
+import { GitService } from '../services/GitService';
+
+const DEBOUNCE_MS = 50;
+
+/** A background generation requested from the fake DiffService */
+interface Generation {
+	repoRoot: string;
+	stage: string;
+	fingerprint?: string;
+	token: vscode.CancellationToken;
+}
+
+/** A DiffService whose background generations run until cancelled */
+function fakeDiffService() {
+	const generations: Generation[] = [];
+	const diffService = {
+		log: () => { },
+		generateInBackground: (_context: vscode.ExtensionContext, repoRoot: string, stage: string, fingerprint: string | undefined, _priority: string, token: vscode.CancellationToken) => {
+			generations.push({ repoRoot, stage, fingerprint, token });
+			return new Promise<never>((_resolve, reject) => {
+				token.onCancellationRequested(() => reject(new vscode.CancellationError()));
+			});
+		}
+	};
+	return { diffService: diffService as unknown as DiffService, generations };
+}
+
+function changeRepository(repoRoot: string): void {
+	(GitService as any)._onDidChangeRepository.fire(repoRoot);
+}
+
+const settle = (ms = DEBOUNCE_MS * 4) => new Promise(resolve => setTimeout(resolve, ms));
+
+suite('DiffAutoGenerator Test Suite', () => {
+	const mockContext = { extensionPath: '/mock/extension/path' } as unknown as vscode.ExtensionContext;
+	const settings = () => vscode.workspace.getConfiguration('wildestai.autoGenerate');
+	const getDiffFingerprint = GitService.getDiffFingerprint;
+	const getRepositories = GitService.getRepositories;
+	let fingerprint: string;
+	let generator: DiffAutoGenerator | undefined;
+
+	suiteSetup(async () => {
+		await settings().update('enabled', true, vscode.ConfigurationTarget.Global);
+		await settings().update('debounceMs', DEBOUNCE_MS, vscode.ConfigurationTarget.Global);
+		await settings().update('stages', ['unstaged'], vscode.ConfigurationTarget.Global);
+	});
+
+	suiteTeardown(async () => {
+		for (const key of ['enabled', 'debounceMs', 'stages']) {
+			await settings().update(key, undefined, vscode.ConfigurationTarget.Global);
+		}
+	});
+
+	setup(() => {
+		fingerprint = 'first';
+		GitService.getDiffFingerprint = async () => fingerprint;
+		GitService.getRepositories = async () => [];
+	});
+
+	teardown(() => {
+		generator?.dispose();
+		generator = undefined;
+		GitService.getDiffFingerprint = getDiffFingerprint;
+		GitService.getRepositories = getRepositories;
+	});
+
+	test('changes during the debounce window start one generation', async () => {
+		const { diffService, generations } = fakeDiffService();
+		generator = new DiffAutoGenerator(mockContext, diffService);
+
+		for (let i = 0; i < 5; i++) {
+			changeRepository('/repo');
+		}
+		assert.strictEqual(generations.length, 0, 'Nothing should run before the debounce window ends');
+		await settle();
+
+		assert.deepStrictEqual(generations.map(({ repoRoot, stage, fingerprint }) => [repoRoot, stage, fingerprint]), [['/repo', 'unstaged', 'first']]);
+	});
+
+	test('a change to content already cached does not run wild', async () => {
+		const tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-autogenerate-test-'));
+		const env = { WILDEST_DEV_MODE: process.env.WILDEST_DEV_MODE, WILDEST_VENV_PATH: process.env.WILDEST_VENV_PATH };
+		try {
+			// A wild that records that it ran
+			const calls = path.join(tmpDir, 'calls');
+			fs.mkdirSync(path.join(tmpDir, 'venv', 'bin'), { recursive: true });
+			fs.writeFileSync(path.join(tmpDir, 'venv', 'bin', 'wild'), `#!/bin/sh\necho "$@" >> "${calls}"\n`, { mode: 0o755 });
+			process.env.WILDEST_DEV_MODE = '1';
+			process.env.WILDEST_VENV_PATH = path.join(tmpDir, 'venv');
+
+			const htmlPath = path.join(tmpDir, 'graph.html');
+			fs.writeFileSync(htmlPath, '<html>graph</html>');
+			DiffGraphCache.getInstance().set(tmpDir, 'unstaged', fingerprint, htmlPath);
+
+			const diffService = new DiffService(mockContext);
+			const outcomes: Promise<string>[] = [];
+			const generate = diffService.generateInBackground.bind(diffService);
+			diffService.generateInBackground = (...args) => {
+				const outcome = generate(...args);
+				outcomes.push(outcome);
+				return outcome;
+			};
+			generator = new DiffAutoGenerator(mockContext, diffService);
+
+			changeRepository(tmpDir);
+			await settle();
+			assert.strictEqual(outcomes.length, 1);
+			assert.strictEqual(await outcomes[0], 'up to date');
+			assert.strictEqual(fs.existsSync(calls), false, 'wild should not run for cached content');
+
+			// The same content again is not even looked up
+			changeRepository(tmpDir);
+			await settle();
+			assert.strictEqual(outcomes.length, 1);
+		} finally {
+			for (const [name, value] of Object.entries(env)) {
+				if (value === undefined) {
+					delete process.env[name];
+				} else {
+					process.env[name] = value;
+				}
+			}
+			DiffGraphCache.getInstance().invalidateRepo(tmpDir);
+			fs.rmSync(tmpDir, { recursive: true, force: true });
+		}
+	});
+
+	test('a change while generating cancels the generation of the older content', async () => {
+		const { diffService, generations } = fakeDiffService();
+		generator = new DiffAutoGenerator(mockContext, diffService);
+
+		changeRepository('/repo');
+		await settle();
+		assert.strictEqual(generations.length, 1);
+
+		fingerprint = 'second';
+		changeRepository('/repo');
+		await settle();
+
+		assert.strictEqual(generations[0].token.isCancellationRequested, true, 'The older generation should be cancelled');
+		assert.deepStrictEqual(generations.slice(1).map(generation => generation.fingerprint), ['second']);
+		assert.strictEqual(generations[1].token.isCancellationRequested, false);
+	});
+});
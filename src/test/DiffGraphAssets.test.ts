@@ -0,0 +1,115 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { DiffGraphAssets } from '../services/DiffGraphAssets';
+
+suite('DiffGraphAssets Test Suite', () => {
+	const RENDERER = `function render() { ${'draw();'.repeat(400)} }`;
+	const STYLES = `.node { ${'color: red;'.repeat(200)} }`;
+	let tmpDir: string;
+	let assetsDir: string;
+
+	const writeHtml = (name: string, data: string): string => {
+		const htmlPath = path.join(tmpDir, name);
+		fs.writeFileSync(htmlPath, [
+			'<html><head>',
+			`<style>${STYLES}</style>`,
+			'<style>small {}</style>',
+			'</head><body>',
+			`<script type="application/json" id="data">${data}</script>`,
+			`<script defer>${RENDERER}</script>`,
+			'<script>render();</script>',
+			'</body></html>'
+		].join('\n'));
+		return htmlPath;
+	};
+	const toUri = (assetPath: string) => `uri:${path.basename(assetPath)}`;
+
+	setup(() => {
+		tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-assets-test-'));
+		assetsDir = path.join(tmpDir, 'assets');
+	});
+
+	teardown(() => {
+		fs.rmSync(tmpDir, { recursive: true, force: true });
+	});
+
+	/** Load a split document the way the view does, in small chunks so placeholders are cut in two */
+	const load = async (assets: DiffGraphAssets, documentPath: string): Promise<string> => {
+		const text = fs.readFileSync(documentPath, 'utf8');
+		async function* chunks() {
+			for (let i = 0; i < text.length; i += 7) {
+				yield text.substring(i, i + 7);
+			}
+		}
+		let document = '';
+		for await (const chunk of assets.resolve(chunks(), toUri)) {
+			document += chunk;
+		}
+		return document;
+	};
+
+	test('moves large inline scripts and styles to shared files', async () => {
+		const assets = new DiffGraphAssets(assetsDir);
+		const firstSplit = assets.split(writeHtml('a.html', JSON.stringify({ graph: 'a'.repeat(2000) })));
+		const secondSplit = assets.split(writeHtml('b.html', JSON.stringify({ graph: 'b'.repeat(2000) })));
+		const first = await load(assets, firstSplit.documentPath);
+		const second = await load(assets, secondSplit.documentPath);
+
+		assert.ok(!first.includes(RENDERER) && !first.includes(STYLES), 'Large blocks should be moved out');
+		assert.match(first, /<script src="uri:[0-9a-f]{64}\.js"><\/script>/, 'Inline defer should be dropped with the script');
+		assert.match(first, /<link rel="stylesheet" href="uri:[0-9a-f]{64}\.css">/);
+		assert.ok(first.includes('<script>render();</script>') && first.includes('small {}'), 'Small blocks should stay inline');
+		assert.ok(first.includes('a'.repeat(2000)), 'Data scripts cannot be loaded by src and should stay inline');
+		assert.ok(!first.includes('\0'), 'Every placeholder should be resolved');
+
+		const referenced = [...(first + second).matchAll(/uri:([0-9a-f]{64}\.(js|css))/g)].map(match => match[1]);
+		assert.deepStrictEqual(firstSplit.assets.filter(name => !name.endsWith('.html')).sort(), [...new Set(referenced)].sort());
+		assert.deepStrictEqual(fs.readdirSync(assetsDir).sort(), [...new Set([...firstSplit.assets, ...secondSplit.assets])].sort());
+		assert.strictEqual(fs.readdirSync(assetsDir).length, 4, 'Identical renderer code should be stored once, next to one document per graph');
+		assert.strictEqual(firstSplit.size, firstSplit.assets.reduce((sum, name) => sum + fs.statSync(path.join(assetsDir, name)).size, 0));
+	});
+
+	test('leaves blocks inside inline data untouched', async () => {
+		const assets = new DiffGraphAssets(assetsDir);
+		// Graph data of a diff that changes a large style block in an HTML file
+		const data = JSON.stringify({ before: `<style media="print">${STYLES}</style>`, after: `<style>${STYLES.replace('red', 'blue')}</style>` });
+		const split = assets.split(writeHtml('a.html', data));
+		const document = await load(assets, split.documentPath);
+
+		assert.ok(document.includes(`<script type="application/json" id="data">${data}</script>`), 'Inline data should be kept byte for byte');
+		assert.strictEqual(split.assets.filter(name => name.endsWith('.css')).length, 1, 'Only the document style should be moved out');
+	});
+
+	test('removes files no cached graph references', async () => {
+		const assets = new DiffGraphAssets(assetsDir);
+		const kept = assets.split(writeHtml('a.html', '{"graph": "a"}'));
+		const dropped = assets.split(writeHtml('b.html', '{"graph": "b"}'));
+
+		assert.strictEqual(assets.removeUnreferenced(new Set(kept.assets)), 0, 'Files just written may not be recorded yet');
+
+		const old = new Date(Date.now() - 5 * 60 * 1000);
+		for (const name of fs.readdirSync(assetsDir)) {
+			fs.utimesSync(path.join(assetsDir, name), old, old);
+		}
+		assert.strictEqual(assets.removeUnreferenced(new Set(kept.assets)), 1);
+		assert.ok(!fs.existsSync(dropped.documentPath), 'The unreferenced document should be removed');
+		assert.deepStrictEqual(fs.readdirSync(assetsDir).sort(), [...kept.assets].sort(), 'Shared assets should be kept');
+	});
+});
@@ -14,14 +14,19 @@
 // along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import * as assert from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
 import { DiffGraphCache } from '../services/DiffGraphCache';
 
 suite('DiffGraphCache Test Suite', () => {
+    const FINGERPRINT = 'abc123';
     let cache: DiffGraphCache;
 
     setup(() => {
         cache = DiffGraphCache.getInstance();
         cache.clear(); // Start with a clean cache for each test
+        cache.setLimits(DiffGraphCache.DEFAULT_LIMITS);
     });
 
     test('getInstance returns singleton', () => {
@@ -34,16 +39,16 @@ suite('DiffGraphCache Test Suite', () => {
         const repoRoot = '/path/to/repo';
         const htmlPath = '/tmp/diffgraph-123.html';
         
-        cache.set(repoRoot, 'staged', htmlPath);
+        cache.set(repoRoot, 'staged', FINGERPRINT, htmlPath);
         
-        const entry = cache.get(repoRoot, 'staged');
+        const entry = cache.get(repoRoot, 'staged', FINGERPRINT);
         assert.ok(entry, 'Entry should exist');
         assert.strictEqual(entry.htmlPath, htmlPath, 'HTML path should match');
         assert.ok(entry.generatedAt > 0, 'Generated timestamp should be set');
     });
 
     test('get returns undefined for non-existent entries', () => {
-        const entry = cache.get('/non/existent/repo', 'staged');
+        const entry = cache.get('/non/existent/repo', 'staged', FINGERPRINT);
         assert.strictEqual(entry, undefined, 'Non-existent entry should return undefined');
     });
 
@@ -52,11 +57,11 @@ suite('DiffGraphCache Test Suite', () => {
         const stagedHtml = '/tmp/staged.html';
         const unstagedHtml = '/tmp/unstaged.html';
 
-        cache.set(repoRoot, 'staged', stagedHtml);
-        cache.set(repoRoot, 'unstaged', unstagedHtml);
+        cache.set(repoRoot, 'staged', FINGERPRINT, stagedHtml);
+        cache.set(repoRoot, 'unstaged', FINGERPRINT, unstagedHtml);
 
-        const stagedEntry = cache.get(repoRoot, 'staged');
-        const unstagedEntry = cache.get(repoRoot, 'unstaged');
+        const stagedEntry = cache.get(repoRoot, 'staged', FINGERPRINT);
+        const unstagedEntry = cache.get(repoRoot, 'unstaged', FINGERPRINT);
 
         assert.ok(stagedEntry, 'Staged entry should exist');
         assert.ok(unstagedEntry, 'Unstaged entry should exist');
@@ -68,54 +73,54 @@ suite('DiffGraphCache Test Suite', () => {
         const repoRoot = '/path/to/repo';
         const htmlPath = '/tmp/test.html';
 
-        assert.strictEqual(cache.has(repoRoot, 'staged'), false, 'Should not have entry initially');
+        assert.strictEqual(cache.has(repoRoot, 'staged', FINGERPRINT), false, 'Should not have entry initially');
         
-        cache.set(repoRoot, 'staged', htmlPath);
-        assert.strictEqual(cache.has(repoRoot, 'staged'), true, 'Should have entry after setting');
-        assert.strictEqual(cache.has(repoRoot, 'unstaged'), false, 'Should not have unstaged entry');
+        cache.set(repoRoot, 'staged', FINGERPRINT, htmlPath);
+        assert.strictEqual(cache.has(repoRoot, 'staged', FINGERPRINT), true, 'Should have entry after setting');
+        assert.strictEqual(cache.has(repoRoot, 'unstaged', FINGERPRINT), false, 'Should not have unstaged entry');
     });
 
     test('invalidate specific stage', () => {
         const repoRoot = '/path/to/repo';
         
-        cache.set(repoRoot, 'staged', '/tmp/staged.html');
-        cache.set(repoRoot, 'unstaged', '/tmp/unstaged.html');
+        cache.set(repoRoot, 'staged', FINGERPRINT, '/tmp/staged.html');
+        cache.set(repoRoot, 'unstaged', FINGERPRINT, '/tmp/unstaged.html');
         
         cache.invalidate(repoRoot, 'staged');
         
-        assert.strictEqual(cache.has(repoRoot, 'staged'), false, 'Staged entry should be invalidated');
-        assert.strictEqual(cache.has(repoRoot, 'unstaged'), true, 'Unstaged entry should remain');
+        assert.strictEqual(cache.has(repoRoot, 'staged', FINGERPRINT), false, 'Staged entry should be invalidated');
+        assert.strictEqual(cache.has(repoRoot, 'unstaged', FINGERPRINT), true, 'Unstaged entry should remain');
     });
 
     test('invalidate all stages for repo', () => {
         const repoRoot = '/path/to/repo';
         
-        cache.set(repoRoot, 'staged', '/tmp/staged.html');
-        cache.set(repoRoot, 'unstaged', '/tmp/unstaged.html');
+        cache.set(repoRoot, 'staged', FINGERPRINT, '/tmp/staged.html');
+        cache.set(repoRoot, 'unstaged', FINGERPRINT, '/tmp/unstaged.html');
         
         cache.invalidate(repoRoot);
         
-        assert.strictEqual(cache.has(repoRoot, 'staged'), false, 'Staged entry should be invalidated');
-        assert.strictEqual(cache.has(repoRoot, 'unstaged'), false, 'Unstaged entry should be invalidated');
+        assert.strictEqual(cache.has(repoRoot, 'staged', FINGERPRINT), false, 'Staged entry should be invalidated');
+        assert.strictEqual(cache.has(repoRoot, 'unstaged', FINGERPRINT), false, 'Unstaged entry should be invalidated');
     });
 
     test('invalidateRepo works same as invalidate without stage', () => {
         const repoRoot = '/path/to/repo';
         
-        cache.set(repoRoot, 'staged', '/tmp/staged.html');
-        cache.set(repoRoot, 'unstaged', '/tmp/unstaged.html');
+        cache.set(repoRoot, 'staged', FINGERPRINT, '/tmp/staged.html');
+        cache.set(repoRoot, 'unstaged', FINGERPRINT, '/tmp/unstaged.html');
         
         cache.invalidateRepo(repoRoot);
         
-        assert.strictEqual(cache.has(repoRoot, 'staged'), false, 'Staged entry should be invalidated');
-        assert.strictEqual(cache.has(repoRoot, 'unstaged'), false, 'Unstaged entry should be invalidated');
+        assert.strictEqual(cache.has(repoRoot, 'staged', FINGERPRINT), false, 'Staged entry should be invalidated');
+        assert.strictEqual(cache.has(repoRoot, 'unstaged', FINGERPRINT), false, 'Unstaged entry should be invalidated');
     });
 
     test('size and clear methods', () => {
         assert.strictEqual(cache.size(), 0, 'Cache should start empty');
         
-        cache.set('/repo1', 'staged', '/tmp/1.html');
-        cache.set('/repo2', 'unstaged', '/tmp/2.html');
+        cache.set('/repo1', 'staged', FINGERPRINT, '/tmp/1.html');
+        cache.set('/repo2', 'unstaged', FINGERPRINT, '/tmp/2.html');
         
         assert.strictEqual(cache.size(), 2, 'Cache should have 2 entries');
         
@@ -127,13 +132,13 @@ suite('DiffGraphCache Test Suite', () => {
         const repo1 = '/path/to/repo1';
         const repo2 = '/path/to/repo2';
         
-        cache.set(repo1, 'staged', '/tmp/1.html');
-        cache.set(repo2, 'unstaged', '/tmp/2.html');
+        cache.set(repo1, 'staged', FINGERPRINT, '/tmp/1.html');
+        cache.set(repo2, 'unstaged', FINGERPRINT, '/tmp/2.html');
         
         const keys = cache.getKeys();
         assert.strictEqual(keys.length, 2, 'Should have 2 keys');
-        assert.ok(keys.includes(`${repo1}:staged`), 'Should include repo1:staged key');
-        assert.ok(keys.includes(`${repo2}:unstaged`), 'Should include repo2:unstaged key');
+        assert.ok(keys.includes(`${repo1}:staged:${FINGERPRINT}`), 'Should include repo1:staged key');
+        assert.ok(keys.includes(`${repo2}:unstaged:${FINGERPRINT}`), 'Should include repo2:unstaged key');
     });
 
     test('different repos have separate cache entries', () => {
@@ -141,15 +146,126 @@ suite('DiffGraphCache Test Suite', () => {
         const repo2 = '/path/to/repo2';
         const htmlPath = '/tmp/test.html';
         
-        cache.set(repo1, 'staged', htmlPath);
-        cache.set(repo2, 'staged', htmlPath);
+        cache.set(repo1, 'staged', FINGERPRINT, htmlPath);
+        cache.set(repo2, 'staged', FINGERPRINT, htmlPath);
         
-        assert.strictEqual(cache.has(repo1, 'staged'), true, 'Repo1 should have entry');
-        assert.strictEqual(cache.has(repo2, 'staged'), true, 'Repo2 should have entry');
+        assert.strictEqual(cache.has(repo1, 'staged', FINGERPRINT), true, 'Repo1 should have entry');
+        assert.strictEqual(cache.has(repo2, 'staged', FINGERPRINT), true, 'Repo2 should have entry');
         
         cache.invalidate(repo1, 'staged');
         
-        assert.strictEqual(cache.has(repo1, 'staged'), false, 'Repo1 entry should be invalidated');
-        assert.strictEqual(cache.has(repo2, 'staged'), true, 'Repo2 entry should remain');
+        assert.strictEqual(cache.has(repo1, 'staged', FINGERPRINT), false, 'Repo1 entry should be invalidated');
+        assert.strictEqual(cache.has(repo2, 'staged', FINGERPRINT), true, 'Repo2 entry should remain');
+    });
+
+    test('entries are keyed by content fingerprint', () => {
+        const repoRoot = '/path/to/repo';
+
+        cache.set(repoRoot, 'unstaged', 'fp-before-edit', '/tmp/before.html');
+
+        assert.strictEqual(cache.get(repoRoot, 'unstaged', 'fp-after-edit'), undefined, 'Edited content should miss');
+
+        cache.set(repoRoot, 'unstaged', 'fp-after-edit', '/tmp/after.html');
+
+        const reverted = cache.get(repoRoot, 'unstaged', 'fp-before-edit');
+        assert.ok(reverted, 'Reverted content should hit the earlier entry');
+        assert.strictEqual(reverted.htmlPath, '/tmp/before.html', 'HTML path should match the earlier generation');
+        assert.strictEqual(reverted.fingerprint, 'fp-before-edit', 'Entry should record its fingerprint');
+    });
+
+    test('invalidate removes every fingerprint for the stage', () => {
+        const repoRoot = '/path/to/repo';
+
+        cache.set(repoRoot, 'unstaged', 'fp-1', '/tmp/1.html');
+        cache.set(repoRoot, 'unstaged', 'fp-2', '/tmp/2.html');
+        cache.set(repoRoot, 'staged', 'fp-3', '/tmp/3.html');
+
+        cache.invalidate(repoRoot, 'unstaged');
+
+        assert.strictEqual(cache.has(repoRoot, 'unstaged', 'fp-1'), false, 'First unstaged entry should be invalidated');
+        assert.strictEqual(cache.has(repoRoot, 'unstaged', 'fp-2'), false, 'Second unstaged entry should be invalidated');
+        assert.strictEqual(cache.has(repoRoot, 'staged', 'fp-3'), true, 'Staged entry should remain');
+    });
+
+    test('commit entries are keyed by commit hash', () => {
+        const repoRoot = '/path/to/repo';
+        const hash = '0123456789abcdef0123456789abcdef01234567';
+
+        cache.set(repoRoot, `commit-${hash}`, hash, '/tmp/commit.html');
+
+        assert.strictEqual(cache.has(repoRoot, `commit-${hash}`, hash), true, 'Commit entry should exist');
+
+        cache.invalidateRepo(repoRoot);
+        assert.strictEqual(cache.size(), 0, 'invalidateRepo should also remove commit entries');
+    });
+
+    test('least recently used entry is evicted beyond maxEntries', () => {
+        cache.setLimits({ maxEntries: 2, maxBytes: DiffGraphCache.DEFAULT_LIMITS.maxBytes });
+
+        cache.set('/repo', 'unstaged', 'fp-1', '/nonexistent/1.html');
+        cache.set('/repo', 'unstaged', 'fp-2', '/nonexistent/2.html');
+        cache.get('/repo', 'unstaged', 'fp-1'); // fp-2 is now least recently used
+        cache.set('/repo', 'unstaged', 'fp-3', '/nonexistent/3.html');
+
+        assert.strictEqual(cache.has('/repo', 'unstaged', 'fp-1'), true, 'Recently used entry should remain');
+        assert.strictEqual(cache.has('/repo', 'unstaged', 'fp-2'), false, 'Least recently used entry should be evicted');
+        assert.strictEqual(cache.has('/repo', 'unstaged', 'fp-3'), true, 'New entry should remain');
+        assert.strictEqual(cache.getStats().evictions, 1, 'Eviction should be counted');
+    });
+
+    test('byte budget evicts entries and deletes their files', () => {
+        const tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-cache-test-'));
+        try {
+            const first = path.join(tmpDir, 'first.html');
+            const second = path.join(tmpDir, 'second.html');
+            fs.writeFileSync(first, 'x'.repeat(600));
+            fs.writeFileSync(second, 'y'.repeat(600));
+            cache.setLimits({ maxEntries: 10, maxBytes: 1000 });
+
+            cache.set('/repo', 'staged', 'fp-1', first);
+            cache.set('/repo', 'staged', 'fp-2', second);
+
+            assert.strictEqual(cache.has('/repo', 'staged', 'fp-1'), false, 'Older entry should be evicted');
+            assert.strictEqual(fs.existsSync(first), false, 'Evicted HTML should be deleted');
+            assert.strictEqual(fs.existsSync(second), true, 'Newest HTML should be kept');
+            assert.strictEqual(cache.getStats().bytes, 600, 'Stats should report remaining bytes');
+        } finally {
+            fs.rmSync(tmpDir, { recursive: true, force: true });
+        }
+    });
+
+    test('an entry larger than the budget is kept until something newer arrives', () => {
+        cache.setLimits({ maxEntries: 0, maxBytes: 0 });
+
+        cache.set('/repo', 'staged', FINGERPRINT, '/nonexistent/only.html');
+
+        assert.strictEqual(cache.has('/repo', 'staged', FINGERPRINT), true, 'Just generated entry should not be evicted');
+    });
+
+    test('stats count hits and misses', () => {
+        cache.set('/repo', 'staged', FINGERPRINT, '/tmp/test.html');
+
+        cache.get('/repo', 'staged', FINGERPRINT);
+        cache.get('/repo', 'staged', 'other');
+        cache.get('/repo', 'unstaged', FINGERPRINT);
+
+        const stats = cache.getStats();
+        assert.strictEqual(stats.hits, 1, 'Should count one hit');
+        assert.strictEqual(stats.misses, 2, 'Should count two misses');
+        assert.strictEqual(stats.entries, 1, 'Should count one entry');
+    });
+
+    test('peek neither counts a hit nor refreshes the entry', () => {
+        cache.setLimits({ maxEntries: 2, maxBytes: DiffGraphCache.DEFAULT_LIMITS.maxBytes });
+        cache.set('/repo', 'unstaged', 'fp-1', '/nonexistent/1.html');
+        cache.set('/repo', 'unstaged', 'fp-2', '/nonexistent/2.html');
+
+        assert.strictEqual(cache.peek('/repo', 'unstaged', 'fp-1')?.htmlPath, '/nonexistent/1.html');
+        assert.strictEqual(cache.peek('/repo', 'unstaged', 'other'), undefined);
+        cache.set('/repo', 'unstaged', 'fp-3', '/nonexistent/3.html');
+
+        assert.strictEqual(cache.has('/repo', 'unstaged', 'fp-1'), false, 'Peeked entry should still be least recently used');
+        assert.strictEqual(cache.getStats().hits, 0, 'Peeking should not count a hit');
+        assert.strictEqual(cache.getStats().misses, 0, 'Peeking should not count a miss');
     });
 });
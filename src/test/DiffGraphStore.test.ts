@@ -0,0 +1,203 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { DiffGraphCache } from '../services/DiffGraphCache';
+import { DiffGraphStore } from '../services/DiffGraphStore';
+import { DiffGraphAssets } from '../services/DiffGraphAssets';
+
+suite('DiffGraphStore Test Suite', () => {
+	const HASH = '0123456789abcdef0123456789abcdef01234567';
+	let tmpDir: string;
+	let storageDir: string;
+
+	const writeHtml = (name: string, content: string): string => {
+		const htmlPath = path.join(tmpDir, name);
+		fs.writeFileSync(htmlPath, content);
+		return htmlPath;
+	};
+
+	setup(() => {
+		tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-store-test-'));
+		storageDir = path.join(tmpDir, 'storage');
+	});
+
+	teardown(() => {
+		DiffGraphCache.getInstance().attachStore(undefined);
+		DiffGraphCache.getInstance().attachAssets(undefined);
+		DiffGraphCache.getInstance().setLimits(DiffGraphCache.DEFAULT_LIMITS);
+		DiffGraphCache.getInstance().clear();
+		fs.rmSync(tmpDir, { recursive: true, force: true });
+	});
+
+	test('cache entries survive a reload', () => {
+		const cache = DiffGraphCache.getInstance();
+		cache.attachStore(new DiffGraphStore(storageDir));
+		const entry = cache.set('/repo', `commit-${HASH}`, HASH, writeHtml('commit.html', '<html>graph</html>'));
+
+		assert.ok(entry.htmlPath.startsWith(storageDir), 'HTML should be moved into the store');
+		assert.strictEqual(fs.existsSync(path.join(tmpDir, 'commit.html')), false, 'Temp file should be moved');
+
+		// Simulate a window reload: fresh memory, fresh store instance
+		cache.attachStore(undefined);
+		cache.clear();
+		cache.attachStore(new DiffGraphStore(storageDir));
+
+		const rehydrated = cache.get('/repo', `commit-${HASH}`, HASH);
+		assert.ok(rehydrated, 'Entry should be rehydrated from disk');
+		assert.strictEqual(fs.readFileSync(rehydrated.htmlPath, 'utf8'), '<html>graph</html>');
+	});
+
+	test('artifacts with a bad hash are dropped', () => {
+		const store = new DiffGraphStore(storageDir);
+		const key = `/repo:commit-${HASH}:${HASH}` as const;
+		const entry = store.put(key, {
+			repoRoot: '/repo',
+			stage: `commit-${HASH}`,
+			fingerprint: HASH,
+			htmlPath: writeHtml('commit.html', '<html>graph</html>'),
+			size: 0,
+			generatedAt: Date.now(),
+			lastAccessedAt: Date.now()
+		});
+
+		// Same size, different content
+		fs.writeFileSync(entry.htmlPath, '<html>GRAPH</html>');
+
+		const reloaded = new DiffGraphStore(storageDir);
+		assert.strictEqual(reloaded.has(key), true, 'Size check alone should pass on load');
+		assert.strictEqual(reloaded.get(key), undefined, 'Hash check should reject the artifact');
+		assert.strictEqual(reloaded.has(key), false, 'Rejected entry should be removed from the index');
+	});
+
+	test('missing artifacts are dropped on load', () => {
+		const store = new DiffGraphStore(storageDir);
+		const key = '/repo:staged:abc' as const;
+		const entry = store.put(key, {
+			repoRoot: '/repo',
+			stage: 'staged',
+			fingerprint: 'abc',
+			htmlPath: writeHtml('staged.html', '<html>staged</html>'),
+			size: 0,
+			generatedAt: Date.now(),
+			lastAccessedAt: Date.now()
+		});
+
+		fs.rmSync(entry.htmlPath);
+
+		assert.strictEqual(new DiffGraphStore(storageDir).has(key), false, 'Entry without artifact should be dropped');
+	});
+
+	test('clear keeps stored entries, purge deletes them', () => {
+		const cache = DiffGraphCache.getInstance();
+		const store = new DiffGraphStore(storageDir);
+		cache.attachStore(store);
+		const entry = cache.set('/repo', 'staged', 'abc', writeHtml('staged.html', '<html>staged</html>'));
+
+		cache.clear();
+		assert.strictEqual(store.has('/repo:staged:abc'), true, 'Clearing memory should not touch the store');
+		assert.ok(cache.get('/repo', 'staged', 'abc'), 'Entry should be rehydrated after a clear');
+
+		cache.purge();
+		assert.strictEqual(store.has('/repo:staged:abc'), false, 'Purge should remove the entry from the index');
+		assert.strictEqual(fs.existsSync(entry.htmlPath), false, 'Purge should delete the artifact');
+	});
+
+	test('access times are written back on flush', () => {
+		const store = new DiffGraphStore(storageDir);
+		const key = '/repo:staged:abc' as const;
+		store.put(key, {
+			repoRoot: '/repo',
+			stage: 'staged',
+			fingerprint: 'abc',
+			htmlPath: writeHtml('staged.html', '<html>staged</html>'),
+			size: 0,
+			generatedAt: 1000,
+			lastAccessedAt: 1000
+		});
+		const indexPath = path.join(storageDir, 'index.json');
+		const written = fs.readFileSync(indexPath, 'utf8');
+
+		store.touch(key, 2000);
+		assert.strictEqual(fs.readFileSync(indexPath, 'utf8'), written, 'Touching should not rewrite the index');
+		assert.strictEqual(store.getRecords().get(key)?.lastAccessedAt, 2000, 'Access time should be kept in memory');
+
+		store.flush();
+		assert.strictEqual(new DiffGraphStore(storageDir).getRecords().get(key)?.lastAccessedAt, 2000);
+	});
+
+	test('records without an access time default to their generation time', () => {
+		const store = new DiffGraphStore(storageDir);
+		const key = '/repo:staged:abc' as const;
+		store.put(key, {
+			repoRoot: '/repo',
+			stage: 'staged',
+			fingerprint: 'abc',
+			htmlPath: writeHtml('staged.html', '<html>staged</html>'),
+			size: 0,
+			generatedAt: 1000,
+			lastAccessedAt: 1000
+		});
+		const indexPath = path.join(storageDir, 'index.json');
+		const index = JSON.parse(fs.readFileSync(indexPath, 'utf8'));
+		delete index.entries[key].lastAccessedAt;
+		fs.writeFileSync(indexPath, JSON.stringify(index));
+
+		assert.strictEqual(new DiffGraphStore(storageDir).getRecords().get(key)?.lastAccessedAt, 1000);
+	});
+
+	test('invalidate removes entries from disk', () => {
+		const cache = DiffGraphCache.getInstance();
+		const store = new DiffGraphStore(storageDir);
+		cache.attachStore(store);
+		const entry = cache.set('/repo', 'unstaged', 'abc', writeHtml('unstaged.html', '<html>unstaged</html>'));
+
+		cache.invalidate('/repo', 'unstaged');
+
+		assert.strictEqual(store.has('/repo:unstaged:abc'), false, 'Entry should be removed from the index');
+		assert.strictEqual(fs.existsSync(entry.htmlPath), false, 'Artifact should be deleted');
+	});
+
+	test('split documents are kept with their entry and count against the budget', () => {
+		const cache = DiffGraphCache.getInstance();
+		const assetsDir = path.join(tmpDir, 'assets');
+		const renderer = `<script>${'draw();'.repeat(400)}</script>`;
+		cache.attachStore(new DiffGraphStore(storageDir));
+		cache.attachAssets(new DiffGraphAssets(assetsDir));
+
+		const first = cache.set('/repo', 'staged', 'fp-1', writeHtml('first.html', `<html>${renderer}first</html>`));
+		assert.ok(first.documentPath && fs.existsSync(first.documentPath), 'The graph should be split when cached');
+		assert.strictEqual(cache.getStats().bytes, first.size + (first.assetsSize ?? 0), 'Assets should count against the budget');
+
+		cache.attachStore(undefined);
+		cache.clear();
+		cache.attachStore(new DiffGraphStore(storageDir));
+		assert.strictEqual(cache.get('/repo', 'staged', 'fp-1')?.documentPath, first.documentPath, 'The split document should survive a reload');
+
+		// Old enough that another window cannot be about to record them
+		const old = new Date(Date.now() - 5 * 60 * 1000);
+		for (const name of fs.readdirSync(assetsDir)) {
+			fs.utimesSync(path.join(assetsDir, name), old, old);
+		}
+		cache.setLimits({ maxEntries: 1, maxBytes: DiffGraphCache.DEFAULT_LIMITS.maxBytes });
+		const second = cache.set('/repo', 'staged', 'fp-2', writeHtml('second.html', `<html>${renderer}second</html>`));
+
+		assert.ok(!fs.existsSync(first.documentPath), 'The evicted graph\'s document should be deleted');
+		assert.deepStrictEqual(fs.readdirSync(assetsDir).sort(), [...(second.assets ?? [])].sort(), 'The shared renderer should be kept');
+	});
+});
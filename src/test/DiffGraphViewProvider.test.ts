@@ -0,0 +1,78 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import * as vscode from 'vscode';
+import { DiffGraphViewProvider } from '../providers/DiffGraphViewProvider';
+
+/** A webview view whose shell answers `ready` like media/diffgraph/main.js */
+function fakeView() {
+	const posted: any[] = [];
+	let receive: (message: any) => void = () => { };
+	const view = {
+		visible: true,
+		show: () => { },
+		webview: {
+			options: {} as vscode.WebviewOptions,
+			html: '',
+			asWebviewUri: (uri: vscode.Uri) => uri,
+			postMessage: async (message: any) => { posted.push(message); return true; },
+			onDidReceiveMessage: (listener: (message: any) => void) => { receive = listener; return { dispose: () => { } }; }
+		}
+	};
+	return { view: view as unknown as vscode.WebviewView, posted, ready: () => receive({ command: 'ready' }) };
+}
+
+const settle = () => new Promise(resolve => setTimeout(resolve, 50));
+
+suite('DiffGraphViewProvider Test Suite', () => {
+	const extensionUri = vscode.Uri.file(path.join(__dirname, '..', '..'));
+	let tmpDir: string;
+
+	setup(() => {
+		tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-view-test-'));
+	});
+
+	teardown(() => {
+		fs.rmSync(tmpDir, { recursive: true, force: true });
+	});
+
+	test('a reloaded shell gets the last graph again', async () => {
+		const htmlPath = path.join(tmpDir, 'graph.html');
+		fs.writeFileSync(htmlPath, '<html>graph</html>');
+		const provider = new DiffGraphViewProvider(extensionUri);
+		const { view, posted, ready } = fakeView();
+		provider.resolveWebviewView(view, {} as vscode.WebviewViewResolveContext, new vscode.CancellationTokenSource().token);
+
+		await provider.showDiffGraph(htmlPath);
+		ready();
+		await settle();
+		assert.deepStrictEqual(posted.map(message => message.type), ['begin', 'chunk', 'end']);
+
+		// Showing it again switches frames in the live shell
+		await provider.showDiffGraph(htmlPath);
+		assert.strictEqual(posted[posted.length - 1].type, 'show');
+
+		// VS Code reloads a hidden view whose context is not retained, and its frames are gone
+		posted.length = 0;
+		ready();
+		await settle();
+		assert.deepStrictEqual(posted.map(message => message.type), ['begin', 'chunk', 'end']);
+		assert.strictEqual(posted[1].text, '<html>graph</html>');
+	});
+});
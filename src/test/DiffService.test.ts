@@ -15,10 +15,66 @@
 
 import * as assert from 'assert';
 import * as vscode from 'vscode';
+import * as cp from 'child_process';
+import * as fs from 'fs';
 import * as os from 'os';
 import * as path from 'path';
 import { DiffService } from '../services/DiffService';
+import { DiffGraphCache } from '../services/DiffGraphCache';
 import { DiffGraphViewProvider } from '../providers/DiffGraphViewProvider';
+import { GitService } from '../services/GitService';
+
+/**
+ * A wild that writes partial output, starts a grandchild and records both pids, then writes
+ * the graph after `delayMs` unless it is killed first
+ */
+function installSlowWild(venv: string, pidsFile: string, delayMs: number): void {
+	const script = path.join(venv, 'wild.js');
+	fs.mkdirSync(path.join(venv, 'bin'), { recursive: true });
+	fs.writeFileSync(script, [
+		`const fs = require('fs');`,
+		`const cp = require('child_process');`,
+		`const output = process.argv[process.argv.indexOf('--output') + 1];`,
+		`fs.writeFileSync(output, '<html>partial');`,
+		`const grandchild = cp.spawn(process.execPath, ['-e', 'setInterval(() => { }, 1000)'], { stdio: 'ignore' });`,
+		`fs.appendFileSync(${JSON.stringify(pidsFile)}, process.pid + ' ' + grandchild.pid + ' ' + output + '\\n');`,
+		`setTimeout(() => { fs.writeFileSync(output, '<html>graph</html>'); grandchild.kill(); }, ${delayMs});`
+	].join('\n'));
+	fs.writeFileSync(path.join(venv, 'bin', 'wild'), `#!/bin/sh\nELECTRON_RUN_AS_NODE=1 exec "${process.execPath}" "${script}" "$@"\n`, { mode: 0o755 });
+}
+
+/** Runs recorded by installSlowWild: the wild and grandchild pids and the output path */
+function readRuns(pidsFile: string): { pids: number[]; output: string }[] {
+	const text = fs.existsSync(pidsFile) ? fs.readFileSync(pidsFile, 'utf8') : '';
+	return text.split('\n').filter(line => line).map(line => {
+		const [wild, grandchild, output] = line.split(' ');
+		return { pids: [Number(wild), Number(grandchild)], output };
+	});
+}
+
+/** Whether a process is alive; exited processes not reaped yet count as gone */
+function isRunning(pid: number): boolean {
+	try {
+		process.kill(pid, 0);
+	} catch {
+		return false;
+	}
+	try {
+		return !/^\d+ \(.*\) Z/.test(fs.readFileSync(`/proc/${pid}/stat`, 'utf8'));
+	} catch {
+		return true;
+	}
+}
+
+async function waitFor(condition: () => boolean, timeoutMs = 10000): Promise<void> {
+	const deadline = Date.now() + timeoutMs;
+	while (!condition()) {
+		if (Date.now() > deadline) {
+			throw new Error('Timed out');
+		}
+		await new Promise(resolve => setTimeout(resolve, 25));
+	}
+}
 
 suite('DiffService Test Suite', () => {
 	let mockContext: vscode.ExtensionContext;
@@ -43,4 +99,232 @@ suite('DiffService Test Suite', () => {
 		const diffService = new DiffService(mockContext, mockProvider);
 		assert.ok(diffService);
 	});
+
+	test('opening a commit being prefetched is not abandoned with the prefetch', async function () {
+		this.timeout(20000);
+		if (process.platform === 'win32') {
+			this.skip();
+		}
+		const tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-diffservice-test-'));
+		const repoRoot = path.join(tmpDir, 'repo');
+		const venv = path.join(tmpDir, 'venv');
+		const env = { WILDEST_DEV_MODE: process.env.WILDEST_DEV_MODE, WILDEST_VENV_PATH: process.env.WILDEST_VENV_PATH };
+		try {
+			fs.mkdirSync(repoRoot);
+			const git = (...args: string[]) => cp.execFileSync('git', args, { cwd: repoRoot }).toString().trim();
+			git('init', '-q');
+			git('config', 'user.email', 'test@example.com');
+			git('config', 'user.name', 'Test');
+			fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'first\n');
+			git('add', 'file.txt');
+			git('commit', '-q', '-m', 'first');
+			fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'second\n');
+			git('commit', '-q', '-am', 'second');
+			const commitHash = git('rev-parse', 'HEAD');
+
+			// A slow wild that writes the graph to --output
+			const binDir = path.join(venv, os.platform() === 'win32' ? 'Scripts' : 'bin');
+			fs.mkdirSync(binDir, { recursive: true });
+			fs.writeFileSync(path.join(binDir, 'wild'), '#!/bin/sh\nsleep 1\nwhile [ "$1" != "--output" ]; do shift; done\necho "<html>graph</html>" > "$2"\n', { mode: 0o755 });
+			process.env.WILDEST_DEV_MODE = '1';
+			process.env.WILDEST_VENV_PATH = venv;
+
+			const shown: string[] = [];
+			let cancelledScreen = false;
+			const provider = {
+				showLoadingScreen: async () => { },
+				showDiffGraph: async (htmlPath: string) => { shown.push(fs.readFileSync(htmlPath, 'utf8')); },
+				showCancelledScreen: async () => { cancelledScreen = true; },
+				showNoChangesScreen: async () => { }
+			} as unknown as DiffGraphViewProvider;
+			const diffService = new DiffService(mockContext, provider);
+
+			const prefetcher = new vscode.CancellationTokenSource();
+			const prefetch = diffService.prefetchCommitDiff(mockContext, repoRoot, commitHash, prefetcher.token).catch((error: unknown) => error);
+			await new Promise(resolve => setTimeout(resolve, 200));
+			const opening = diffService.openCommitDiff(mockContext, commitHash, repoRoot);
+			// The prefetcher pauses once foreground work starts
+			await new Promise(resolve => setTimeout(resolve, 100));
+			prefetcher.cancel();
+
+			assert.ok(await prefetch instanceof vscode.CancellationError, 'The prefetch should make way for the foreground run');
+			await opening;
+			assert.deepStrictEqual(shown, ['<html>graph</html>\n'], 'The commit should be shown once generated in the foreground');
+			assert.strictEqual(cancelledScreen, false);
+		} finally {
+			for (const [name, value] of Object.entries(env)) {
+				if (value === undefined) {
+					delete process.env[name];
+				} else {
+					process.env[name] = value;
+				}
+			}
+			DiffGraphCache.getInstance().invalidateRepo(repoRoot);
+			fs.rmSync(tmpDir, { recursive: true, force: true });
+		}
+	});
+
+	suite('with a slow wild', () => {
+		let tmpDir: string;
+		let pidsFile: string;
+		const env = { WILDEST_DEV_MODE: process.env.WILDEST_DEV_MODE, WILDEST_VENV_PATH: process.env.WILDEST_VENV_PATH };
+
+		setup(function () {
+			if (process.platform === 'win32') {
+				this.skip();
+			}
+			tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-diffservice-test-'));
+			pidsFile = path.join(tmpDir, 'pids');
+			installSlowWild(path.join(tmpDir, 'venv'), pidsFile, 3000);
+			process.env.WILDEST_DEV_MODE = '1';
+			process.env.WILDEST_VENV_PATH = path.join(tmpDir, 'venv');
+		});
+
+		teardown(() => {
+			for (const [name, value] of Object.entries(env)) {
+				if (value === undefined) {
+					delete process.env[name];
+				} else {
+					process.env[name] = value;
+				}
+			}
+			for (const { pids } of readRuns(pidsFile)) {
+				pids.forEach(pid => { try { process.kill(pid, 'SIGKILL'); } catch { } });
+			}
+			fs.rmSync(tmpDir, { recursive: true, force: true });
+		});
+
+		test('cancelling a generation kills wild with its children and removes the partial output', async function () {
+			this.timeout(20000);
+			const diffService = new DiffService(mockContext);
+			const source = new vscode.CancellationTokenSource();
+			const running = diffService.generateInBackground(mockContext, tmpDir, 'unstaged', 'fingerprint', 'background', source.token);
+
+			await waitFor(() => readRuns(pidsFile).length === 1);
+			const [{ pids, output }] = readRuns(pidsFile);
+			assert.ok(pids.every(isRunning) && fs.existsSync(output));
+			source.cancel();
+
+			await assert.rejects(running, (error: unknown) => error instanceof vscode.CancellationError);
+			await waitFor(() => !pids.some(isRunning));
+			assert.strictEqual(fs.existsSync(output), false, 'The partial output should be removed');
+		});
+
+		/** A repository with one commit, returned by GitService.getRepositories until teardown */
+		function createRepository(): string {
+			const repoRoot = path.join(tmpDir, 'repo');
+			fs.mkdirSync(repoRoot);
+			const git = (...args: string[]) => cp.execFileSync('git', args, { cwd: repoRoot });
+			git('init', '-q');
+			git('config', 'user.email', 'test@example.com');
+			git('config', 'user.name', 'Test');
+			fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'first\n');
+			git('add', 'file.txt');
+			git('commit', '-q', '-m', 'first');
+			GitService.getRepositories = async () => [{ repoRoot } as any];
+			return repoRoot;
+		}
+
+		/** A DiffGraph view that records what it shows */
+		function recordingProvider() {
+			const shown: string[] = [];
+			const counts = { cancelledScreens: 0 };
+			const provider = {
+				showLoadingScreen: async () => { },
+				showDiffGraph: async (htmlPath: string) => { shown.push(fs.readFileSync(htmlPath, 'utf8')); },
+				showCancelledScreen: async () => { counts.cancelledScreens++; },
+				showNoChangesScreen: async () => { }
+			} as unknown as DiffGraphViewProvider;
+			return { provider, shown, counts };
+		}
+
+		test('opening a graph being generated in the background takes it over in the foreground', async function () {
+			this.timeout(20000);
+			const getRepositories = GitService.getRepositories;
+			let repoRoot: string | undefined;
+			try {
+				repoRoot = createRepository();
+				fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'second\n');
+				const { provider, shown, counts } = recordingProvider();
+				const diffService = new DiffService(mockContext, provider);
+
+				const background = diffService.generateInBackground(mockContext, repoRoot, 'unstaged').catch((error: unknown) => error);
+				await waitFor(() => readRuns(pidsFile).length === 1);
+				const [backgroundRun] = readRuns(pidsFile);
+
+				await diffService.openChanges(mockContext, repoRoot);
+				assert.ok(await background instanceof vscode.CancellationError, 'The background run should make way for the foreground one');
+				assert.ok(!backgroundRun.pids.some(isRunning));
+				assert.strictEqual(readRuns(pidsFile).length, 2, 'The graph should be generated again in the foreground');
+				assert.deepStrictEqual(shown, ['<html>graph</html>']);
+				assert.strictEqual(counts.cancelledScreens, 0);
+			} finally {
+				GitService.getRepositories = getRepositories;
+				if (repoRoot) {
+					DiffGraphCache.getInstance().invalidateRepo(repoRoot);
+				}
+			}
+		});
+
+		test('opening a second range does not preempt the first', async function () {
+			this.timeout(20000);
+			const getRepositories = GitService.getRepositories;
+			let repoRoot: string | undefined;
+			try {
+				repoRoot = createRepository();
+				for (const content of ['second\n', 'third\n']) {
+					fs.writeFileSync(path.join(repoRoot, 'file.txt'), content);
+					cp.execFileSync('git', ['commit', '-q', '-am', content.trim()], { cwd: repoRoot });
+				}
+				const { provider, shown, counts } = recordingProvider();
+				const diffService = new DiffService(mockContext, provider);
+
+				const first = diffService.openRangeDiff(mockContext, { kind: 'range', base: 'HEAD~2', head: 'HEAD~1' }, repoRoot);
+				await waitFor(() => readRuns(pidsFile).length === 1);
+				const second = diffService.openRangeDiff(mockContext, { kind: 'range', base: 'HEAD~1', head: 'HEAD' }, repoRoot);
+				await Promise.all([first, second]);
+
+				assert.strictEqual(readRuns(pidsFile).length, 2);
+				assert.deepStrictEqual(shown, ['<html>graph</html>', '<html>graph</html>'], 'Both ranges should be generated and shown');
+				assert.strictEqual(counts.cancelledScreens, 0);
+			} finally {
+				GitService.getRepositories = getRepositories;
+				if (repoRoot) {
+					DiffGraphCache.getInstance().invalidateRepo(repoRoot);
+				}
+			}
+		});
+
+		test('a newer run for the same diff preempts the older one without reporting it', async function () {
+			this.timeout(20000);
+			const getRepositories = GitService.getRepositories;
+			let repoRoot: string | undefined;
+			try {
+				repoRoot = createRepository();
+				const { provider, shown, counts } = recordingProvider();
+				const diffService = new DiffService(mockContext, provider);
+
+				fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'second\n');
+				const first = diffService.refreshChanges(mockContext, repoRoot);
+				await waitFor(() => readRuns(pidsFile).length === 1);
+				const [older] = readRuns(pidsFile);
+
+				fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'third\n');
+				const second = diffService.refreshChanges(mockContext, repoRoot);
+				await waitFor(() => !older.pids.some(isRunning));
+
+				await first;
+				assert.strictEqual(fs.existsSync(older.output), false, 'The preempted run should leave no output');
+				assert.strictEqual(counts.cancelledScreens, 0, 'A preempted run should not show the cancelled screen');
+				await second;
+				assert.deepStrictEqual(shown, ['<html>graph</html>'], 'Only the newer run should be shown');
+				assert.strictEqual(counts.cancelledScreens, 0);
+			} finally {
+				GitService.getRepositories = getRepositories;
+				if (repoRoot) {
+					DiffGraphCache.getInstance().invalidateRepo(repoRoot);
+				}
+			}
+		});
+	});
 });
@@ -0,0 +1,135 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as cp from 'child_process';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { GitService } from '../services/GitService';
+
+suite('GitService Test Suite', () => {
+	let repoRoot: string;
+
+	const git = (...args: string[]) => cp.execFileSync('git', args, { cwd: repoRoot });
+
+	setup(() => {
+		repoRoot = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-gitservice-test-'));
+		git('init', '-q');
+		git('config', 'user.email', 'test@example.com');
+		git('config', 'user.name', 'Test');
+		fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'original\n');
+		git('add', 'file.txt');
+		git('commit', '-q', '-m', 'initial');
+	});
+
+	teardown(() => {
+		fs.rmSync(repoRoot, { recursive: true, force: true });
+	});
+
+	test('unstaged fingerprint follows working tree content', async () => {
+		const clean = await GitService.getDiffFingerprint(repoRoot, 'unstaged');
+
+		fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'edited\n');
+		const edited = await GitService.getDiffFingerprint(repoRoot, 'unstaged');
+		assert.notStrictEqual(edited, clean, 'Editing a file should change the fingerprint');
+
+		fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'original\n');
+		const reverted = await GitService.getDiffFingerprint(repoRoot, 'unstaged');
+		assert.strictEqual(reverted, clean, 'Reverting the edit should restore the fingerprint');
+	});
+
+	test('staged fingerprint follows the index', async () => {
+		const clean = await GitService.getDiffFingerprint(repoRoot, 'staged');
+
+		fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'edited\n');
+		assert.strictEqual(await GitService.getDiffFingerprint(repoRoot, 'staged'), clean, 'Unstaged edits should not change the staged fingerprint');
+
+		git('add', 'file.txt');
+		assert.notStrictEqual(await GitService.getDiffFingerprint(repoRoot, 'staged'), clean, 'Staging should change the fingerprint');
+	});
+
+	test('staged fingerprint works during a merge conflict', async () => {
+		git('checkout', '-q', '-b', 'other');
+		fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'other\n');
+		git('commit', '-q', '-am', 'other');
+		git('checkout', '-q', '-');
+		fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'main\n');
+		git('commit', '-q', '-am', 'main');
+		const clean = await GitService.getDiffFingerprint(repoRoot, 'staged');
+		assert.throws(() => git('merge', '-q', 'other'), 'Merge should conflict');
+
+		const conflicted = await GitService.getDiffFingerprint(repoRoot, 'staged');
+		assert.notStrictEqual(conflicted, clean, 'Unmerged entries should change the fingerprint');
+		assert.strictEqual(await GitService.getDiffFingerprint(repoRoot, 'staged'), conflicted, 'Fingerprint should be stable');
+		assert.deepStrictEqual([...(await GitService.getFileFingerprints(repoRoot, 'staged')).keys()], ['file.txt']);
+	});
+
+	test('file fingerprints change only for the files that changed', async () => {
+		fs.writeFileSync(path.join(repoRoot, 'other.txt'), 'other\n');
+		git('add', 'other.txt');
+		git('commit', '-q', '-m', 'second');
+		assert.strictEqual((await GitService.getFileFingerprints(repoRoot, 'unstaged')).size, 0, 'A clean tree has no changed files');
+
+		fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'edited\n');
+		fs.writeFileSync(path.join(repoRoot, 'other.txt'), 'edited\n');
+		const first = await GitService.getFileFingerprints(repoRoot, 'unstaged');
+		assert.deepStrictEqual([...first.keys()].sort(), ['file.txt', 'other.txt']);
+
+		fs.writeFileSync(path.join(repoRoot, 'other.txt'), 'edited again\n');
+		const second = await GitService.getFileFingerprints(repoRoot, 'unstaged');
+		assert.strictEqual(second.get('file.txt'), first.get('file.txt'), 'Untouched file should keep its fingerprint');
+		assert.notStrictEqual(second.get('other.txt'), first.get('other.txt'), 'Edited file should get a new fingerprint');
+
+		git('add', 'file.txt');
+		fs.rmSync(path.join(repoRoot, 'other.txt'));
+		assert.deepStrictEqual([...(await GitService.getFileFingerprints(repoRoot, 'staged')).keys()], ['file.txt']);
+		assert.ok((await GitService.getFileFingerprints(repoRoot, 'unstaged')).get('other.txt')?.startsWith('deleted:'));
+	});
+
+	test('parses ranges in git notation', () => {
+		assert.deepStrictEqual(GitService.parseRange('main..feature'), { kind: 'range', base: 'main', head: 'feature' });
+		assert.deepStrictEqual(GitService.parseRange(' main...feature '), { kind: 'mergeBase', base: 'main', head: 'feature' });
+		assert.deepStrictEqual(GitService.parseRange('main...'), { kind: 'mergeBase', base: 'main', head: 'HEAD' });
+		assert.deepStrictEqual(GitService.parseRange('abc1234'), { kind: 'commit', head: 'abc1234' });
+		assert.strictEqual(GitService.parseRange('  '), undefined);
+	});
+
+	test('resolves root commits, ranges and merge bases to trees', async () => {
+		const root = git('rev-parse', 'HEAD').toString().trim();
+		const rootRange = await GitService.resolveRange(repoRoot, { kind: 'commit', head: root });
+		assert.strictEqual(rootRange.base, '4b825dc642cb6eb9a060e54bf8d69288fbee4904', 'A root commit should be compared with the empty tree');
+		assert.deepStrictEqual([...(await GitService.getRangeFileFingerprints(repoRoot, rootRange.baseTree, rootRange.headTree)).keys()], ['file.txt']);
+
+		git('checkout', '-q', '-b', 'feature');
+		fs.writeFileSync(path.join(repoRoot, 'feature.txt'), 'feature\n');
+		git('add', 'feature.txt');
+		git('commit', '-q', '-m', 'feature');
+		git('checkout', '-q', '-');
+		fs.writeFileSync(path.join(repoRoot, 'file.txt'), 'main\n');
+		git('commit', '-q', '-am', 'main');
+
+		const mergeBase = await GitService.resolveRange(repoRoot, { kind: 'mergeBase', base: 'HEAD', head: 'feature' });
+		assert.strictEqual(mergeBase.base, root, 'The branch should be compared with where it forked');
+		const changes = await GitService.getRangeFileFingerprints(repoRoot, mergeBase.baseTree, mergeBase.headTree);
+		assert.deepStrictEqual([...changes.keys()], ['feature.txt'], 'Changes on the base branch should not show');
+
+		const range = await GitService.resolveRange(repoRoot, { kind: 'range', base: 'HEAD', head: 'feature' });
+		assert.deepStrictEqual([...(await GitService.getRangeFileFingerprints(repoRoot, range.baseTree, range.headTree)).keys()].sort(), ['feature.txt', 'file.txt']);
+		assert.strictEqual(changes.get('feature.txt'), (await GitService.getRangeFileFingerprints(repoRoot, range.baseTree, range.headTree)).get('feature.txt'), 'Equal changes should get equal fingerprints');
+
+		await assert.rejects(GitService.resolveRange(repoRoot, { kind: 'range', base: 'no-such-branch', head: 'HEAD' }), /Unknown revision no-such-branch/);
+	});
+});
@@ -0,0 +1,63 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import { HistoryLaneEngine } from '../utils/HistoryLanes';
+
+const COLOR_COUNT = 3;
+
+/**
+ * m merges b into a:
+ *   m
+ *   |\
+ *   a b
+ *   |/
+ *   r
+ */
+const HISTORY = [
+	{ hash: 'm', parents: ['a', 'b'], refs: ['HEAD -> main'] },
+	{ hash: 'a', parents: ['r'], refs: [] },
+	{ hash: 'b', parents: ['r'], refs: [] },
+	{ hash: 'r', parents: [], refs: [] }
+];
+
+suite('History Lane Engine Test Suite', () => {
+	test('lays out forks and merges', () => {
+		const engine = new HistoryLaneEngine(COLOR_COUNT);
+		const rows = engine.append(HISTORY);
+
+		assert.strictEqual(rows[0].node, 'head');
+		assert.deepStrictEqual(rows[0].merges, [[1, 1]], 'Merge parent should branch off into its own lane');
+		assert.strictEqual(rows[0].inputColor, undefined, 'Nothing runs into the first commit');
+		assert.deepStrictEqual(rows[1].lanes, [[1, 1, 1]], 'b should pass a straight down');
+		assert.strictEqual(rows[2].circleIndex, 1, 'b should be drawn in its own lane');
+		assert.deepStrictEqual(rows[3].joins, [[1, 1]], 'Both lanes should end in the root commit');
+		assert.strictEqual(rows[3].hasParents, false);
+		assert.deepStrictEqual(rows.map(row => row.columns), [3, 3, 3, 3]);
+		assert.deepStrictEqual(engine.lanes, []);
+	});
+
+	test('appending pages gives the same rows as one pass', () => {
+		const whole = new HistoryLaneEngine(COLOR_COUNT).append(HISTORY);
+		const paged = new HistoryLaneEngine(COLOR_COUNT);
+		const rows = [
+			...paged.append(HISTORY.slice(0, 1)),
+			...paged.append(HISTORY.slice(1, 3)),
+			...paged.append(HISTORY.slice(3))
+		];
+
+		assert.deepStrictEqual(rows, whole);
+	});
+});
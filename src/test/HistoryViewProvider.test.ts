@@ -0,0 +1,226 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as cp from 'child_process';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import * as vscode from 'vscode';
+import { HistoryViewProvider } from '../providers/HistoryViewProvider';
+import { GitService } from '../services/GitService';
+import { GitHistoryCache } from '../services/GitHistoryCache';
+
+/** A webview view that records the messages posted to it and the HTML set on it */
+function fakeView() {
+	const posted: any[] = [];
+	const htmls: string[] = [];
+	let receive: (message: any) => Promise<void> = async () => { };
+	const view = {
+		visible: true,
+		onDidChangeVisibility: () => ({ dispose: () => { } }),
+		onDidDispose: () => ({ dispose: () => { } }),
+		webview: {
+			options: {} as vscode.WebviewOptions,
+			get html() { return htmls[htmls.length - 1] ?? ''; },
+			set html(html: string) { htmls.push(html); },
+			cspSource: '',
+			asWebviewUri: (uri: vscode.Uri) => uri,
+			postMessage: async (message: any) => { posted.push(message); return true; },
+			onDidReceiveMessage: (listener: (message: any) => Promise<void>) => { receive = listener; return { dispose: () => { } }; }
+		}
+	};
+	return { view: view as unknown as vscode.WebviewView, posted, htmls, send: (message: any) => receive(message) };
+}
+
+/** Arguments of each wild run recorded by the fake wild */
+function readCalls(calls: string): string[] {
+	return fs.readFileSync(calls, 'utf8').trim().split('\n');
+}
+
+async function waitFor<T>(find: () => T | undefined): Promise<T> {
+	for (let i = 0; i < 200; i++) {
+		const found = find();
+		if (found !== undefined) {
+			return found;
+		}
+		await new Promise(resolve => setTimeout(resolve, 25));
+	}
+	throw new Error('Timed out');
+}
+
+suite('HistoryViewProvider Test Suite', () => {
+	let tmpDir: string;
+	let repoRoot: string;
+	let calls: string;
+	const env = { WILDEST_DEV_MODE: process.env.WILDEST_DEV_MODE, WILDEST_VENV_PATH: process.env.WILDEST_VENV_PATH };
+	const getRepositories = GitService.getRepositories;
+	const git = (...args: string[]) => cp.execFileSync('git', args, { cwd: repoRoot }).toString().trim();
+
+	setup(function () {
+		if (process.platform === 'win32') {
+			this.skip();
+		}
+		tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wildest-history-test-'));
+		repoRoot = path.join(tmpDir, 'repo');
+		calls = path.join(tmpDir, 'calls');
+		fs.mkdirSync(repoRoot);
+		git('init', '-q');
+		git('config', 'user.email', 'test@example.com');
+		git('config', 'user.name', 'Test');
+
+		// A wild that passes its arguments on to git
+		const venv = path.join(tmpDir, 'venv');
+		fs.mkdirSync(path.join(venv, 'bin'), { recursive: true });
+		fs.writeFileSync(path.join(venv, 'bin', 'wild'), `#!/bin/sh\necho "$@" >> "${calls}"\nexec git "$@"\n`, { mode: 0o755 });
+		process.env.WILDEST_DEV_MODE = '1';
+		process.env.WILDEST_VENV_PATH = venv;
+		GitService.getRepositories = async () => [{ repoRoot } as any];
+	});
+
+	teardown(() => {
+		GitService.getRepositories = getRepositories;
+		GitHistoryCache.invalidate(repoRoot);
+		for (const [name, value] of Object.entries(env)) {
+			if (value === undefined) {
+				delete process.env[name];
+			} else {
+				process.env[name] = value;
+			}
+		}
+		fs.rmSync(tmpDir, { recursive: true, force: true });
+	});
+
+	/** A provider showing the repository in a fake view */
+	function showHistory() {
+		const extensionUri = vscode.Uri.file(path.join(__dirname, '..', '..'));
+		const provider = new HistoryViewProvider(extensionUri, { extensionPath: extensionUri.fsPath } as vscode.ExtensionContext, async () => { });
+		const view = fakeView();
+		provider.resolveWebviewView(view.view, {} as vscode.WebviewViewResolveContext, new vscode.CancellationTokenSource().token);
+		return { provider, ...view };
+	}
+
+	test('pages are read below the loaded commits, and refreshes and restored views keep them', async function () {
+		this.timeout(30000);
+		for (let i = 0; i < 250; i++) {
+			git('commit', '-q', '--allow-empty', '-m', `commit ${i}`);
+		}
+		const { provider, posted, send } = showHistory();
+
+		const first = await waitFor(() => posted.find(message => message.type === 'commits'));
+		assert.strictEqual(first.page.count, 100);
+		assert.strictEqual(first.page.subjects[0], 'commit 249');
+		assert.ok(first.hasMore);
+
+		await send({ command: 'loadMore' });
+		await send({ command: 'loadMore' });
+		const pages = posted.filter(message => message.type === 'appendCommits');
+		assert.deepStrictEqual(pages.map(page => [page.page.start, page.page.count, page.hasMore]), [[100, 100, true], [200, 50, false]]);
+		assert.strictEqual(pages[0].base, first.seq);
+		assert.strictEqual(pages[1].base, pages[0].seq);
+		const reads = readCalls(calls);
+		assert.ok(reads.every(args => args.includes('-n 100')), 'Every read should be limited to a page');
+		assert.deepStrictEqual(reads.map(args => args.split(' ').pop()), ['HEAD', pages[0].page.hashes.substring(0, 40), pages[1].page.hashes.substring(0, 40)], 'Pages should continue from the parents of the loaded commits');
+
+		// A new commit is added on top of the 250 loaded ones, which stay loaded
+		git('commit', '-q', '--allow-empty', '-m', 'commit 250');
+		posted.length = 0;
+		await provider.refresh();
+		const delta = posted.find(message => message.type === 'historyDelta');
+		assert.deepStrictEqual([delta.prepend.count, delta.kept, delta.tail.count], [1, 250, 0]);
+		assert.strictEqual(delta.base, pages[1].seq);
+
+		// A webview that missed the delta gets the whole history
+		posted.length = 0;
+		await send({ command: 'resync', seq: pages[1].seq });
+		const full = posted.find(message => message.type === 'commits');
+		assert.strictEqual(full.page.count, 251);
+		assert.ok(full.seq > delta.seq);
+
+		// A view restored from its saved state has the first page and gets the loaded ones on scroll
+		posted.length = 0;
+		await send({ command: 'ready', seq: full.seq, count: 100 });
+		assert.strictEqual(posted.length, 0);
+		await send({ command: 'loadMore' });
+		await send({ command: 'loadMore' });
+		const restored = posted.filter(message => message.type === 'appendCommits');
+		assert.deepStrictEqual(restored.map(page => [page.page.start, page.page.count, page.hasMore]), [[100, 100, true], [200, 51, false]]);
+		assert.strictEqual(restored[0].base, full.seq);
+		assert.strictEqual(readCalls(calls).length, 6, 'Loaded pages should not be read again');
+	});
+
+	test('refreshes and repository changes reach the webview as messages, without setting its HTML again', async function () {
+		this.timeout(30000);
+		git('commit', '-q', '--allow-empty', '-m', 'first');
+		const { provider, posted, htmls } = showHistory();
+		await waitFor(() => posted.find(message => message.type === 'commits'));
+		assert.strictEqual(htmls.length, 1);
+		assert.ok(htmls[0].includes('<html'));
+
+		git('commit', '-q', '--allow-empty', '-m', 'second');
+		await provider.refresh();
+		assert.ok(posted.some(message => message.type === 'historyDelta'));
+
+		// Another repository replaces the history, still as a message
+		const otherRoot = path.join(tmpDir, 'other');
+		fs.mkdirSync(otherRoot);
+		cp.execFileSync('git', ['init', '-q'], { cwd: otherRoot });
+		cp.execFileSync('git', ['-c', 'user.email=test@example.com', '-c', 'user.name=Test', 'commit', '-q', '--allow-empty', '-m', 'other'], { cwd: otherRoot });
+		GitService.getRepositories = async () => [{ repoRoot: otherRoot } as any];
+		posted.length = 0;
+		await provider.refresh();
+		const other = posted.find(message => message.type === 'commits');
+		assert.strictEqual(other.repoPath, otherRoot);
+		GitHistoryCache.invalidate(otherRoot);
+
+		assert.strictEqual(htmls.length, 1, 'The HTML should only be set when the view is created');
+
+		// A view created again gets the same shell
+		const again = fakeView();
+		provider.resolveWebviewView(again.view, {} as vscode.WebviewViewResolveContext, new vscode.CancellationTokenSource().token);
+		assert.deepStrictEqual(again.htmls, htmls);
+	});
+
+	test('paging through merged branches lists every commit once, after its children', async function () {
+		this.timeout(30000);
+		git('commit', '-q', '--allow-empty', '-m', 'root');
+		const root = git('rev-parse', 'HEAD');
+		for (let i = 0; i < 120; i++) {
+			git('commit', '-q', '--allow-empty', '-m', `main ${i}`);
+		}
+		git('checkout', '-q', '-b', 'side', root);
+		for (let i = 0; i < 120; i++) {
+			git('commit', '-q', '--allow-empty', '-m', `side ${i}`);
+		}
+		git('checkout', '-q', '-');
+		git('merge', '-q', '--no-ff', '-m', 'merge', 'side');
+		const { posted, send } = showHistory();
+
+		await waitFor(() => posted.find(message => message.type === 'commits'));
+		while (posted.filter(message => message.page).pop().hasMore) {
+			await send({ command: 'loadMore' });
+		}
+		const hashes = posted.filter(message => message.page).map(message => message.page.hashes).join('').match(/.{40}/g)!;
+
+		assert.strictEqual(hashes.length, 242);
+		assert.deepStrictEqual([...hashes].sort(), git('rev-list', 'HEAD').split('\n').sort());
+		const row = new Map(hashes.map((hash, index) => [hash, index]));
+		for (const line of git('rev-list', '--parents', 'HEAD').split('\n')) {
+			const [hash, ...parents] = line.split(' ');
+			assert.ok(parents.every(parent => row.get(parent)! > row.get(hash)!), `${hash} should be listed before its parents`);
+		}
+		assert.ok(readCalls(calls).every(args => args.includes('-n 100')));
+	});
+});
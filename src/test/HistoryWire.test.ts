@@ -0,0 +1,77 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import { GitCommit } from '../utils/types';
+import { HistoryLaneEngine } from '../utils/HistoryLanes';
+import { diffHistory, encodeHistoryPage } from '../utils/HistoryWire';
+
+function commit(hash: string, parents: string[], refs: string[] = []): GitCommit {
+	return {
+		hash: hash.repeat(40),
+		shortHash: hash.repeat(7),
+		author: 'Ada',
+		email: 'ada@example.com',
+		date: new Date(0),
+		message: `subject ${hash}`,
+		subject: `subject ${hash}`,
+		parents: parents.map(parent => parent.repeat(40)),
+		refs
+	};
+}
+
+const HISTORY = [
+	commit('m', ['a', 'b'], ['HEAD -> main']),
+	commit('a', ['r']),
+	commit('b', ['r'])
+];
+
+suite('History Wire Format Test Suite', () => {
+	test('interns strings and links parents by row', () => {
+		const page = encodeHistoryPage(HISTORY, new HistoryLaneEngine(5).append(HISTORY), 10);
+
+		assert.deepStrictEqual(page.strings, ['Ada', 'ada@example.com', 'HEAD -> main', 'r'.repeat(40)]);
+		assert.strictEqual(page.hashes.length, 3 * 40);
+		assert.deepStrictEqual([...page.authors], [0, 0, 0]);
+		assert.deepStrictEqual([...page.parentOffsets], [0, 2, 3, 4]);
+		assert.deepStrictEqual([...page.parents], [11, 12, -4, -4], 'Parents in the page are rows, others interned hashes');
+		assert.deepStrictEqual([...page.refOffsets], [0, 1, 1, 1]);
+	});
+
+	test('encodes graph rows', () => {
+		const rows = new HistoryLaneEngine(5).append(HISTORY);
+		const page = encodeHistoryPage(HISTORY, rows, 0);
+
+		assert.deepStrictEqual([...page.circleIndexes], rows.map(row => row.circleIndex));
+		assert.deepStrictEqual([...page.inputColors], [-2, 0, 1]);
+		assert.deepStrictEqual([...page.segments.subarray(page.segmentOffsets[1], page.segmentOffsets[2])], rows[1].lanes.flat());
+	});
+
+	test('diffs a refreshed history against the shown one', () => {
+		const layout = (commits: GitCommit[]) => new HistoryLaneEngine(5).append(commits);
+		const diff = (shown: GitCommit[], next: GitCommit[]) => diffHistory(shown, layout(shown), next, layout(next));
+
+		assert.deepStrictEqual(diff(HISTORY, HISTORY), { prepended: 0, kept: 3, changed: [] });
+
+		const newer = [commit('n', ['m'], ['HEAD -> main']), { ...HISTORY[0], refs: [] }, ...HISTORY.slice(1)];
+		const delta = diff(HISTORY, newer);
+		assert.strictEqual(delta?.prepended, 1);
+		assert.strictEqual(delta?.kept, 3);
+		assert.ok(delta?.changed.includes(1), 'The old HEAD should be patched');
+
+		assert.deepStrictEqual(diff(HISTORY, HISTORY.slice(0, 2)), { prepended: 0, kept: 2, changed: [] });
+		assert.strictEqual(diff(HISTORY, [commit('x', [])]), undefined, 'Unrelated history should be replaced');
+	});
+});
@@ -0,0 +1,70 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import { SingleFlight } from '../utils/SingleFlight';
+
+suite('SingleFlight Test Suite', () => {
+	test('concurrent calls with the same key share one run', async () => {
+		const flight = new SingleFlight<string>();
+		let runs = 0;
+		let release!: () => void;
+		const task = () => new Promise<string>(resolve => {
+			runs++;
+			release = () => resolve('/tmp/result.html');
+		});
+
+		const first = flight.run('/repo:unstaged:abc', task);
+		const second = flight.run('/repo:unstaged:abc', task);
+		await Promise.resolve();
+		assert.strictEqual(flight.has('/repo:unstaged:abc'), true, 'Run should be registered');
+		release();
+
+		assert.deepStrictEqual(await Promise.all([first, second]), ['/tmp/result.html', '/tmp/result.html']);
+		assert.strictEqual(runs, 1, 'Task should only run once');
+		assert.strictEqual(flight.size, 0, 'Registry should be empty once settled');
+	});
+
+	test('different keys run independently', async () => {
+		const flight = new SingleFlight<string>();
+		let runs = 0;
+		const task = async () => `run-${++runs}`;
+
+		await Promise.all([
+			flight.run('/repo:staged:abc', task),
+			flight.run('/repo:unstaged:abc', task)
+		]);
+
+		assert.strictEqual(runs, 2, 'Each key should run its own task');
+	});
+
+	test('a failed run is shared and then cleared', async () => {
+		const flight = new SingleFlight<string>();
+		let runs = 0;
+		const failing = async (): Promise<string> => {
+			runs++;
+			throw new Error('wild exited with code 1');
+		};
+
+		const results = await Promise.allSettled([
+			flight.run('/repo:staged:abc', failing),
+			flight.run('/repo:staged:abc', failing)
+		]);
+		assert.ok(results.every(result => result.status === 'rejected'), 'Both callers should see the failure');
+		assert.strictEqual(runs, 1, 'Failing task should only run once');
+
+		assert.strictEqual(await flight.run('/repo:staged:abc', async () => 'retry'), 'retry', 'Later calls should run again');
+	});
+});
@@ -0,0 +1,142 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import * as os from 'os';
+import * as vscode from 'vscode';
+import { CliService } from '../services/CliService';
+import { WildDaemon, WildDaemonUnavailableError } from '../services/WildDaemon';
+import { CliCommand, CliLine, CliOutputSink, CliProgressEvent } from '../utils/types';
+
+/** A minimal `wild serve` speaking the daemon protocol */
+const FAKE_SERVER = `
+	const send = (message) => process.stdout.write(JSON.stringify(message) + '\\n');
+	process.stderr.write('serving\\n');
+	let buffer = '';
+	process.stdin.setEncoding('utf8');
+	process.stdin.on('data', (data) => {
+		buffer += data;
+		let index;
+		while ((index = buffer.indexOf('\\n')) !== -1) {
+			const request = JSON.parse(buffer.slice(0, index));
+			buffer = buffer.slice(index + 1);
+			if (request.method === 'ping') {
+				send({ jsonrpc: '2.0', id: request.id, result: {} });
+			} else if (request.method === 'run' && request.params.args[0] === 'hang') {
+				// Ignores cancellation
+			} else if (request.method === 'run' && request.params.args[0] === 'slow') {
+				setTimeout(() => send({ jsonrpc: '2.0', id: request.id, result: { exitCode: 0 } }), 3500);
+			} else if (request.method === 'run' && request.params.args[0] === 'crash') {
+				send({ jsonrpc: '2.0', method: 'output', params: { id: request.id, stream: 'stdout', text: 'crash' } });
+				setTimeout(() => process.exit(1), 50);
+			} else if (request.method === 'run') {
+				const id = request.id;
+				send({ jsonrpc: '2.0', method: 'output', params: { id, stream: 'stdout', text: request.params.args.join(' ') } });
+				send({ jsonrpc: '2.0', method: 'progress', params: { id, event: 'progress', phase: 'parse', percent: 50 } });
+				send({ jsonrpc: '2.0', id, result: { exitCode: request.params.args[0] === 'fail' ? 1 : 0 } });
+			}
+		}
+	});
+`;
+
+function nodeCommand(script: string): CliCommand {
+	return {
+		executable: process.execPath,
+		args: ['-e', script],
+		env: Object.assign({}, process.env, { ELECTRON_RUN_AS_NODE: '1' })
+	};
+}
+
+function collectingSink() {
+	const lines: CliLine[] = [];
+	const events: CliProgressEvent[] = [];
+	const sink: CliOutputSink = { line: l => lines.push(l), progress: e => events.push(e) };
+	return { sink, lines, events };
+}
+
+suite('WildDaemon Test Suite', () => {
+	test('runs requests in the daemon and forwards their output', async () => {
+		const daemon = new WildDaemon(nodeCommand(FAKE_SERVER));
+		try {
+			const { sink, lines, events } = collectingSink();
+			await Promise.all([
+				daemon.run(['diff', '--staged'], os.tmpdir(), sink),
+				daemon.run(['diff'], os.tmpdir(), sink)
+			]);
+
+			assert.deepStrictEqual(lines.map(l => l.text).sort(), ['diff', 'diff --staged']);
+			assert.strictEqual(events.length, 2, 'Progress should be routed to the request');
+			await assert.rejects(daemon.run(['fail'], os.tmpdir(), sink), /exited with code 1/);
+			assert.ok(daemon.accepts(nodeCommand('')), 'A failed run should not take the daemon down');
+		} finally {
+			daemon.dispose();
+		}
+	});
+
+	test('reports itself unavailable when wild has no serve mode', async () => {
+		const daemon = new WildDaemon(nodeCommand('process.exit(2)'));
+		const { sink } = collectingSink();
+
+		await assert.rejects(daemon.run(['diff'], os.tmpdir(), sink), (error: unknown) => error instanceof WildDaemonUnavailableError);
+		assert.ok(!daemon.accepts(nodeCommand('')), 'Callers should spawn wild from now on');
+		daemon.dispose();
+	});
+
+	test('sends the worker\'s stderr to the log', async () => {
+		const logged: string[] = [];
+		const daemon = new WildDaemon(nodeCommand(FAKE_SERVER), message => logged.push(message));
+		try {
+			await daemon.run(['diff'], os.tmpdir(), collectingSink().sink);
+			// stderr and stdout are separate pipes
+			await new Promise(resolve => setTimeout(resolve, 50));
+			assert.deepStrictEqual(logged, ['serving']);
+		} finally {
+			daemon.dispose();
+		}
+	});
+
+	test('a request ignoring cancellation does not fail the others', async function () {
+		this.timeout(10000);
+		const daemon = new WildDaemon(nodeCommand(FAKE_SERVER));
+		try {
+			const source = new vscode.CancellationTokenSource();
+			const hanging = daemon.run(['hang'], os.tmpdir(), collectingSink().sink, source.token);
+			const slow = daemon.run(['slow'], os.tmpdir(), collectingSink().sink);
+			await new Promise(resolve => setTimeout(resolve, 100));
+			source.cancel();
+
+			await assert.rejects(hanging, (error: unknown) => error instanceof vscode.CancellationError);
+			await slow;
+			await daemon.run(['diff'], os.tmpdir(), collectingSink().sink);
+		} finally {
+			daemon.dispose();
+		}
+	});
+
+	test('a run is not repeated by spawning wild once output has started', async () => {
+		const command = nodeCommand(FAKE_SERVER);
+		CliService.setDaemon(new WildDaemon(command));
+		try {
+			const lines: string[] = [];
+			await assert.rejects(
+				CliService.execute({ ...command, args: ['crash'] }, os.tmpdir(), undefined, { onLine: line => lines.push(line.text) }),
+				/during the run/
+			);
+			assert.deepStrictEqual(lines, ['crash'], 'Output should not be sent twice');
+		} finally {
+			CliService.setDaemon(undefined);
+		}
+	});
+});
@@ -0,0 +1,64 @@
+// Copyright (C) 2025  Wildest AI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import * as assert from 'assert';
+import { runPool } from '../utils/WorkerPool';
+
+const tick = () => new Promise<void>(resolve => setTimeout(resolve, 1));
+
+suite('Worker Pool Test Suite', () => {
+	test('runs at most limit tasks at once and keeps item order', async () => {
+		let running = 0;
+		let peak = 0;
+		const results = await runPool(['a', 'b', 'c', 'd', 'e'], 2, async (item, index) => {
+			running++;
+			peak = Math.max(peak, running);
+			// Later items finish first
+			await new Promise(resolve => setTimeout(resolve, 10 - index * 2));
+			running--;
+			return `${item}${index}`;
+		});
+
+		assert.strictEqual(peak, 2, 'Pool should be bounded');
+		assert.deepStrictEqual(results.map(result => result?.status === 'fulfilled' && result.value), ['a0', 'b1', 'c2', 'd3', 'e4']);
+	});
+
+	test('a failing item does not stop the others', async () => {
+		const results = await runPool([1, 2, 3], 3, async (item) => {
+			await tick();
+			if (item === 2) {
+				throw new Error('wild exited with code 1');
+			}
+			return item;
+		});
+
+		assert.deepStrictEqual(results.map(result => result?.status), ['fulfilled', 'rejected', 'fulfilled']);
+		assert.strictEqual((results[1] as PromiseRejectedResult).reason.message, 'wild exited with code 1');
+	});
+
+	test('cancelling stops starting new items', async () => {
+		let cancelled = false;
+		const started: number[] = [];
+		const results = await runPool([1, 2, 3, 4], 1, async (item) => {
+			started.push(item);
+			cancelled = item === 2;
+			await tick();
+			return item;
+		}, () => cancelled);
+
+		assert.deepStrictEqual(started, [1, 2]);
+		assert.deepStrictEqual(results.map(result => result?.status), ['fulfilled', 'fulfilled', undefined, undefined]);
+	});
+});
@@ -0,0 +1,82 @@
+/**
+ * Unbounded queue that can be consumed with `for await`
+ * Producers push items and finally call end() or fail(); the iterator
+ * drains pushed items before finishing or throwing.
+ */
+export class AsyncQueue<T> implements AsyncIterableIterator<T> {
+	private _items: T[] = [];
+	private _waiting?: { resolve: (result: IteratorResult<T>) => void; reject: (error: unknown) => void };
+	private _ended = false;
+	private _error: unknown;
+
+	/**
+	 * @param _onReturn - Called when the consumer stops early (e.g. `break` out of `for await`),
+	 * to stop the producer
+	 */
+	constructor(private readonly _onReturn?: () => void) { }
+
+	public push(item: T): void {
+		if (this._ended) {
+			return;
+		}
+		if (this._waiting) {
+			const { resolve } = this._waiting;
+			this._waiting = undefined;
+			resolve({ value: item, done: false });
+		} else {
+			this._items.push(item);
+		}
+	}
+
+	public end(): void {
+		this.finish(undefined);
+	}
+
+	public fail(error: unknown): void {
+		this.finish(error ?? new Error('AsyncQueue failed'));
+	}
+
+	public next(): Promise<IteratorResult<T>> {
+		if (this._items.length > 0) {
+			return Promise.resolve({ value: this._items.shift() as T, done: false });
+		}
+		if (this._ended) {
+			return this._error !== undefined
+				? Promise.reject(this._error)
+				: Promise.resolve({ value: undefined, done: true });
+		}
+		return new Promise((resolve, reject) => {
+			this._waiting = { resolve, reject };
+		});
+	}
+
+	/**
+	 * The consumer is done: drop buffered items and stop the producer
+	 */
+	public return(): Promise<IteratorResult<T>> {
+		const stopped = !this._ended;
+		this._items = [];
+		this.finish(undefined);
+		if (stopped) {
+			this._onReturn?.();
+		}
+		return Promise.resolve({ value: undefined, done: true });
+	}
+
+	public [Symbol.asyncIterator](): AsyncIterableIterator<T> {
+		return this;
+	}
+
+	private finish(error: unknown): void {
+		if (this._ended) {
+			return;
+		}
+		this._ended = true;
+		this._error = error;
+		if (this._waiting) {
+			const { resolve, reject } = this._waiting;
+			this._waiting = undefined;
+			error !== undefined ? reject(error) : resolve({ value: undefined, done: true });
+		}
+	}
+}
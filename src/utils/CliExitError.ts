@@ -0,0 +1,20 @@
+/**
+ * wild ran and exited with a non-zero code
+ * Carries the tail of its stderr, so callers can tell usage errors from failed diffs.
+ */
+export class CliExitError extends Error {
+	constructor(public readonly exitCode: number | undefined, public readonly stderr: string = '') {
+		super(`wild exited with code ${exitCode}`);
+		this.name = 'CliExitError';
+	}
+
+	/**
+	 * Whether wild rejected one of the given options as unknown, e.g. an older build without them
+	 */
+	public rejectsOption(...options: string[]): boolean {
+		// click and argparse both exit with 2 on usage errors
+		return this.exitCode === 2
+			&& /no such option|unrecognized arguments|unknown option/i.test(this.stderr)
+			&& options.some(option => this.stderr.includes(option));
+	}
+}
@@ -0,0 +1,104 @@
+import { HistoryGraphRow } from './types';
+
+interface Lane {
+	/** Commit the lane is heading to */
+	id: string;
+	color: number;
+}
+
+/**
+ * Swimlane layout of the History graph, in a single pass over the commits
+ * Lanes are never mutated, so unchanged lanes are shared between rows instead of cloned.
+ * Commits can be appended page by page; lane state carries over between `append` calls.
+ * Based on VS Code's SCM history graph; rows are emitted as render-ready `HistoryGraphRow`s.
+ */
+export class HistoryLaneEngine {
+	private _lanes: readonly Lane[] = [];
+	private _colorIndex = -1;
+
+	/**
+	 * @param _colorCount Size of the lane palette new lanes cycle through
+	 */
+	constructor(private readonly _colorCount: number) { }
+
+	/**
+	 * Lanes open below the last appended commit
+	 */
+	public get lanes(): readonly Lane[] {
+		return this._lanes;
+	}
+
+	/**
+	 * Lay out the next commits, newest to oldest
+	 */
+	public append(commits: readonly { hash: string; parents: string[]; refs: string[] }[]): HistoryGraphRow[] {
+		return commits.map(commit => this.layout(commit.hash, commit.parents, commit.refs));
+	}
+
+	private layout(hash: string, parents: string[], refs: string[]): HistoryGraphRow {
+		const inputs = this._lanes;
+		const outputs: Lane[] = [];
+		/** id -> last output column, for merge parents */
+		const lastOutputIndex = new Map<string, number>();
+		const push = (lane: Lane) => {
+			lastOutputIndex.set(lane.id, outputs.length);
+			outputs.push(lane);
+		};
+
+		const lanes: [number, number, number][] = [];
+		const joins: [number, number][] = [];
+		let inputIndex = -1;
+		let firstParentAdded = false;
+		for (let index = 0; index < inputs.length; index++) {
+			const lane = inputs[index];
+			if (lane.id !== hash) {
+				// A root commit ends every lane
+				if (parents.length > 0) {
+					lanes.push([index, outputs.length, lane.color]);
+					push(lane);
+				}
+				continue;
+			}
+			if (inputIndex === -1) {
+				inputIndex = index;
+			} else {
+				joins.push([index, lane.color]);
+			}
+			// Replace the commit with its first parent, keeping the lane color
+			if (parents.length > 0 && !firstParentAdded) {
+				push({ id: parents[0], color: lane.color });
+				firstParentAdded = true;
+			}
+		}
+
+		// Remaining parents (and the first one if the commit had no lane) open new lanes
+		for (let i = firstParentAdded ? 1 : 0; i < parents.length; i++) {
+			this._colorIndex = (this._colorIndex + 1) % this._colorCount;
+			push({ id: parents[i], color: this._colorIndex });
+		}
+
+		const merges: [number, number][] = [];
+		for (let i = 1; i < parents.length; i++) {
+			const index = lastOutputIndex.get(parents[i]);
+			if (index !== undefined) {
+				merges.push([index, outputs[index].color]);
+			}
+		}
+
+		const circleIndex = inputIndex !== -1 ? inputIndex : inputs.length;
+		this._lanes = outputs;
+		return {
+			circleIndex,
+			circleColor: circleIndex < outputs.length ? outputs[circleIndex].color
+				: circleIndex < inputs.length ? inputs[circleIndex].color
+					: -1,
+			node: refs.some(ref => ref.includes('HEAD')) ? 'head' : parents.length > 1 ? 'merge' : 'commit',
+			inputColor: inputIndex !== -1 ? inputs[inputIndex].color : undefined,
+			hasParents: parents.length > 0,
+			lanes,
+			joins,
+			merges,
+			columns: Math.max(inputs.length, outputs.length, 1) + 1
+		};
+	}
+}
@@ -0,0 +1,165 @@
+import { GitCommit, HistoryGraphRow } from './types';
+
+/** Bits of `HistoryWirePage.flags` */
+const NODE_MERGE = 1;
+const NODE_HEAD = 2;
+const HAS_PARENTS = 4;
+/** `HistoryWirePage.inputColors` value of a row without a lane running into its node */
+const NO_INPUT = -2;
+
+/**
+ * Columnar encoding of a run of History commits and their graph rows, posted to the webview
+ * Authors, emails, refs and parent hashes outside the page are interned in `strings`;
+ * parents inside the page are row indexes. Numeric columns are typed arrays, which
+ * postMessage transfers as binary. Decoded by `decodePage` in media/history/main.js.
+ */
+export interface HistoryWirePage {
+	/** Row of the first commit in the loaded history */
+	start: number;
+	count: number;
+	strings: string[];
+	/** 40-character hashes, concatenated */
+	hashes: string;
+	subjects: string[];
+	/** Indexes into `strings` */
+	authors: Uint32Array;
+	emails: Uint32Array;
+	/** Milliseconds since the epoch */
+	dates: Float64Array;
+	/** Start of each commit's parents, plus the end of the last */
+	parentOffsets: Uint32Array;
+	/** Row in the loaded history, or `-1 - i` for the hash in `strings[i]` */
+	parents: Int32Array;
+	/** Start of each commit's refs, plus the end of the last */
+	refOffsets: Uint32Array;
+	/** Indexes into `strings` */
+	refs: Uint32Array;
+	circleIndexes: Uint16Array;
+	circleColors: Int8Array;
+	inputColors: Int8Array;
+	flags: Uint8Array;
+	columns: Uint16Array;
+	/** Start of each row's segments: lane triples, then join pairs, then merge pairs */
+	segmentOffsets: Uint32Array;
+	laneCounts: Uint16Array;
+	joinCounts: Uint16Array;
+	segments: Int16Array;
+}
+
+/**
+ * Encode commits and their graph rows, the first of them being row `start` of the loaded history
+ */
+export function encodeHistoryPage(commits: readonly GitCommit[], rows: readonly HistoryGraphRow[], start: number): HistoryWirePage {
+	const count = commits.length;
+	const strings: string[] = [];
+	const interned = new Map<string, number>();
+	const intern = (value: string): number => {
+		let index = interned.get(value);
+		if (index === undefined) {
+			index = strings.length;
+			strings.push(value);
+			interned.set(value, index);
+		}
+		return index;
+	};
+	const rowOf = new Map<string, number>();
+	commits.forEach((commit, i) => rowOf.set(commit.hash, start + i));
+
+	const page: HistoryWirePage = {
+		start,
+		count,
+		strings,
+		hashes: commits.map(commit => commit.hash).join(''),
+		subjects: commits.map(commit => commit.subject),
+		authors: new Uint32Array(count),
+		emails: new Uint32Array(count),
+		dates: new Float64Array(count),
+		parentOffsets: new Uint32Array(count + 1),
+		parents: new Int32Array(commits.reduce((total, commit) => total + commit.parents.length, 0)),
+		refOffsets: new Uint32Array(count + 1),
+		refs: new Uint32Array(commits.reduce((total, commit) => total + commit.refs.length, 0)),
+		circleIndexes: new Uint16Array(count),
+		circleColors: new Int8Array(count),
+		inputColors: new Int8Array(count),
+		flags: new Uint8Array(count),
+		columns: new Uint16Array(count),
+		segmentOffsets: new Uint32Array(count + 1),
+		laneCounts: new Uint16Array(count),
+		joinCounts: new Uint16Array(count),
+		segments: new Int16Array(rows.reduce((total, row) => total + 3 * row.lanes.length + 2 * (row.joins.length + row.merges.length), 0))
+	};
+
+	let parentIndex = 0;
+	let refIndex = 0;
+	let segmentIndex = 0;
+	for (let i = 0; i < count; i++) {
+		const commit = commits[i];
+		page.authors[i] = intern(commit.author);
+		page.emails[i] = intern(commit.email);
+		page.dates[i] = new Date(commit.date).getTime();
+
+		for (const parent of commit.parents) {
+			page.parents[parentIndex++] = rowOf.get(parent) ?? -1 - intern(parent);
+		}
+		page.parentOffsets[i + 1] = parentIndex;
+		for (const ref of commit.refs) {
+			page.refs[refIndex++] = intern(ref);
+		}
+		page.refOffsets[i + 1] = refIndex;
+
+		const row = rows[i];
+		page.circleIndexes[i] = row.circleIndex;
+		page.circleColors[i] = row.circleColor;
+		page.inputColors[i] = row.inputColor ?? NO_INPUT;
+		page.flags[i] = (row.node === 'merge' ? NODE_MERGE : row.node === 'head' ? NODE_HEAD : 0) | (row.hasParents ? HAS_PARENTS : 0);
+		page.columns[i] = row.columns;
+		page.laneCounts[i] = row.lanes.length;
+		page.joinCounts[i] = row.joins.length;
+		for (const segment of [...row.lanes, ...row.joins, ...row.merges]) {
+			page.segments.set(segment, segmentIndex);
+			segmentIndex += segment.length;
+		}
+		page.segmentOffsets[i + 1] = segmentIndex;
+	}
+	return page;
+}
+
+/**
+ * How the history shown in the webview becomes a new one: the new commits above it,
+ * a run of shown commits that stay in place, then the new rows after them
+ */
+export interface HistoryDelta {
+	/** Commits added above the shown ones */
+	prepended: number;
+	/** Shown commits kept, directly below the prepended ones */
+	kept: number;
+	/** Rows in the new history of kept commits whose refs or graph row changed */
+	changed: number[];
+}
+
+/**
+ * Compare the shown history with a new one, or return undefined if it has to be replaced
+ * Graph rows are compared too, since commits added above can shift lanes and colors below.
+ */
+export function diffHistory(
+	shown: readonly GitCommit[],
+	shownRows: readonly HistoryGraphRow[],
+	next: readonly GitCommit[],
+	nextRows: readonly HistoryGraphRow[]
+): HistoryDelta | undefined {
+	const prepended = shown.length > 0 ? next.findIndex(commit => commit.hash === shown[0].hash) : -1;
+	if (prepended === -1) {
+		return undefined;
+	}
+
+	let kept = 0;
+	const changed: number[] = [];
+	while (kept < shown.length && prepended + kept < next.length && shown[kept].hash === next[prepended + kept].hash) {
+		const index = prepended + kept;
+		if (shown[kept].refs.join('\0') !== next[index].refs.join('\0') || JSON.stringify(shownRows[kept]) !== JSON.stringify(nextRows[index])) {
+			changed.push(index);
+		}
+		kept++;
+	}
+	return { prepended, kept, changed };
+}
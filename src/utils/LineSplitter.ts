@@ -0,0 +1,50 @@
+/**
+ * Splits a stream of text chunks into lines
+ * Handles lines split across chunks and `\r\n` endings. A bare `\r` is kept
+ * in the line, since it may be part of the data (e.g. a commit subject).
+ * Empty lines are emitted too; consumers that only display output skip them.
+ */
+export class LineSplitter {
+	private _partial = '';
+
+	constructor(private readonly _onLine: (line: string) => void) { }
+
+	/**
+	 * Feed a chunk; complete lines are emitted, the remainder is kept for the next chunk
+	 */
+	public push(chunk: string): void {
+		let start = 0;
+		let end = chunk.indexOf('\n');
+		if (end === -1) {
+			this._partial += chunk;
+			return;
+		}
+
+		this.emit(this._partial + chunk.substring(0, end));
+		start = end + 1;
+		while ((end = chunk.indexOf('\n', start)) !== -1) {
+			this.emit(chunk.substring(start, end));
+			start = end + 1;
+		}
+		this._partial = chunk.substring(start);
+	}
+
+	/**
+	 * Emit whatever is left once the stream has ended
+	 */
+	public flush(): void {
+		const rest = this._partial;
+		this._partial = '';
+		// Output ending in a newline has no last line
+		if (rest.length > 0) {
+			this.emit(rest);
+		}
+	}
+
+	private emit(line: string): void {
+		if (line.endsWith('\r')) {
+			line = line.substring(0, line.length - 1);
+		}
+		this._onLine(line);
+	}
+}
@@ -0,0 +1,39 @@
+/**
+ * Fixed-capacity buffer keeping the most recent items
+ * Used to hold the tail of CLI output without growing with the process lifetime.
+ */
+export class RingBuffer<T> {
+	private _items: T[] = [];
+	private _next = 0;
+	private _dropped = 0;
+
+	constructor(private readonly _capacity: number) { }
+
+	public push(item: T): void {
+		if (this._items.length < this._capacity) {
+			this._items.push(item);
+			return;
+		}
+		this._items[this._next] = item;
+		this._next = (this._next + 1) % this._capacity;
+		this._dropped++;
+	}
+
+	/**
+	 * Items in insertion order, oldest first
+	 */
+	public toArray(): T[] {
+		return this._items.slice(this._next).concat(this._items.slice(0, this._next));
+	}
+
+	/**
+	 * Number of items pushed out of the buffer so far
+	 */
+	public get dropped(): number {
+		return this._dropped;
+	}
+
+	public get length(): number {
+		return this._items.length;
+	}
+}
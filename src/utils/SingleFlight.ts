@@ -0,0 +1,38 @@
+/**
+ * Deduplicates concurrent async work by key
+ * While a task for a key is running, later callers with the same key get the
+ * same promise instead of starting the task again.
+ */
+export class SingleFlight<T> {
+	private _inFlight: Map<string, Promise<T>> = new Map();
+
+	/**
+	 * Run the task for the key, or join the run already in progress
+	 */
+	public run(key: string, task: () => Promise<T>): Promise<T> {
+		const existing = this._inFlight.get(key);
+		if (existing) {
+			return existing;
+		}
+
+		const promise = Promise.resolve()
+			.then(task)
+			.finally(() => this._inFlight.delete(key));
+		this._inFlight.set(key, promise);
+		return promise;
+	}
+
+	/**
+	 * Check whether a task for the key is running
+	 */
+	public has(key: string): boolean {
+		return this._inFlight.has(key);
+	}
+
+	/**
+	 * Number of tasks running
+	 */
+	public get size(): number {
+		return this._inFlight.size;
+	}
+}
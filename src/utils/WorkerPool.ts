@@ -0,0 +1,31 @@
+/**
+ * Runs `worker` over `items` with at most `limit` tasks in flight
+ * Each worker takes the next item as soon as its previous one settles, so one slow
+ * item does not hold back the rest. Once `isCancelled` returns true no further items
+ * are started; the results of items that never started are undefined.
+ * @returns The settled result of each item, in item order
+ */
+export async function runPool<T, R>(
+	items: readonly T[],
+	limit: number,
+	worker: (item: T, index: number) => Promise<R>,
+	isCancelled: () => boolean = () => false
+): Promise<(PromiseSettledResult<R> | undefined)[]> {
+	const results: (PromiseSettledResult<R> | undefined)[] = new Array(items.length).fill(undefined);
+	let next = 0;
+
+	const drain = async () => {
+		while (next < items.length && !isCancelled()) {
+			const index = next++;
+			try {
+				results[index] = { status: 'fulfilled', value: await worker(items[index], index) };
+			} catch (reason) {
+				results[index] = { status: 'rejected', reason };
+			}
+		}
+	};
+
+	const workers = Math.max(1, Math.min(Math.floor(limit) || 1, items.length));
+	await Promise.all(Array.from({ length: workers }, drain));
+	return results;
+}
@@ -21,19 +21,154 @@ export interface CliCommand {
 }
 
 export interface CliOutput {
+	/** All of stdout with `captureStdout`, otherwise its last lines */
 	stdout: string;
+	/** The last lines of stderr */
 	stderr: string;
+	/** How long each phase took, if wild reported structured progress */
+	phases: CliPhaseTiming[];
+}
+
+/**
+ * A structured progress event, written by wild as one JSON object per line to the
+ * file descriptor named in WILD_PROGRESS_FD
+ */
+export interface CliProgressEvent {
+	/** 'phase' starts a phase, 'progress' updates it, 'done' ends the run */
+	event: 'phase' | 'progress' | 'done';
+	/** Phase name, e.g. 'parse', 'analyze' or 'render' */
+	phase?: string;
+	/** Overall completion, 0-100 */
+	percent?: number;
+	filesDone?: number;
+	filesTotal?: number;
+	message?: string;
+}
+
+/** Receives the output of one wild run, from a child process or the daemon */
+export interface CliOutputSink {
+	line: (line: CliLine) => void;
+	progress: (event: CliProgressEvent) => void;
+}
+
+export interface CliPhaseTiming {
+	phase: string;
+	durationMs: number;
+}
+
+/** A line of wild output */
+export interface CliLine {
+	stream: 'stdout' | 'stderr';
+	text: string;
+}
+
+/** Scheduling class of a wild run: interactive views first, prefetching last */
+export type CliPriority = 'foreground' | 'background' | 'idle';
+
+/** Order in which pending runs of the same priority are started */
+export type CliQueueOrder = 'fifo' | 'lifo';
+
+export interface CliSchedulerOptions {
+	/** Maximum number of concurrent wild processes; 0 means one per core */
+	maxParallelism: number;
+	order: CliQueueOrder;
+}
+
+export interface CliExecuteOptions {
+	/** Cancelling kills the wild process and its children and rejects with vscode.CancellationError */
+	token?: vscode.CancellationToken;
+	/** Scheduling class, defaults to 'foreground' */
+	priority?: CliPriority;
+	/** Called with each complete line of output as it arrives */
+	onLine?: (line: CliLine) => void;
+	/** Keep all of stdout in CliOutput instead of only its tail */
+	captureStdout?: boolean;
 }
 
 // DiffGraphCache types
+/** The diff input a DiffGraph was generated from; `range` graphs are keyed by their base and head trees */
+export type DiffGraphStage = 'staged' | 'unstaged' | 'range' | `commit-${string}`;
+
+/**
+ * Revisions a DiffGraph compares
+ * `commit` compares a commit with its first parent, `range` compares base with head (`base..head`),
+ * and `mergeBase` compares head with its merge base with base (`base...head`).
+ */
+export type DiffGraphRange =
+	| { kind: 'commit'; head: string }
+	| { kind: 'range' | 'mergeBase'; base: string; head: string };
+
+/** A DiffGraphRange resolved to the revisions passed to wild and the trees they point at */
+export interface ResolvedDiffRange {
+	/** Base commit, or the empty tree for a root commit */
+	base: string;
+	head: string;
+	baseTree: string;
+	headTree: string;
+}
+
 export interface DiffGraphCacheEntry {
+	/** Repository root the entry belongs to */
+	repoRoot: string;
+	/** Diff input the entry was generated from */
+	stage: DiffGraphStage;
+	/** Content fingerprint of the diff input (tree/patch hash, or commit hash) */
+	fingerprint: string;
 	/** Path to the generated HTML file */
 	htmlPath: string;
+	/** Size of the HTML file in bytes */
+	size: number;
 	/** Timestamp when the cache entry was generated */
 	generatedAt: number;
+	/** Timestamp when the cache entry was last served, for LRU eviction */
+	lastAccessedAt: number;
+	/** Split document to show instead of the HTML file, see DiffGraphAssets */
+	documentPath?: string;
+	/** Files in the assets directory the split document uses, the document included */
+	assets?: string[];
+	/** Bytes of the split document and its assets, counted against the cache budget */
+	assetsSize?: number;
 }
 
-export type DiffGraphCacheKey = `${string}:staged` | `${string}:unstaged` | `${string}:commit-${string}`;
+export type DiffGraphCacheKey = `${string}:${DiffGraphStage}:${string}`;
+
+/** A DiffGraph artifact recorded in the persistent store's index */
+export interface DiffGraphStoreRecord {
+	repoRoot: string;
+	stage: DiffGraphStage;
+	fingerprint: string;
+	/** Artifact path relative to the store directory */
+	file: string;
+	/** Artifact size in bytes, checked when the index is loaded */
+	size: number;
+	/** Artifact sha256, checked before the artifact is first served */
+	sha256: string;
+	generatedAt: number;
+	lastAccessedAt: number;
+	/** Split document and assets, see DiffGraphCacheEntry */
+	documentPath?: string;
+	assets?: string[];
+	assetsSize?: number;
+}
+
+export interface DiffGraphStoreIndex {
+	version: number;
+	entries: Record<string, DiffGraphStoreRecord>;
+}
+
+/** Budgets beyond which least recently used DiffGraphs are evicted */
+export interface DiffGraphCacheLimits {
+	maxEntries: number;
+	maxBytes: number;
+}
+
+export interface DiffGraphCacheStats extends DiffGraphCacheLimits {
+	entries: number;
+	bytes: number;
+	hits: number;
+	misses: number;
+	evictions: number;
+}
 
 // TreeView node types
 export interface ChangesViewNode {
@@ -58,15 +193,25 @@ export interface GitCommit {
 	refs: string[];
 }
 
-export interface GitGraphNode {
-	commit: GitCommit;
-	x: number;
-	color: string;
-	connections: GitGraphConnection[];
-}
-
-export interface GitGraphConnection {
-	from: { x: number; y: number };
-	to: { x: number; y: number };
-	color: string;
+/**
+ * Render-ready layout of one History graph row, computed in the extension host
+ * Columns are lane positions; colors are indexes into the webview's lane palette, -1 for the default color.
+ */
+export interface HistoryGraphRow {
+	/** Column of the commit node */
+	circleIndex: number;
+	circleColor: number;
+	node: 'head' | 'merge' | 'commit';
+	/** Color of the lane running into the node from above, if any */
+	inputColor?: number;
+	/** Whether a line leaves the node downwards */
+	hasParents: boolean;
+	/** Lanes passing the row: input column, output column, color */
+	lanes: [number, number, number][];
+	/** Further lanes of the same commit, ending in the node: input column, color */
+	joins: [number, number][];
+	/** Lanes of merge parents, branching off the node: output column, color */
+	merges: [number, number][];
+	/** Width of the graph cell in columns */
+	columns: number;
 }